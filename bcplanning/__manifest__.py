@@ -21,11 +21,16 @@
         'base',
         'web',
         'website',
+        'product',
     ],
+    'external_dependencies': {
+        'python': ['numpy'],
+    },
     # always loaded
     'data': [
         'security/ir.model.access.csv',
         'security/groups.xml',
+        'data/ir_cron.xml',
         'views/bc_planning_views.xml',
         'views/remove_website_odoo_logo.xml',
         'views/website_menu.xml',
@@ -37,6 +42,7 @@
         'views/web_task_template_overlay.xml',
         'views/partner_bor.xml',
         'views/partner_taskresource.xml',
+        'views/partner_heatmap.xml',
         'views/website_header.xml',
     ],
     'assets': {
@@ -44,11 +50,14 @@
             '/bcplanning/static/src/scss/partner_task.scss',
             '/bcplanning/static/src/scss/partner_project.scss',
             '/bcplanning/static/src/js/partner_project.js',
+            '/bcplanning/static/src/js/planning_pager.js',
             '/bcplanning/static/src/js/partner_task.js',
             '/bcplanning/static/src/js/partner_bor.js',
             '/bcplanning/static/src/js/resources.js',   
             '/bcplanning/static/src/js/partner_taskresource.js',   
-            '/bcplanning/static/src/js/portal_mobile_menu.js',      
+            '/bcplanning/static/src/js/portal_mobile_menu.js',
+            '/bcplanning/static/src/js/bc_status.js',      
+            '/bcplanning/static/src/js/partner_heatmap.js',
         ],
     },
     # only loaded in demonstration mode
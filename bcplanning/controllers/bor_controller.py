@@ -8,7 +8,7 @@ from datetime import datetime
 import logging
 _logger = logging.getLogger(__name__)
 
-import psycopg2
+import psycopg2.errors
 from psycopg2 import errorcodes
 
 
@@ -19,6 +19,7 @@ class BorApiController(http.Controller):
         """
         Behavior:
         - If ?date=YYYY-MM-DD present -> filter by that date.
+        - Else if ?date_from=YYYY-MM-DD and/or ?date_to=YYYY-MM-DD present -> filter by that range (week, month view).
         - Else if ?no_date=1 present -> DO NOT apply date filter (show all).
         - Else (no date param, no no_date) -> default to today's date filter.
         """
@@ -26,171 +27,50 @@ class BorApiController(http.Controller):
         if not user.has_group('bcplanning.group_bc_bor'):
             return request.redirect('/')
 
-        # Get Vendor from res.partner (adapt if your mapping differs)
-        vendors = []
-        if user.partner_id.parent_id:
-            vendors = request.env['res.partner'].sudo().search([('id', '=', user.partner_id.parent_id.id)], limit=1)
-        else:
-            vendors = request.env['res.partner'].sudo().search([('id', '=', user.partner_id.id)], limit=1)
-        if not vendors:
+        Portal = request.env['bcplanning_portal']
+        vendor = Portal._vendor_of(user)
+        if not vendor:
             datas = {
                 'message_title': "No vendor mapping",
                 'message_text': "No vendor mapping found for your account. Please contact your administrator.",
             }
             return request.render('bcplanning.web_partner_no_records_template', datas)
 
-        vendor = vendors[0]
-        partner_id = vendor.id
-
         # Detect parameters
-        date_str = request.params.get('date') or date
-        no_date_flag = request.params.get('no_date')
-
-        date_filter = False
-        selected_date = None
-
-        if date_str:
-            # explicit date provided in URL
-            try:
-                selected_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-                date_filter = True
-            except Exception:
-                # invalid date -> fallback to today's filter
-                selected_date = datetime.now().date()
-                date_filter = True
-        elif no_date_flag:
-            # explicit "no date" requested -> show all records
-            date_filter = False
-            selected_date = None
-        else:
-            # no params -> default to today's date filter
-            selected_date = datetime.now().date()
-            date_filter = True
-
-        if date_filter and selected_date:
-            start_dt_str = f"{selected_date.strftime('%Y-%m-%d')} 00:00:00"
-            end_dt_str = f"{selected_date.strftime('%Y-%m-%d')} 23:59:59"
-
-        # Build domains conditionally
-        task_data = []
-        project_data = []
+        selected_date, date_from, date_to = Portal._date_window(
+            request.params.get('date') or date, request.params.get('no_date'),
+            request.params.get('date_from'), request.params.get('date_to'))
+        date_filter = bool(selected_date)
 
         # If a specific job_id is requested
+        project = None
         if job_id:
             project = request.env['bcproject'].with_user(user.id).search([('id', '=', int(job_id))], limit=1)
             if not project:
                 raise ValidationError(f"Project {job_no} for user {user.name} is not found!")
 
-            pl_domain = [
-                ('task_id.job_id.id', '=', project.id),
-                ('vendor_id', '=', partner_id),
-                ('resource_id', '=', user.partner_id.id)  # filter planning line per resource
-            ]
-            if date_filter:
-                pl_domain += [('start_datetime', '>=', start_dt_str), ('start_datetime', '<=', end_dt_str)]
-
-            planninglines = request.env['bcplanningline'].with_user(user.id).search(pl_domain)
-            if planninglines:
-                task_ids = planninglines.mapped('task_id.id')
-                tasks = request.env['bctask'].with_user(user.id).search([('id', 'in', task_ids)])
-            else:
-                tasks = request.env['bctask'].with_user(user.id).browse([])
-        else:
-            # all planninglines for this vendor (maybe filtered by date)
-            pl_domain = [
-                ('vendor_id', '=', partner_id),
-                ('resource_id', '=', user.partner_id.id)  # filter planning line per resource
-            ]
-            if date_filter:
-                pl_domain += [('start_datetime', '>=', start_dt_str), ('start_datetime', '<=', end_dt_str)]
-
-            planninglines = request.env['bcplanningline'].with_user(user.id).search(pl_domain)
-            job_ids = planninglines.mapped('job_id.id')
-            projects = request.env['bcproject'].with_user(user.id).search([('id', 'in', job_ids)]) if job_ids else request.env['bcproject'].with_user(user.id).browse([])
-            tasks = request.env['bctask'].with_user(user.id).search([('id', 'in', planninglines.mapped('task_id.id'))]) if planninglines else request.env['bctask'].with_user(user.id).browse([])
-
-            # Build project_data (same logic as before)
-            if projects:
-                for p in projects:
-                    pl_for_project_domain = [
-                        ('task_id.job_id.id', '=', p.id),
-                        ('vendor_id', '=', vendor.id),
-                    ]
-                    if date_filter:
-                        pl_for_project_domain += [('start_datetime', '>=', start_dt_str), ('start_datetime', '<=', end_dt_str)]
-                    pl_for_project = request.env['bcplanningline'].with_user(user.id).search(pl_for_project_domain)
-                    if pl_for_project:
-                        task_ids = pl_for_project.mapped('task_id.id')
-                        project_data.append({
-                            'id': p.id,
-                            'job_no': p.job_no or '-',
-                            'job_desc': p.job_desc or '-',
-                            'task_count': len(task_ids),
-                            'partner_name': (request.env['res.partner'].sudo().browse(vendor.id).name if vendor else ''),
-                        })
-
-        # Build task data (include planning lines only if they match date filter when enabled)
-        for t in tasks:
-            pl_data = []
-            pl_domain = [
-                ('task_id', '=', t.id),
-                ('vendor_id', '=', partner_id),
-                ('resource_id', '=', user.partner_id.id),  # filter planning line per resource
-            ]
-            if date_filter:
-                pl_domain += [('start_datetime', '>=', start_dt_str), ('start_datetime', '<=', end_dt_str)]
-
-            earliest_start = False
-            planninglines = request.env['bcplanningline'].with_user(user.id).search(pl_domain)
-            if planninglines:
-                for pl in planninglines:
-                    pl_data.append({
-                        'id': pl.id,
-                        'pl_no': pl.planning_line_no,
-                        'pl_desc': pl.planning_line_desc,
-                        'pl_resource_id': pl.resource_id.id if pl.resource_id else None,
-                        'pl_start_datetime': pl.start_datetime,
-                        'pl_end_datetime': pl.end_datetime,
-                        'pl_product_id': pl.product_id.id if pl.product_id else None,
-                        'pl_qty': pl.quantity,
-                        'pl_depth': pl.depth,
-                    })
-
-                # Compute earliest start for this set of planning lines (when date_filter is applied, earliest among filtered lines)
-                starts = [pl.start_datetime for pl in planninglines if pl.start_datetime]
-                if starts:
-                    earliest_start = min(starts)
-            else:
-                earliest_start = t.earliest_start_datetime or False
-
-            task_data.append({
-                'id': t.id,
-                'task_no': t.task_no,
-                'task_desc': t.task_desc,
-                'job_no': t.job_id.job_no,
-                'planningline_count': len(planninglines),
-                'planninglines': pl_data,
-                'earliest_start': earliest_start,
-            })
-
-        # Products
-        product_data = []
-        products = request.env['product.product'].sudo().search([('product_tmpl_id.type', '=', 'service'), ('active', '=', True)])
-        if products:
-            for prod in products:
-                product_data.append({
-                    'id': prod.id,
-                    'name': prod.name,
-                })
+        # all planninglines for this vendor in one query, grouped per task
+        planning = Portal._vendor_planning(
+            vendor,
+            resource=user.partner_id,  # filter planning line per resource
+            job=project,
+            date_from=date_from,
+            date_to=date_to,
+            # "all dates": first page only, the widget loads the rest while scrolling
+            limit=None if date_filter else Portal.PAGE_SIZE,
+        )
+        task_data = planning['tasks']
 
         datas = {
             'tasks': task_data,
-            'products': product_data,
+            **Portal._page_values('bor', vendor),
             'job_id': job_id,
             'job_no': job_no,
             'job_desc': job_name,
             'partner_name': vendor.name if vendor else 'No partner found.',
-            'selected_date': selected_date.strftime('%Y-%m-%d') if date_filter and selected_date else '',
+            'selected_date': Portal._date_label(date_from, date_to),
+            'next_cursor': planning['next_cursor'],
+            'has_more': planning['has_more'],
         }
 
         return request.render('bcplanning.web_partner_bor_template', datas)
@@ -305,79 +185,57 @@ class BorApiController(http.Controller):
             "depth": depth,
         }
 
-        # Call BC safely
+        # Save locally and queue the BC update in the same transaction,
+        # the outbox dispatcher delivers it to BC with retries.
         try:
-            success = request.env['bcplanning_utils'].update_bc_planningline_item(payload=payload)
-        except Exception as e:
-            _logger.exception("External BC update failed for planningline %s", pl_id)
-            return {
-                'result': f'External update failed: {str(e)}',
-                'old_start_datetime': old_start.strftime('%Y-%m-%dT%H:%M:%S') if old_start else '',
-                'old_end_datetime': old_end.strftime('%Y-%m-%dT%H:%M:%S') if old_end else '',
-                'old_product_id': old_product_id,
-                'old_qty': old_qty,
-                'old_depth': old_depth,
-                'error': True,
-            }
-
-        # Handle BC response
-        if success is True:
-            # Write only if BC succeeded
-            try:
-                write_vals = {}
-                if parsed_start is not False:
-                    write_vals['start_datetime'] = parsed_start
-                if parsed_end is not False:
-                    write_vals['end_datetime'] = parsed_end
-                if product_id is not None and product_id != '':
-                    try:
-                        write_vals['product_id'] = int(product_id)
-                    except Exception:
-                        write_vals['product_id'] = False
-                elif product_id == "" or product_id is None:
+            write_vals = {}
+            if parsed_start is not False:
+                write_vals['start_datetime'] = parsed_start
+            if parsed_end is not False:
+                write_vals['end_datetime'] = parsed_end
+            if product_id is not None and product_id != '':
+                try:
+                    write_vals['product_id'] = int(product_id)
+                except Exception:
                     write_vals['product_id'] = False
-                if qty not in (None, '', False):
-                    try:
-                        write_vals['quantity'] = float(qty)
-                    except Exception:
-                        write_vals['quantity'] = qty
-                if depth not in (None, '', False):
-                    try:
-                        write_vals['depth'] = float(depth)
-                    except Exception:
-                        write_vals['depth'] = depth
+            elif product_id == "" or product_id is None:
+                write_vals['product_id'] = False
+            if qty not in (None, '', False):
+                try:
+                    write_vals['quantity'] = float(qty)
+                except Exception:
+                    write_vals['quantity'] = qty
+            if depth not in (None, '', False):
+                try:
+                    write_vals['depth'] = float(depth)
+                except Exception:
+                    write_vals['depth'] = depth
 
+            with request.env.cr.savepoint():
                 if write_vals:
                     line.sudo().write(write_vals)
-            except Exception as e:
-                _logger.exception("Failed to write bcplanningline %s after BC success: %s", pl_id, e)
-                return {
-                    'result': f'Updated in BC but local save failed: {str(e)}',
-                    'old_start_datetime': old_start.strftime('%Y-%m-%dT%H:%M:%S') if old_start else '',
-                    'old_end_datetime': old_end.strftime('%Y-%m-%dT%H:%M:%S') if old_end else '',
-                    'old_product_id': old_product_id,
-                    'old_qty': old_qty,
-                    'old_depth': old_depth,
-                    'error': True,
-                }
-
-            # Prepare canonical new values for the frontend
-            new_vals = {
-                'new_start_datetime': line.start_datetime.strftime('%Y-%m-%dT%H:%M:%S') if line.start_datetime else '',
-                'new_end_datetime': line.end_datetime.strftime('%Y-%m-%dT%H:%M:%S') if line.end_datetime else '',
-                'new_pl_product_id': line.product_id.id if line.product_id else False,
-                'new_pl_qty': line.quantity,
-                'new_pl_depth': line.depth,
-            }
-            return {'result': 'updated', **new_vals}
-        else:
-            # BC returned False (failure) — return old values so frontend can restore
+                request.env['bcoutbox'].sudo()._enqueue('planningline_item', payload, line)
+        except psycopg2.errors.TransactionRollbackError:
+            # serialization failure or deadlock: let Odoo retry the whole request
+            raise
+        except Exception as e:
+            _logger.exception("Failed to save bcplanningline %s: %s", pl_id, e)
             return {
-                'result': 'Update to BC failed',
+                'result': f'Save failed: {str(e)}',
                 'old_start_datetime': old_start.strftime('%Y-%m-%dT%H:%M:%S') if old_start else '',
                 'old_end_datetime': old_end.strftime('%Y-%m-%dT%H:%M:%S') if old_end else '',
                 'old_product_id': old_product_id,
                 'old_qty': old_qty,
                 'old_depth': old_depth,
                 'error': True,
-            }
\ No newline at end of file
+            }
+
+        # Prepare canonical new values for the frontend
+        new_vals = {
+            'new_start_datetime': line.start_datetime.strftime('%Y-%m-%dT%H:%M:%S') if line.start_datetime else '',
+            'new_end_datetime': line.end_datetime.strftime('%Y-%m-%dT%H:%M:%S') if line.end_datetime else '',
+            'new_pl_product_id': line.product_id.id if line.product_id else False,
+            'new_pl_qty': line.quantity,
+            'new_pl_depth': line.depth,
+        }
+        return {'result': 'updated', **new_vals}
\ No newline at end of file
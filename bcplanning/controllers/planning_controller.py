@@ -4,12 +4,14 @@ from odoo.exceptions import AccessDenied
 import json
 from odoo.http import Response
 from odoo.exceptions import ValidationError
+import os
 import time
-from datetime import datetime
+from datetime import datetime, timedelta
+from odoo.fields import Domain
 import logging
 _logger = logging.getLogger(__name__)
 
-import psycopg2
+import psycopg2.errors
 from psycopg2 import errorcodes
 
 class PlanningApiController(http.Controller):
@@ -53,14 +55,10 @@ class PlanningApiController(http.Controller):
         """
         this endpoint will access by BC
         """
-        product_recs = []
-        products = request.env['product.product'].search([('product_tmpl_id.type','=','service'), ('active', '=', True)])
-        if products:
-            for prod in products:
-                product_recs.append({
-                    'product_id': prod.id,
-                    'product_name': prod.name,
-                })
+        product_recs = [
+            {'product_id': pid, 'product_name': name}
+            for dummy, pid, name in request.env['bcplanning_portal']._product_catalog()
+        ]
         return Response(json.dumps(product_recs),content_type='application/json;charset=utf-8',status=200)
 
     @http.route('/planning/contacts', type='http', auth='api_key', methods=['POST'], csrf=False)
@@ -147,6 +145,31 @@ class PlanningApiController(http.Controller):
             return request.make_response(response, headers=[('Content-Type', 'application/json')])
 
 
+    @http.route('/planning/deleteplanninglines', type='http', auth='api_key', methods=['POST'], csrf=False)
+    def deleteplanninglines(self, **kwargs):
+        """
+        Bulk delete, one request for many planning lines, tasks or whole jobs.
+        {
+            "planninglines": [
+                {"bc_jobplanningline_jobno": xxx, "bc_jobplanningline_taskno": xxx, "bc_jobplanningline_lineno": 10000},
+                {"bc_jobplanningline_jobno": xxx, "bc_jobplanningline_taskno": xxx},   -> the whole task
+                {"bc_jobplanningline_jobno": xxx}                                       -> the whole job
+            ]
+        }
+        """
+        posted_data = {}
+        try:
+            posted_data = json.loads(request.httprequest.data.decode('utf-8'))
+        except Exception as e:
+            raise ValidationError(f"submitted data is invalid: {str(request.httprequest.data.decode('utf-8'))}")
+        if self._is_async_request():
+            return self._accepted(request.env['bcingest']._enqueue('delete', posted_data))
+
+        result = request.env['bcproject'].deletionfrombc(posted_data)
+        response = json.dumps({'status': 'success', 'received': result})
+        return request.make_response(response, headers=[('Content-Type', 'application/json')])
+
+
     @http.route('/planning/planninglinefrombc', type='http', auth='api_key', methods=['POST'], csrf=False)
     def planninglinefrombc(self, **kwargs):
         """
@@ -175,8 +198,50 @@ class PlanningApiController(http.Controller):
         return request.make_response(response, headers=[('Content-Type', 'application/json')])
 
 
+    @http.route('/planning/planninglinesfrombc', type='http', auth='api_key', methods=['POST'], csrf=False)
+    def planninglinesfrombc(self, **kwargs):
+        """
+        Batch version of /planning/planninglinefrombc, one request for many lines across jobs and tasks.
+        {
+            "planninglines": [
+                {
+                    "bc_jobplanningline_jobno": xxx,
+                    "bc_jobplanningline_taskno": xxx,
+                    "bc_jobplanningline_lineno":50000,
+                    "bc_jobplanningline_type":"Text",
+                    "bc_jobplanningline_no":"VACANT",
+                    "bc_jobplanningline_resid":0,
+                    "bc_jobplanningline_desc":"Vacant Resource",
+                    "bc_jobplanningline_vendorid":13,
+                    "bc_jobplanningline_datetimestart":"2025-10-11T07:00:00",
+                    "bc_jobplanningline_datetimeend":"2025-10-11T11:00:00"
+                },
+                ...
+            ]
+        }
+        Returns a status entry per submitted line, in the same order.
+        """
+        posted_data = {}
+        try:
+            posted_data = json.loads(request.httprequest.data.decode('utf-8'))
+        except Exception as e:
+            raise ValidationError(f"submitted data is invalid: {str(request.httprequest.data.decode('utf-8'))}")
+        if self._is_async_request():
+            return self._accepted(request.env['bcingest']._enqueue('planninglines', posted_data))
+
+        result = request.env['bcplanningline'].planninglinesfrombc(posted_data)
+        # Return as JSON
+        response = json.dumps({'status': 'success', 'received': result})
+        return request.make_response(response, headers=[('Content-Type', 'application/json')])
+
+
     @http.route('/planning/projectcreationfrombc', type='http', auth='api_key', methods=['POST'], csrf=False)
     def projectcreationfrombc(self, **kwargs):
+        """
+        Create/update a job with its tasks and planning lines.
+        With ?mode=snapshot (or "mode": "snapshot" in the body) tasks and planning lines
+        of the job that are not in the payload are removed in the same transaction.
+        """
         posted_data = {}
         try:
             posted_data = json.loads(request.httprequest.data.decode('utf-8'))
@@ -184,11 +249,134 @@ class PlanningApiController(http.Controller):
             # print("Error parsing JSON payload:", e)                
             raise ValidationError(f"submitted data is invalid: {str(request.httprequest.data.decode('utf-8'))}")
 
+        # ?mode=snapshot: the payload is the complete state of the job (see bcproject.projectcreationfrombc)
+        if request.params.get('mode'):
+            posted_data['mode'] = request.params.get('mode')
+
+        if self._is_async_request():
+            return self._accepted(request.env['bcingest']._enqueue('project', posted_data))
+
         result = request.env['bcproject'].projectcreationfrombc(posted_data)    
         # Return as JSON
         response = json.dumps({'status': 'success', 'received': result})
         return request.make_response(response, headers=[('Content-Type', 'application/json')])
 
+    @http.route('/planning/ingest/status/<string:ticket>', type='http', auth='api_key', methods=['GET'], csrf=False)
+    def ingest_status(self, ticket, **kwargs):
+        """
+        this endpoint will access by BC, to poll the result of a payload posted with ?async=1
+        """
+        ingest = request.env['bcingest'].sudo().search([('ticket', '=', ticket)], limit=1)
+        if not ingest:
+            response = json.dumps({'status': 'error', 'received': {'ticket': ticket, 'state': 'not found'}})
+            return request.make_response(response, headers=[('Content-Type', 'application/json')], status=404)
+        response = json.dumps({'status': 'success', 'received': ingest._status()})
+        return request.make_response(response, headers=[('Content-Type', 'application/json')])
+
+    @http.route('/planning/changes', type='http', auth='api_key', methods=['GET'], csrf=False)
+    def planning_changes(self, since=0, limit=500, **kwargs):
+        """
+        this endpoint will access by BC, to pull planning line changes made in Odoo (portal edits)
+        ?since=<cursor>&limit=N  (pass back next_cursor of the previous page, 0 for the first pull)
+        {
+            "changes": [{"cursor": 12, "op": "write", "id": 55, "job_no": xxx, "task_no": xxx, "line_no": 10000,
+                         "values": {"start_datetime": "2025-10-11T07:00:00"}, "at": "2025-10-10T08:12:01"}],
+            "next_cursor": 12,
+            "has_more": false
+        }
+        """
+        try:
+            since = int(since or 0)
+            limit = min(max(int(limit or 500), 1), 5000)
+        except (TypeError, ValueError):
+            raise ValidationError(f"invalid since/limit: {since}/{limit}")
+        result = request.env['bcplanninglinechange'].sudo()._feed(since=since, limit=limit)
+        return Response(json.dumps(result), content_type='application/json;charset=utf-8', status=200)
+
+    @http.route('/planning/conflicts', type='http', auth='api_key', methods=['GET'], csrf=False)
+    def planning_conflicts(self, vendor_id=None, resource_id=None, date_from=None, date_to=None, **kwargs):
+        """
+        this endpoint will access by BC, to get the resource double bookings (overlapping planning lines)
+        ?vendor_id=N&resource_id=N&date_from=YYYY-MM-DD&date_to=YYYY-MM-DD  (all optional, from today on by default)
+        {
+            "conflicts": [{"resource_id": 7, "start": "2025-10-11T09:00:00", "end": "2025-10-11T10:00:00",
+                           "lines": [{"id": 55, "job_no": xxx, "task_no": xxx, "line_no": 10000}, {...}]}]
+        }
+        """
+        Portal = request.env['bcplanning_portal']
+        domain = Domain('end_datetime', '>', datetime.now()) if not (date_from or date_to) else Domain.TRUE
+        try:
+            if vendor_id:
+                domain &= Domain('vendor_id', '=', int(vendor_id))
+            if resource_id:
+                domain &= Domain('resource_id', '=', int(resource_id))
+        except (TypeError, ValueError):
+            raise ValidationError(f"invalid vendor_id/resource_id: {vendor_id}/{resource_id}")
+        if date_from or date_to:
+            dummy, range_from, range_to = Portal._date_window(None, True, date_from, date_to)
+            if not (range_from or range_to):
+                raise ValidationError(f"invalid date_from/date_to: {date_from}/{date_to}")
+            if range_from:
+                domain &= Domain('end_datetime', '>', range_from)
+            if range_to:
+                domain &= Domain('start_datetime', '<=', range_to)
+
+        def line_key(line):
+            return {
+                'id': line.id,
+                'job_no': line.job_id.job_no,
+                'task_no': line.task_id.task_no,
+                'line_no': line.planning_line_lineno,
+            }
+
+        overlaps = request.env['bcplanningline'].sudo()._find_overlaps(domain)
+        result = {'conflicts': [{
+            'resource_id': line.resource_id.id,
+            'start': start.strftime('%Y-%m-%dT%H:%M:%S'),
+            'end': end.strftime('%Y-%m-%dT%H:%M:%S'),
+            'lines': [line_key(line), line_key(other)],
+        } for line, other, start, end in overlaps]}
+        return Response(json.dumps(result), content_type='application/json;charset=utf-8', status=200)
+
+    @http.route('/planning/metrics', type='http', auth='api_key', methods=['GET'], csrf=False)
+    def planning_metrics(self, **kwargs):
+        """
+        Counters of the worker serving the request (they are process-local), and the
+        circuit breakers of BC, shared by all workers
+        {
+            "pid": 1234,
+            "token": {"hits": 120, "shared_hits": 3, "refreshes": 1, "hit_rate": 0.9919},
+            "planning_cache": {"hits": 830, "misses": 95, "size": 64, "hit_rate": 0.8973},
+            "bc": {"available": true, "state": "closed", "failures": 0, "retry_in": 0,
+                   "endpoints": {"token": {"state": "closed", "failures": 0, "retry_in": 0},
+                                 "api": {"state": "closed", "failures": 0, "retry_in": 0}}}
+        }
+        """
+        result = {
+            'pid': os.getpid(),
+            'token': request.env['bctoken'].sudo()._stats(),
+            'planning_cache': request.env['bcplanning_portal']._planning_cache_stats(),
+            'bc': request.env['bcplanning_utils']._bc_status(),
+        }
+        return Response(json.dumps(result), content_type='application/json;charset=utf-8', status=200)
+
+    def _is_async_request(self):
+        """Async mode is requested with ?async=1 or the 'Prefer: respond-async' header."""
+        if request.params.get('async') in ('1', 'true', 'True'):
+            return True
+        return 'respond-async' in (request.httprequest.headers.get('Prefer') or '')
+
+    def _accepted(self, ingest):
+        """202 Accepted response for a queued BC payload."""
+        response = json.dumps({
+            'status': 'accepted',
+            'received': {
+                'ticket': ingest.ticket,
+                'status_url': f'/planning/ingest/status/{ingest.ticket}',
+            },
+        })
+        return request.make_response(response, headers=[('Content-Type', 'application/json')], status=202)
+
 
     # ********************* end of api_key group *****************************************************
 
@@ -216,30 +404,27 @@ class PlanningApiController(http.Controller):
             }
             return request.render('bcplanning.web_partner_no_records_template', datas)
 
-        number_of_project = 0
         project_data = []
         datas = {}
-        planninglines = request.env['bcplanningline'].with_user(user.id).search([('vendor_id','=',vendor.id)])
-        if planninglines:
-            job_ids = planninglines.mapped('job_id.id')
-            number_of_project = len(job_ids) if job_ids else 0
-            projects = request.env['bcproject'].with_user(user.id).search([('id','in',job_ids)])
-            if projects:
-                for p in projects:                
-                    planninglines = request.env['bcplanningline'].with_user(user.id).search([('task_id.job_id.id','=',p.id), ('vendor_id','=',vendor.id)])
-                    if planninglines:
-                        task_ids = planninglines.mapped('task_id.id')
-                        project_data.append({
-                            'id': p.id,
-                            'job_no': p.job_no if p.job_no else '-',
-                            'job_desc': p.job_desc if p.job_desc else '-',
-                            'task_count': len(task_ids),
-                            'partner_name': vendor.name if vendor else '',
-                        })
+        # one grouped query: (project, number of distinct tasks) of the vendor's planning lines
+        groups = request.env['bcplanningline'].with_user(user.id)._read_group(
+            [('vendor_id', '=', vendor.id), ('job_id', '!=', False)],
+            groupby=['job_id'],
+            aggregates=['task_id:count_distinct'],
+        )
+        if groups:
+            for p, task_count in groups:
+                project_data.append({
+                    'id': p.id,
+                    'job_no': p.job_no if p.job_no else '-',
+                    'job_desc': p.job_desc if p.job_desc else '-',
+                    'task_count': task_count,
+                    'partner_name': vendor.name if vendor else '',
+                })
             datas = {
                 'partner_id': vendor.id,
                 'partner_name': vendor.name if vendor else '',
-                'number_of_project':  number_of_project,
+                'number_of_project': len(project_data),
                 'projects': project_data,
             }
 
@@ -250,6 +435,7 @@ class PlanningApiController(http.Controller):
         """
         Behavior:
         - If ?date=YYYY-MM-DD present -> filter by that date.
+        - Else if ?date_from=YYYY-MM-DD and/or ?date_to=YYYY-MM-DD present -> filter by that range (week, month view).
         - Else if ?no_date=1 present -> DO NOT apply date filter (show all).
         - Else (no date param, no no_date) -> default to today's date filter.
         """
@@ -257,154 +443,50 @@ class PlanningApiController(http.Controller):
         if not user.has_group('bcplanning.group_bc_tasks'):
             return request.redirect('/')
 
-        # Get Vendor from res.partner (adapt if your mapping differs)
-        vendors = []
-        if user.partner_id.parent_id:
-            vendors = request.env['res.partner'].sudo().search([('id', '=', user.partner_id.parent_id.id)], limit=1)
-        else:
-            vendors = request.env['res.partner'].sudo().search([('id', '=', user.partner_id.id)], limit=1)
-        if not vendors:
+        Portal = request.env['bcplanning_portal']
+        vendor = Portal._vendor_of(user)
+        if not vendor:
             datas = {
                 'message_title': "No vendor mapping",
                 'message_text': "No vendor mapping found for your account. Please contact your administrator.",
             }
             return request.render('bcplanning.web_partner_no_records_template', datas)
 
-        vendor = vendors[0]
-        partner_id = vendor.id
-
         # Detect parameters
-        date_str = request.params.get('date') or date
-        no_date_flag = request.params.get('no_date')
-
-        date_filter = False
-        selected_date = None
-
-        if date_str:
-            # explicit date provided in URL
-            try:
-                selected_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-                date_filter = True
-            except Exception:
-                # invalid date -> fallback to today's filter
-                selected_date = datetime.now().date()
-                date_filter = True
-        elif no_date_flag:
-            # explicit "no date" requested -> show all records
-            date_filter = False
-            selected_date = None
-        else:
-            # no params -> default to today's date filter
-            selected_date = datetime.now().date()
-            date_filter = True
-
-        if date_filter and selected_date:
-            start_dt_str = f"{selected_date.strftime('%Y-%m-%d')} 00:00:00"
-            end_dt_str = f"{selected_date.strftime('%Y-%m-%d')} 23:59:59"
-
-        # Build domains conditionally
-        task_data = []
-        project_data = []
+        selected_date, date_from, date_to = Portal._date_window(
+            request.params.get('date') or date, request.params.get('no_date'),
+            request.params.get('date_from'), request.params.get('date_to'))
+        date_filter = bool(selected_date)
 
         # If a specific job_id is requested
+        project = None
         if job_id:
             project = request.env['bcproject'].with_user(user.id).search([('id', '=', int(job_id))], limit=1)
             if not project:
                 raise ValidationError(f"Project {job_no} for user {user.name} is not found!")
 
-            pl_domain = [
-                ('task_id.job_id.id', '=', project.id),
-                ('vendor_id', '=', partner_id),
-            ]
-            if date_filter:
-                pl_domain += [('start_datetime', '>=', start_dt_str), ('start_datetime', '<=', end_dt_str)]
-
-            planninglines = request.env['bcplanningline'].with_user(user.id).search(pl_domain)
-            if planninglines:
-                task_ids = planninglines.mapped('task_id.id')
-                tasks = request.env['bctask'].with_user(user.id).search([('id', 'in', task_ids)])
-            else:
-                tasks = request.env['bctask'].with_user(user.id).browse([])
-        else:
-            # all planninglines for this vendor (maybe filtered by date)
-            pl_domain = [('vendor_id', '=', partner_id)]
-            if date_filter:
-                pl_domain += [('start_datetime', '>=', start_dt_str), ('start_datetime', '<=', end_dt_str)]
-
-            planninglines = request.env['bcplanningline'].with_user(user.id).search(pl_domain)
-            job_ids = planninglines.mapped('job_id.id')
-            projects = request.env['bcproject'].with_user(user.id).search([('id', 'in', job_ids)]) if job_ids else request.env['bcproject'].with_user(user.id).browse([])
-            tasks = request.env['bctask'].with_user(user.id).search([('id', 'in', planninglines.mapped('task_id.id'))]) if planninglines else request.env['bctask'].with_user(user.id).browse([])
-
-            # Build project_data (same logic as before)
-            if projects:
-                for p in projects:
-                    pl_for_project_domain = [
-                        ('task_id.job_id.id', '=', p.id),
-                        ('vendor_id', '=', vendor.id),
-                    ]
-                    if date_filter:
-                        pl_for_project_domain += [('start_datetime', '>=', start_dt_str), ('start_datetime', '<=', end_dt_str)]
-                    pl_for_project = request.env['bcplanningline'].with_user(user.id).search(pl_for_project_domain)
-                    if pl_for_project:
-                        task_ids = pl_for_project.mapped('task_id.id')
-                        project_data.append({
-                            'id': p.id,
-                            'job_no': p.job_no or '-',
-                            'job_desc': p.job_desc or '-',
-                            'task_count': len(task_ids),
-                            'partner_name': (request.env['res.partner'].sudo().browse(vendor.id).name if vendor else ''),
-                        })
-
-        # Build task data (include planning lines only if they match date filter when enabled)
-        for t in tasks:
-            pl_data = []
-            pl_domain = [
-                ('task_id', '=', t.id),
-                ('vendor_id', '=', partner_id),
-            ]
-            if date_filter:
-                pl_domain += [('start_datetime', '>=', start_dt_str), ('start_datetime', '<=', end_dt_str)]
-
-            planninglines = request.env['bcplanningline'].with_user(user.id).search(pl_domain)
-            if planninglines:
-                for pl in planninglines:
-                    pl_data.append({
-                        'id': pl.id,
-                        'pl_no': pl.planning_line_no,
-                        'pl_desc': pl.planning_line_desc,
-                        'pl_resource_id': pl.resource_id.id if pl.resource_id else None,
-                        'pl_start_datetime': pl.start_datetime,
-                        'pl_end_datetime': pl.end_datetime,
-                    })
-
-                task_data.append({
-                    'id': t.id,
-                    'task_no': t.task_no,
-                    'task_desc': t.task_desc,
-                    'job_no': t.job_id.job_no,
-                    'planningline_count': len(planninglines),
-                    'planninglines': pl_data
-                })
-
-        # Resources
-        resource_data = []
-        res = request.env['res.partner'].sudo().search([('id', '=', vendor.id)])
-        if res.child_ids:
-            for contact in res.child_ids:
-                resource_data.append({
-                    'id': contact.id,
-                    'name': contact.name,
-                })
+        # all planninglines for this vendor in one query, grouped per task
+        planning = Portal._vendor_planning(
+            vendor,
+            job=project,
+            date_from=date_from,
+            date_to=date_to,
+            # "all dates": first page only, the widget loads the rest while scrolling
+            limit=None if date_filter else Portal.PAGE_SIZE,
+        )
+        task_data = planning['tasks']
 
         datas = {
             'tasks': task_data,
-            'resources': resource_data,
+            **Portal._page_values('task', vendor),
+            'overlaps': Portal._vendor_overlaps(vendor),
             'job_id': job_id,
             'job_no': job_no,
             'job_desc': job_name,
             'partner_name': vendor.name if vendor else 'No partner found.',
-            'selected_date': selected_date.strftime('%Y-%m-%d') if date_filter and selected_date else '',
+            'selected_date': Portal._date_label(date_from, date_to),
+            'next_cursor': planning['next_cursor'],
+            'has_more': planning['has_more'],
         }
 
         return request.render('bcplanning.web_partner_task_template', datas)
@@ -414,13 +496,167 @@ class PlanningApiController(http.Controller):
 
     # ********************* jsonrpc ********************************************************
 
+    # page -> (group, only the user's own lines, rows template, cards template)
+    PORTAL_PAGES = {
+        'task': ('bcplanning.group_bc_tasks', False, 'bcplanning.web_partner_task_rows', 'bcplanning.web_partner_task_cards'),
+        'bor': ('bcplanning.group_bc_bor', True, 'bcplanning.web_partner_bor_rows', 'bcplanning.web_partner_bor_cards'),
+        'taskresource': ('bcplanning.group_bc_taskresource', True, 'bcplanning.web_taskresource_rows', 'bcplanning.web_taskresource_cards'),
+    }
+
+    @http.route('/partner/planning/more', type='jsonrpc', auth='user', methods=['POST'])
+    def partner_planning_more(self, page, cursor, job_id=None, date_from=None, date_to=None, html=False):
+        """
+        Next page of the "all dates" view (?no_date=1) or of a date range view (?date_from=...&date_to=...)
+        of a portal page, for infinite scroll.
+        Returns the task view model of the page, datetimes as "YYYY-MM-DDTHH:MM:SS":
+        {"tasks": [{"id": 3, "task_no": "xxx", "task_desc": "xxx", "job_no": "xxx", "planningline_count": 1,
+                    "earliest_start": "2025-10-11T07:00:00",
+                    "planninglines": [{"id": 55, "pl_no": "xxx", "pl_desc": "xxx", "pl_resource_id": 7,
+                                       "pl_start_datetime": "2025-10-11T07:00:00", "pl_end_datetime": "2025-10-11T09:00:00",
+                                       "pl_product_id": null, "pl_qty": 0, "pl_depth": 0.0}]}],
+         "next_cursor": "2025-10-11T07:00:00|55", "has_more": true}
+        With html=true, also the desktop rows and mobile cards rendered with the templates of the page:
+        "rows": "<tr>...", "cards": "<div>..."
+        """
+        Portal = request.env['bcplanning_portal']
+        dummy, range_from, range_to = Portal._date_window(None, True, date_from, date_to)
+        return self._portal_planning(
+            page, job_id, html,
+            date_from=range_from,
+            date_to=range_to,
+            cursor=cursor,
+            limit=Portal.PAGE_SIZE,
+        )
+
+    @http.route('/partner/planning/day', type='jsonrpc', auth='user', methods=['POST'])
+    def partner_planning_day(self, page, date=None, no_date=False, job_id=None, date_from=None, date_to=None, html=False):
+        """
+        Planning of a portal page for another date, date range or all dates, used by the date
+        navigation of the widgets instead of reloading the whole page. Same result as
+        /partner/planning/more plus "selected_date", the label of the dates ('' for all dates).
+        Ranges and all dates are paged like the page itself.
+        """
+        Portal = request.env['bcplanning_portal']
+        selected_date, range_from, range_to = Portal._date_window(date, no_date, date_from, date_to)
+        result = self._portal_planning(
+            page, job_id, html,
+            date_from=range_from,
+            date_to=range_to,
+            limit=None if selected_date else Portal.PAGE_SIZE,
+        )
+        result['selected_date'] = Portal._date_label(range_from, range_to)
+        return result
+
+    def _portal_planning(self, page, job_id=None, html=False, **kwargs):
+        """Task view model of a portal page, with its rows and cards rendered by the page templates when html."""
+        if page not in self.PORTAL_PAGES:
+            raise ValidationError(f"Unknown page {page}")
+        group, own_lines, rows_template, cards_template = self.PORTAL_PAGES[page]
+        user = request.env.user
+        if not user.has_group(group):
+            raise AccessDenied()
+
+        Portal = request.env['bcplanning_portal']
+        vendor = Portal._vendor_of(user)
+        project = None
+        if job_id:
+            project = request.env['bcproject'].search([('id', '=', int(job_id))], limit=1)
+            if not project:
+                raise ValidationError(f"Project {job_id} for user {user.name} is not found!")
+
+        planning = Portal._vendor_planning(
+            vendor,
+            resource=user.partner_id if own_lines else None,
+            job=project,
+            **kwargs,
+        )
+        result = {
+            'tasks': Portal._tasks_json(planning['tasks']),
+            'next_cursor': planning['next_cursor'],
+            'has_more': planning['has_more'],
+        }
+        if html:
+            values = {'tasks': planning['tasks'], **Portal._page_values(page, vendor)}
+            QWeb = request.env['ir.qweb']
+            result['rows'] = str(QWeb._render(rows_template, values))
+            result['cards'] = str(QWeb._render(cards_template, values))
+        return result
+
+    @http.route('/partner/products/search', type='jsonrpc', auth='user', methods=['POST'])
+    def partner_products_search(self, term='', limit=20):
+        """Item autocomplete of the BOR page: service products whose name starts with term, [{"id": 3, "name": "xxx"}]."""
+        if not request.env.user.has_group('bcplanning.group_bc_bor'):
+            raise AccessDenied()
+        try:
+            limit = min(max(int(limit), 1), 100)
+        except (TypeError, ValueError):
+            limit = 20
+        return request.env['bcplanning_portal']._product_search(term, limit=limit)
+
+    @http.route('/partner/heatmap', type='http', auth='user', website=True)
+    def partner_heatmap(self, **kwargs):
+        """Week(s) view of the load of the vendor resources per slot, drawn by the heatmap widget."""
+        user = request.env.user
+        if not user.has_group('bcplanning.group_bc_tasks'):
+            return request.redirect('/')
+        Portal = request.env['bcplanning_portal']
+        vendor = Portal._vendor_of(user)
+        if not vendor:
+            datas = {
+                'message_title': "No vendor mapping",
+                'message_text': "No vendor mapping found for your account. Please contact your administrator.",
+            }
+            return request.render('bcplanning.web_partner_no_records_template', datas)
+        return request.render('bcplanning.web_partner_heatmap_template', {
+            'partner_name': vendor.name,
+            'slot_minutes': Portal.HEATMAP_SLOT_MINUTES,
+            'max_weeks': Portal.HEATMAP_MAX_WEEKS,
+        })
+
+    @http.route('/partner/heatmap/data', type='jsonrpc', auth='user', methods=['POST'])
+    def partner_heatmap_data(self, date=None, weeks=1, slot_minutes=60):
+        """
+        Load of the vendor resources per slot over the week(s) starting on the monday of date (YYYY-MM-DD, today by default):
+        {"date_from": "2025-10-06", "days": 7, "slot_minutes": 60,
+         "resources": [{"id": 7, "name": "xxx"}], "load": [[0, 100, 150, ...]]}  (percent of the slot booked, per resource)
+        """
+        user = request.env.user
+        if not user.has_group('bcplanning.group_bc_tasks'):
+            raise AccessDenied()
+        Portal = request.env['bcplanning_portal']
+        vendor = Portal._vendor_of(user)
+        try:
+            weeks = min(max(int(weeks), 1), Portal.HEATMAP_MAX_WEEKS)
+            slot_minutes = int(slot_minutes)
+        except (TypeError, ValueError):
+            raise ValidationError(f"invalid weeks/slot_minutes: {weeks}/{slot_minutes}")
+        if slot_minutes not in Portal.HEATMAP_SLOT_MINUTES:
+            raise ValidationError(f"slot_minutes must be one of {Portal.HEATMAP_SLOT_MINUTES}")
+
+        day = Portal._parse_day(date) or datetime.now().date()
+        monday = day - timedelta(days=day.weekday())
+        resources, load = Portal._occupancy(
+            vendor, datetime.combine(monday, datetime.min.time()), days=7 * weeks, slot_minutes=slot_minutes)
+        return {
+            'date_from': monday.strftime('%Y-%m-%d'),
+            'days': 7 * weeks,
+            'slot_minutes': slot_minutes,
+            'resources': resources,
+            'load': (load * 100).round().astype(int).tolist(),
+        }
+
+    @http.route('/bcplanning/bc_status', type='jsonrpc', auth='user', methods=['POST'])
+    def bc_status(self):
+        """Circuit breaker state, the portal shows a "BC unavailable" notice when BC is degraded."""
+        return request.env['bcplanning_utils']._bc_status()
+
     @http.route('/bcplanningline/save', type='jsonrpc', auth='user', methods=['POST'])
     def save_planningline(self, planningline_id, start_datetime=None, end_datetime=None, resource_id=None):
         """
         Minimal, safe save:
         - Parse inputs, keep old values.
-        - Call external BC update inside try/except to prevent 500.
-        - Only write Odoo fields if BC call returns success (True).
+        - Write Odoo fields, refuse a double booking of the resource and queue the BC update
+          in the outbox (same transaction).
         - Return structured JSON for frontend to restore old values on failure.
         """
         # Basic validation
@@ -478,48 +714,201 @@ class PlanningApiController(http.Controller):
             "description": resource.name if resource else line.planning_line_desc,
         }
 
-        # Call BC safely
+        # Save locally and queue the BC update in the same transaction,
+        # the outbox dispatcher delivers it to BC with retries.
         try:
-            success = request.env['bcplanning_utils'].update_bc_planningline(payload=payload)
-        except Exception as e:
-            _logger.exception("External BC update failed for planningline %s", pl_id)
-            return {
-                'result': f'External update failed: {str(e)}',
-                'old_start_datetime': old_start.strftime('%Y-%m-%dT%H:%M') if old_start else '',
-                'old_end_datetime': old_end.strftime('%Y-%m-%dT%H:%M') if old_end else '',
-                'old_resource_id': old_resource_id,
-                'error': True,
-            }
-
-        # Handle result
-        if success is True:
-            # Only write Odoo fields on BC success
-            try:
+            with request.env.cr.savepoint():
+                vals = {}
                 if start_datetime:
-                    line.sudo().write({'start_datetime': new_start})
+                    vals['start_datetime'] = new_start
                 if end_datetime:
-                    line.sudo().write({'end_datetime': new_end})
+                    vals['end_datetime'] = new_end
                 if resource_id is not None and resource_id != '':
-                    line.sudo().write({'resource_id': int(resource_id)})
-                elif resource_id == "" or resource_id is None:
-                    line.sudo().write({'resource_id': False})
-            except Exception as e:
-                _logger.exception("Failed to write bcplanningline %s after BC success: %s", pl_id, e)
-                # If local write fails, return an error but indicate BC succeeded
-                return {
-                    'result': f'Updated in BC but local save failed: {str(e)}',
-                    'old_start_datetime': old_start.strftime('%Y-%m-%dT%H:%M') if old_start else '',
-                    'old_end_datetime': old_end.strftime('%Y-%m-%dT%H:%M') if old_end else '',
-                    'old_resource_id': old_resource_id,
-                    'error': True,
-                }
-            return {'result': 'updated'}
-        else:
-            # BC returned False (failure) — return old values so frontend can restore
+                    vals['resource_id'] = int(resource_id)
+                else:
+                    vals['resource_id'] = False
+                known = line._overlap_pairs()
+                line.sudo().write(vals)
+                line._check_overlaps(known)
+                request.env['bcoutbox'].sudo()._enqueue('planningline', payload, line)
+        except psycopg2.errors.TransactionRollbackError:
+            # serialization failure or deadlock: let Odoo retry the whole request
+            raise
+        except Exception as e:
+            _logger.exception("Failed to save bcplanningline %s: %s", pl_id, e)
             return {
-                'result': 'Update to BC failed',
+                'result': f'Save failed: {str(e)}',
                 'old_start_datetime': old_start.strftime('%Y-%m-%dT%H:%M') if old_start else '',
                 'old_end_datetime': old_end.strftime('%Y-%m-%dT%H:%M') if old_end else '',
                 'old_resource_id': old_resource_id,
                 'error': True,
             }
+        return {'result': 'updated'}
+
+    # page -> outbox kind, the BOR page updates jobPlanningLinebors
+    SAVE_MANY_PAGES = {
+        'task': 'planningline',
+        'taskresource': 'planningline',
+        'bor': 'planningline_item',
+    }
+
+    @http.route('/bcplanningline/save_many', type='jsonrpc', auth='user', methods=['POST'])
+    def save_planninglines(self, page, edits):
+        """
+        Save many planning line edits of one portal page at once ("Save all changes").
+        page: 'task', 'bor' or 'taskresource'
+        edits: [{"planningline_id": 5, "start_datetime": "2025-10-11T07:00", "end_datetime": ...,
+                 "resource_id": 7 (task), "product_id": 3, "qty": 1, "depth": 2 (bor)}]
+        All edits are validated first; the valid ones are written with one write per distinct
+        value set and queued to BC in the outbox (one $batch); a resource double booking fails
+        the whole save. Requires the group of the page; lines of other vendors (or of other
+        resources on the BOR and task resource pages) are reported as not found. Each line gets the result the
+        single save of its page would return:
+        {"result": "updated" | "partial", "lines": [{"planningline_id": 5, "result": "updated", ...}]}
+        """
+        if page not in self.SAVE_MANY_PAGES:
+            return {'result': f'Unknown page {page}', 'error': True, 'lines': []}
+        group, own_lines, dummy, dummy = self.PORTAL_PAGES[page]
+        user = request.env.user
+        if not user.has_group(group):
+            raise AccessDenied()
+        if not isinstance(edits, list) or not edits:
+            return {'result': 'Nothing to save', 'error': True, 'lines': []}
+
+        PlanningLine = request.env['bcplanningline'].sudo()
+        ids = []
+        for edit in edits:
+            try:
+                ids.append(int(edit.get('planningline_id')))
+            except Exception:
+                pass
+        # only the lines of the user's vendor (and the user's own lines on the BOR and
+        # task resource pages); the other ids are reported as not found
+        vendor = request.env['bcplanning_portal']._vendor_of(user)
+        domain = Domain('id', 'in', ids) & Domain('vendor_id', '=', vendor.id)
+        if own_lines:
+            domain &= Domain('resource_id', '=', user.partner_id.id)
+        lines_by_id = {line.id: line for line in PlanningLine.search(domain)}
+        resource_ids = set(vendor.child_ids.ids) if page == 'task' else set()
+
+        results = {}
+        vals_by_id = {}
+        for edit in edits:
+            try:
+                pl_id = int(edit.get('planningline_id'))
+            except Exception:
+                return {'result': 'Invalid planning line id', 'error': True, 'lines': []}
+            line = lines_by_id.get(pl_id)
+            if not line:
+                results[pl_id] = {'planningline_id': pl_id, 'result': 'Planning line not found', 'error': True}
+                continue
+            try:
+                vals = self._save_many_vals(page, edit)
+                if vals.get('resource_id') and vals['resource_id'] not in resource_ids:
+                    raise ValidationError(f"Resource {vals['resource_id']} not found")
+                vals_by_id[pl_id] = vals
+            except ValidationError as e:
+                results[pl_id] = {'planningline_id': pl_id, 'result': str(e), 'error': True, **self._save_many_old(page, line)}
+
+        # one write per distinct value set
+        groups = {}
+        for pl_id, vals in vals_by_id.items():
+            groups.setdefault(tuple(sorted(vals.items())), []).append(pl_id)
+
+        saved = PlanningLine.browse(list(vals_by_id))
+        old_values = {line.id: self._save_many_old(page, line) for line in saved}
+        try:
+            with request.env.cr.savepoint():
+                known = saved._overlap_pairs()
+                for vals, group_ids in groups.items():
+                    if vals:
+                        PlanningLine.browse(group_ids).write(dict(vals))
+                saved._check_overlaps(known)
+                request.env['bcoutbox'].sudo()._enqueue_many(
+                    self.SAVE_MANY_PAGES[page],
+                    [(line._bc_outbound_payload(page), line) for line in saved],
+                )
+        except psycopg2.errors.TransactionRollbackError:
+            # serialization failure or deadlock: let Odoo retry the whole request
+            raise
+        except Exception as e:
+            _logger.exception("Failed to save bcplanninglines %s: %s", saved.ids, e)
+            for line in saved:
+                results[line.id] = {'planningline_id': line.id, 'result': f'Save failed: {str(e)}', 'error': True, **old_values[line.id]}
+            saved = PlanningLine
+
+        for line in saved:
+            results[line.id] = {'planningline_id': line.id, 'result': 'updated', **self._save_many_new(page, line)}
+
+        lines = [results[pl_id] for pl_id in dict.fromkeys(ids) if pl_id in results]
+        has_error = any(r.get('error') for r in lines)
+        return {
+            'result': ('partial' if saved else 'Update failed') if has_error else 'updated',
+            'error': has_error,
+            'lines': lines,
+        }
+
+    def _save_many_vals(self, page, edit):
+        """bcplanningline values of one edit, raises ValidationError on invalid input."""
+        def parse_datetime(value):
+            for fmt in ('%Y-%m-%dT%H:%M:%S', '%Y-%m-%dT%H:%M', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M'):
+                try:
+                    return datetime.strptime(value, fmt)
+                except (ValueError, TypeError):
+                    continue
+            raise ValidationError(f'Invalid datetime: {value}')
+
+        def parse_number(value, label, cast=float):
+            try:
+                return cast(value)
+            except (ValueError, TypeError):
+                raise ValidationError(f'Invalid {label}: {value}')
+
+        vals = {}
+        if edit.get('start_datetime'):
+            vals['start_datetime'] = parse_datetime(edit['start_datetime'])
+        if edit.get('end_datetime'):
+            vals['end_datetime'] = parse_datetime(edit['end_datetime'])
+        if vals.get('start_datetime') and vals.get('end_datetime') and vals['end_datetime'] < vals['start_datetime']:
+            raise ValidationError('End date/time is before start date/time')
+
+        if page == 'task':
+            resource_id = edit.get('resource_id')
+            vals['resource_id'] = parse_number(resource_id, 'resource', int) if resource_id not in (None, '', False) else False
+        elif page == 'bor':
+            product_id = edit.get('product_id')
+            vals['product_id'] = parse_number(product_id, 'product', int) if product_id not in (None, '', False) else False
+            if edit.get('qty') not in (None, '', False):
+                vals['quantity'] = parse_number(edit['qty'], 'quantity')
+            if edit.get('depth') not in (None, '', False):
+                vals['depth'] = parse_number(edit['depth'], 'depth')
+        return vals
+
+    def _save_many_old(self, page, line):
+        """old_* values of a line, in the format the single save of the page returns."""
+        fmt = '%Y-%m-%dT%H:%M:%S' if page == 'bor' else '%Y-%m-%dT%H:%M'
+        old = {
+            'old_start_datetime': line.start_datetime.strftime(fmt) if line.start_datetime else '',
+            'old_end_datetime': line.end_datetime.strftime(fmt) if line.end_datetime else '',
+        }
+        if page == 'task':
+            old['old_resource_id'] = line.resource_id.id or None
+        elif page == 'bor':
+            old.update({
+                'old_product_id': line.product_id.id or None,
+                'old_qty': line.quantity or 0,
+                'old_depth': line.depth or 0,
+            })
+        return old
+
+    def _save_many_new(self, page, line):
+        """new_* values of a saved line, as returned by the BOR single save."""
+        if page != 'bor':
+            return {}
+        return {
+            'new_start_datetime': line.start_datetime.strftime('%Y-%m-%dT%H:%M:%S') if line.start_datetime else '',
+            'new_end_datetime': line.end_datetime.strftime('%Y-%m-%dT%H:%M:%S') if line.end_datetime else '',
+            'new_pl_product_id': line.product_id.id if line.product_id else False,
+            'new_pl_qty': line.quantity,
+            'new_pl_depth': line.depth,
+        }
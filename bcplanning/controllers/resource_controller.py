@@ -5,6 +5,7 @@ Controller for bcplanning partner resources with linked-user awareness.
 Provides endpoints:
  - GET  /partner/resources            -> render partner resources page (website)
  - POST /partner/resources/data       -> JSONRPC: list resources for vendor (includes has_user/user_id)
+ - POST /partner/resources/free       -> JSONRPC: resources for vendor with availability for a slot, free first
  - POST /partner/resources/create     -> JSONRPC: create res.partner (resource)
  - POST /partner/resources/update     -> JSONRPC: update resource
  - POST /partner/resources/delete     -> JSONRPC: delete resource (safe flow)
@@ -14,9 +15,9 @@ Provides endpoints:
 from odoo import http, _
 from odoo.http import request
 from odoo.exceptions import ValidationError, UserError
+from datetime import datetime
 import logging
 import traceback
-import re
 
 _logger = logging.getLogger(__name__)
 
@@ -48,23 +49,8 @@ class ResourceApiController(http.Controller):
             return False
 
     def _get_group_from_param(self, param_key):
-        """Return res.groups record based on stored config parameter (string id)."""
-        try:
-            val = request.env['ir.config_parameter'].sudo().get_param(param_key)
-            if not val:
-                return None
-            try:
-                gid = int(val)
-            except Exception:
-                m = re.search(r'(\d+)', str(val))
-                gid = int(m.group(1)) if m else None
-            if not gid:
-                return None
-            group = request.env['res.groups'].sudo().browse(gid)
-            return group if group.exists() else None
-        except Exception:
-            _logger.exception("Failed to read group from param %s", param_key)
-            return None
+        """Return res.groups record based on stored config parameter (from the cached settings snapshot)."""
+        return request.env['bcplanning_utils']._get_group(param_key)
 
     def _sync_partner_user_group(self, partner, group_param_key, add=True):
         """
@@ -199,6 +185,27 @@ class ResourceApiController(http.Controller):
             _logger.exception("Error in partner_resources_data: %s", traceback.format_exc())
             return {'ok': False, 'error': _('Failed to load resources.')}
 
+    @http.route('/partner/resources/free', type='jsonrpc', auth='user', methods=['POST'], csrf=False)
+    def partner_resources_free(self, start_datetime=None, end_datetime=None, planningline_id=None):
+        """
+        Resources of the vendor for the resource dropdown of a planning line, free ones first.
+        start_datetime/end_datetime: 'YYYY-MM-DDTHH:MM' (slot [start, end)), planningline_id: line being edited,
+        its own booking does not count.
+        """
+        if not request.env.user.has_group('bcplanning.group_bc_tasks'):
+            return {'ok': False, 'error': _('Access denied.')}
+        vendor = self._get_user_vendor()
+        if not vendor:
+            return {'ok': False, 'error': _('No vendor mapping found for your account.')}
+        try:
+            start = datetime.strptime(start_datetime, '%Y-%m-%dT%H:%M')
+            end = datetime.strptime(end_datetime, '%Y-%m-%dT%H:%M')
+            line = request.env['bcplanningline'].sudo().browse(int(planningline_id)) if planningline_id else None
+        except (TypeError, ValueError):
+            return {'ok': False, 'error': _('Invalid slot.')}
+        resources = request.env['bcplanning_portal'].sudo()._free_resources(vendor, start, end, exclude_line=line)
+        return {'ok': True, 'resources': resources}
+
     # ---------------------------
     # Create / Update / Delete
     # ---------------------------
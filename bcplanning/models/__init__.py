@@ -2,4 +2,11 @@ from . import ir_http
 from . import bcproject
 from . import utils
 from . import res_config_settings
-from . import res_partner
\ No newline at end of file
+from . import res_partner
+from . import bcingest
+from . import bcplanningline_change
+from . import bcoutbox
+from . import bctoken
+from . import bcbreaker
+from . import bcplanning_portal
+from . import product
\ No newline at end of file
@@ -0,0 +1,141 @@
+from odoo import models, fields, api
+from odoo.tools import SQL
+from .utils import BCUnavailableError
+import time
+import logging
+_logger = logging.getLogger(__name__)
+
+BREAKER_FAILURE_THRESHOLD = 5  # consecutive failures that open the breaker
+BREAKER_RESET_TIMEOUT = 60     # seconds the breaker stays open before a trial call
+BREAKER_ENDPOINTS = ('token', 'api')
+BREAKER_CACHE_TTL = 5          # seconds a worker trusts its copy of a breaker row
+
+# process-local copy of the breaker rows: (database, endpoint) -> (failures, opened_at, read at epoch)
+_breaker_cache = {}
+
+
+class bcplanning_breaker(models.Model):
+    """
+    Circuit breaker of a BC endpoint (token: the OAuth login, api: the planning API),
+    shared by all workers so the HTTP workers see what the cron workers ran into.
+    closed: calls go through; after BREAKER_FAILURE_THRESHOLD consecutive failures it opens.
+    open: calls fail fast until BREAKER_RESET_TIMEOUT has passed, then one trial call is let through (half_open).
+    half_open: the trial call closes the breaker on success or opens it again on failure.
+    The row is read and written on its own cursor in READ COMMITTED, so concurrent
+    updates of the same endpoint do not fail with serialization errors. Each worker keeps
+    a copy of the row for BREAKER_CACHE_TTL seconds: while the breaker is closed, a call
+    only touches the table on a failure or on the success that resets earlier failures.
+    """
+    _name = 'bcbreaker'
+    _description = 'bcbreaker'
+    _rec_name = 'key'
+
+    key = fields.Char(string="Endpoint", required=True)
+    failures = fields.Integer(string="Failures")
+    opened_at = fields.Float(string="Opened At") # epoch seconds, 0 while closed
+    trial_at = fields.Float(string="Trial At")   # epoch seconds of the running trial call, 0 when none
+
+    _key_unique = models.UniqueIndex('(key)', 'Only one breaker per endpoint')
+
+    def _cursor(self):
+        cr = self.env.registry.cursor()
+        cr.execute(SQL("SET TRANSACTION ISOLATION LEVEL READ COMMITTED"))
+        return cr
+
+    @api.model
+    def _state(self, opened_at, now):
+        if not opened_at:
+            return 'closed'
+        if now - opened_at >= BREAKER_RESET_TIMEOUT:
+            return 'half_open'
+        return 'open'
+
+    @api.model
+    def _cached(self, key, now):
+        """(failures, opened_at) of key from the process copy, or None when it is too old."""
+        cached = _breaker_cache.get((self.env.cr.dbname, key))
+        if cached and now - cached[2] < BREAKER_CACHE_TTL:
+            return cached[:2]
+        return None
+
+    @api.model
+    def _remember(self, key, failures, opened_at, now):
+        _breaker_cache[(self.env.cr.dbname, key)] = (failures or 0, opened_at or 0, now)
+
+    @api.model
+    def _before_call(self, key):
+        """Raise BCUnavailableError while key is open or its trial call is running."""
+        now = time.time()
+        cached = self._cached(key, now)
+        if cached and self._state(cached[1], now) != 'half_open':
+            if not cached[1]:
+                return
+            raise BCUnavailableError("Business Central is unavailable, try again later")
+        with self._cursor() as cr:
+            cr.execute(SQL("SELECT failures, opened_at FROM bcbreaker WHERE key = %s", key))
+            failures, opened_at = cr.fetchone() or (0, 0)
+            self._remember(key, failures, opened_at, now)
+            state = self._state(opened_at, now)
+            if state == 'closed':
+                return
+            if state == 'half_open':
+                # claim the trial call; a trial of a crashed worker expires after the reset timeout
+                cr.execute(SQL("""
+                    UPDATE bcbreaker SET trial_at = %(now)s
+                     WHERE key = %(key)s AND opened_at > 0 AND opened_at <= %(due)s
+                       AND (trial_at = 0 OR trial_at IS NULL OR trial_at <= %(due)s)
+                """, key=key, now=now, due=now - BREAKER_RESET_TIMEOUT))
+                if cr.rowcount:
+                    return
+        raise BCUnavailableError("Business Central is unavailable, try again later")
+
+    @api.model
+    def _record_success(self, key):
+        now = time.time()
+        if self._cached(key, now) == (0, 0):
+            # closed without failures: successes are the common case, nothing to reset
+            return
+        with self._cursor() as cr:
+            cr.execute(SQL("""
+                UPDATE bcbreaker SET failures = 0, opened_at = 0, trial_at = 0,
+                                     write_uid = %(uid)s, write_date = (now() AT TIME ZONE 'UTC')
+                 WHERE key = %(key)s AND (failures <> 0 OR opened_at <> 0)
+            """, key=key, uid=self.env.uid))
+        self._remember(key, 0, 0, now)
+
+    @api.model
+    def _record_failure(self, key):
+        now = time.time()
+        with self._cursor() as cr:
+            cr.execute(SQL("""
+                INSERT INTO bcbreaker AS b (key, failures, opened_at, trial_at, create_uid, create_date, write_uid, write_date)
+                VALUES (%(key)s, 1, CASE WHEN 1 >= %(threshold)s THEN %(now)s ELSE 0 END, 0,
+                        %(uid)s, (now() AT TIME ZONE 'UTC'), %(uid)s, (now() AT TIME ZONE 'UTC'))
+                ON CONFLICT (key) DO UPDATE
+                   SET failures = b.failures + 1,
+                       trial_at = 0,
+                       opened_at = CASE WHEN b.opened_at > 0 OR b.failures + 1 >= %(threshold)s THEN %(now)s ELSE 0 END,
+                       write_uid = EXCLUDED.write_uid,
+                       write_date = EXCLUDED.write_date
+                RETURNING failures, opened_at
+            """, key=key, now=now, threshold=BREAKER_FAILURE_THRESHOLD, uid=self.env.uid))
+            failures, opened_at = cr.fetchone()
+        self._remember(key, failures, opened_at, now)
+        if failures == BREAKER_FAILURE_THRESHOLD:
+            _logger.warning("BC circuit breaker %s opened after %s failures", key, failures)
+
+    @api.model
+    def _status(self):
+        """{endpoint: {'state', 'failures', 'retry_in'}} for every endpoint."""
+        now = time.time()
+        self.env.cr.execute(SQL("SELECT key, failures, opened_at FROM bcbreaker WHERE key IN %s", BREAKER_ENDPOINTS))
+        rows = {key: (failures, opened_at) for key, failures, opened_at in self.env.cr.fetchall()}
+        status = {}
+        for key in BREAKER_ENDPOINTS:
+            failures, opened_at = rows.get(key, (0, 0))
+            status[key] = {
+                'state': self._state(opened_at, now),
+                'failures': failures or 0,
+                'retry_in': max(0, round(opened_at + BREAKER_RESET_TIMEOUT - now)) if opened_at else 0,
+            }
+        return status
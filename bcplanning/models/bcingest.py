@@ -0,0 +1,186 @@
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+from odoo.tools import SQL
+from datetime import timedelta
+import json
+import uuid
+import psycopg2.errors
+import logging
+_logger = logging.getLogger(__name__)
+
+INGEST_MAX_ATTEMPTS = 5
+INGEST_BACKOFF = 30  # seconds before the first retry, doubled on every next attempt
+
+# errors of the payload itself: retrying cannot help, the ticket fails at once
+INGEST_DATA_ERRORS = (UserError, ValueError, TypeError, KeyError)
+# concurrency errors: the ticket is retried after a backoff
+INGEST_TRANSIENT_ERRORS = (psycopg2.errors.TransactionRollbackError, psycopg2.errors.LockNotAvailable)
+
+# kind -> (model, method) used to process a queued payload
+INGEST_HANDLERS = {
+    'project': ('bcproject', 'projectcreationfrombc'),
+    'planninglines': ('bcplanningline', 'planninglinesfrombc'),
+    'delete': ('bcproject', 'deletionfrombc'),
+}
+
+
+class bcplanning_ingest(models.Model):
+    _name = 'bcingest'
+    _description = 'bcingest'
+    _rec_name = 'ticket'
+    _order = 'id desc'
+
+    ticket = fields.Char(required=True, index=True, copy=False, readonly=True,
+                         default=lambda self: uuid.uuid4().hex)
+    kind = fields.Selection(string="Kind",
+                            selection=[
+                                ('project', 'Project'),
+                                ('planninglines', 'Planning Lines'),
+                                ('delete', 'Delete'),
+                            ], required=True, default='project')
+    state = fields.Selection(string="State",
+                             selection=[
+                                 ('queued', 'Queued'),
+                                 ('done', 'Done'),
+                                 ('failed', 'Failed'),
+                             ], required=True, default='queued', index=True)
+    payload = fields.Text(string="Payload")
+    result = fields.Text(string="Result")
+    error = fields.Text(string="Error")
+    user_id = fields.Many2one('res.users', string="Submitted By", ondelete='set null') # API key user, payload is processed as this user
+    date_done = fields.Datetime(string="Processed On")
+    attempts = fields.Integer(string="Attempts", default=0, readonly=True)
+    next_attempt = fields.Datetime(string="Next Attempt", index=True, readonly=True) # empty: as soon as possible
+
+    @api.model
+    def _enqueue(self, kind, posted_data):
+        """Store a raw BC payload in the staging table, wake up the workers and return the ticket."""
+        ticket = self.sudo().create({
+            'kind': kind,
+            'payload': posted_data if isinstance(posted_data, str) else json.dumps(posted_data),
+            'user_id': self.env.user.id,
+        })
+        for cron in self._worker_crons().filtered('active'):
+            cron._trigger()
+        return ticket
+
+    def _status(self):
+        self.ensure_one()
+        return {
+            'ticket': self.ticket,
+            'kind': self.kind,
+            'state': self.state,
+            'result': json.loads(self.result) if self.result else None,
+            'error': self.error or None,
+        }
+
+    # ---------------------------
+    # Worker
+    # ---------------------------
+    @api.model
+    def _worker_crons(self):
+        return self.env['ir.cron'].sudo().with_context(active_test=False).search([
+            ('model_id.model', '=', self._name),
+            ('code', '=', 'model._cron_process_queue()'),
+        ])
+
+    @api.model
+    def _sync_worker_crons(self, concurrency):
+        """
+        One cron record is one worker lane; keep as many active lanes as the configured concurrency.
+        Lanes claim tickets with FOR UPDATE SKIP LOCKED so they never process the same ticket.
+        """
+        concurrency = max(1, int(concurrency or 1))
+        crons = self._worker_crons().sorted('id')
+        base = self.env.ref('bcplanning.ir_cron_bcingest_process', raise_if_not_found=False) or crons[:1]
+        if not base:
+            return
+        crons = base | (crons - base)
+        while len(crons) < concurrency:
+            crons |= base.copy({'name': f"{base.name} ({len(crons) + 1})"})
+        for idx, cron in enumerate(crons):
+            active = idx < concurrency
+            if cron.active != active:
+                cron.active = active
+
+    @api.model
+    def _cron_process_queue(self, limit=None):
+        """Process due queued tickets one by one, each one in its own transaction."""
+        processed = 0
+        while limit is None or processed < limit:
+            # The row lock is kept while the ticket is processed, other lanes skip it
+            # and a crashed worker leaves the ticket queued.
+            self.env.cr.execute(SQL("""
+                SELECT id FROM bcingest
+                 WHERE state = 'queued'
+                   AND (next_attempt IS NULL OR next_attempt <= %s)
+                 ORDER BY id
+                 LIMIT 1
+                   FOR UPDATE SKIP LOCKED
+            """, fields.Datetime.now()))
+            row = self.env.cr.fetchone()
+            if not row:
+                break
+            self.browse(row[0])._process()
+            self.env.cr.commit()
+            processed += 1
+        return processed
+
+    def _process(self):
+        for ticket in self:
+            model_name, method = INGEST_HANDLERS[ticket.kind]
+            model = self.env[model_name]
+            if ticket.user_id:
+                model = model.with_user(ticket.user_id)
+            try:
+                with self.env.cr.savepoint():
+                    result = getattr(model, method)(json.loads(ticket.payload or '{}'))
+                ticket.write({
+                    'state': 'done',
+                    'result': json.dumps(result),
+                    'date_done': fields.Datetime.now(),
+                })
+            except INGEST_DATA_ERRORS as e:
+                _logger.exception("BC ingest ticket %s failed", ticket.ticket)
+                ticket.write({
+                    'state': 'failed',
+                    'error': str(e),
+                    'date_done': fields.Datetime.now(),
+                })
+            except Exception as e:
+                ticket._retry_later(e)
+
+    def _retry_later(self, error):
+        """Requeue the ticket with an exponential backoff, it fails after INGEST_MAX_ATTEMPTS attempts."""
+        self.ensure_one()
+        attempts = self.attempts + 1
+        if attempts >= INGEST_MAX_ATTEMPTS:
+            _logger.exception("BC ingest ticket %s failed after %s attempts", self.ticket, attempts)
+            self.write({
+                'state': 'failed',
+                'attempts': attempts,
+                'error': str(error),
+                'date_done': fields.Datetime.now(),
+            })
+            return
+        log = _logger.info if isinstance(error, INGEST_TRANSIENT_ERRORS) else _logger.warning
+        log("BC ingest ticket %s will be retried (attempt %s): %s", self.ticket, attempts, error)
+        self.write({
+            'attempts': attempts,
+            'error': str(error),
+            'next_attempt': fields.Datetime.now() + timedelta(seconds=INGEST_BACKOFF * 2 ** (attempts - 1)),
+        })
+
+    @api.model
+    def _cron_prune(self):
+        """Clear the payload and result of the processed tickets older than the configured retention (days)."""
+        days = self.env['bcplanning_utils']._settings().ingest_retention_days
+        self.env.cr.execute(SQL(
+            """
+            UPDATE bcingest SET payload = NULL, result = NULL
+             WHERE state IN ('done', 'failed') AND date_done < %s
+               AND (payload IS NOT NULL OR result IS NOT NULL)
+            """,
+            fields.Datetime.now() - timedelta(days=days),
+        ))
+        _logger.info("Cleared the payload of %s BC ingest tickets older than %s days", self.env.cr.rowcount, days)
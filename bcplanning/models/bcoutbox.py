@@ -0,0 +1,158 @@
+from odoo import models, fields, api
+from odoo.tools import SQL
+from datetime import timedelta
+import json
+from .utils import BCUnavailableError, BATCH_MAX_OPERATIONS
+from .bcbreaker import BREAKER_RESET_TIMEOUT
+import logging
+_logger = logging.getLogger(__name__)
+
+# kind -> BC planning API entity
+OUTBOX_ENTITIES = {
+    'planningline': 'jobPlanningLines',
+    'planningline_item': 'jobPlanningLinebors',
+}
+
+
+class bcplanning_outbox(models.Model):
+    """
+    Transactional outbox of planning line updates for BC. Portal saves write the local change
+    and the outbox row in the same transaction; a cron dispatcher delivers the rows to BC
+    with retries, exponential backoff and dead-lettering.
+    """
+    _name = 'bcoutbox'
+    _description = 'bcoutbox'
+    _order = 'id'
+
+    kind = fields.Selection(string="Kind",
+                            selection=[
+                                ('planningline', 'Planning Line'),
+                                ('planningline_item', 'Planning Line (BOR)'),
+                            ], required=True)
+    planningline_id = fields.Many2one('bcplanningline', string="Planning Line", ondelete='set null', index=True)
+    payload = fields.Json(string="Payload", required=True)
+    state = fields.Selection(string="State",
+                             selection=[
+                                 ('pending', 'Pending'),
+                                 ('done', 'Sent'),
+                                 ('dead', 'Dead Letter'),
+                             ], required=True, default='pending', index=True)
+    attempts = fields.Integer(string="Attempts", default=0)
+    next_attempt = fields.Datetime(string="Next Attempt", default=fields.Datetime.now, index=True)
+    last_error = fields.Text(string="Last Error")
+    date_done = fields.Datetime(string="Sent On")
+
+    @api.model
+    def _enqueue(self, kind, payload, line=None):
+        """
+        Queue a BC update in the current transaction. A pending update of the same
+        planning line is replaced, BC only needs the latest state of the line.
+        """
+        return self._enqueue_many(kind, [(payload, line)])
+
+    @api.model
+    def _enqueue_many(self, kind, entries):
+        """Queue many BC updates at once, entries: [(payload, line or None)]. The dispatcher is triggered once."""
+        line_ids = [line.id for payload, line in entries if line]
+        pending = self.sudo().search([
+            ('kind', '=', kind),
+            ('planningline_id', 'in', line_ids),
+            ('state', '=', 'pending'),
+        ]) if line_ids else self.browse()
+        pending_by_line = {outbox.planningline_id.id: outbox for outbox in pending}
+
+        outboxes = self.browse()
+        to_create = []
+        for payload, line in entries:
+            outbox = pending_by_line.get(line.id) if line else None
+            if outbox:
+                outbox.write({'payload': payload, 'attempts': 0, 'next_attempt': fields.Datetime.now(), 'last_error': False})
+                outboxes |= outbox
+            else:
+                to_create.append({
+                    'kind': kind,
+                    'payload': payload,
+                    'planningline_id': line.id if line else False,
+                })
+        if to_create:
+            outboxes |= self.sudo().create(to_create)
+
+        cron = self.env.ref('bcplanning.ir_cron_bcoutbox_dispatch', raise_if_not_found=False)
+        if cron:
+            cron.sudo()._trigger()
+        return outboxes
+
+    @api.model
+    def _cron_dispatch(self, limit=None):
+        """Send due rows to BC in $batch requests, each batch in its own transaction."""
+        processed = 0
+        while limit is None or processed < limit:
+            if not self.env['bcplanning_utils']._bc_status()['available']:
+                # BC is degraded, leave the queue alone until the breaker lets a trial call through
+                break
+            self.env.cr.execute(SQL("""
+                SELECT id FROM bcoutbox
+                 WHERE state = 'pending' AND next_attempt <= (now() AT TIME ZONE 'UTC')
+                 ORDER BY id
+                 LIMIT %s
+                   FOR UPDATE SKIP LOCKED
+            """, BATCH_MAX_OPERATIONS))
+            ids = [row[0] for row in self.env.cr.fetchall()]
+            if not ids:
+                break
+            self.browse(ids)._send()
+            self.env.cr.commit()
+            processed += len(ids)
+        return processed
+
+    def _send(self):
+        """
+        Send the rows to BC, a single row as a plain POST, more rows as one $batch.
+        The per-operation results of the batch are applied to their own row.
+        """
+        utils = self.env['bcplanning_utils']
+        try:
+            if len(self) == 1:
+                response = utils.post_request(utils._bc_api_url(OUTBOX_ENTITIES[self.kind]), self.payload)
+                results = [(response.status_code, response.text)]
+            else:
+                results = utils.post_batch([(OUTBOX_ENTITIES[outbox.kind], outbox.payload) for outbox in self])
+        except BCUnavailableError as e:
+            # not an attempt: BC was not called
+            self.write({'next_attempt': fields.Datetime.now() + timedelta(seconds=BREAKER_RESET_TIMEOUT), 'last_error': str(e)})
+            return
+        except Exception as e:
+            self._retry_later(str(e))
+            return
+
+        sent = self.browse()
+        for outbox, (status, body) in zip(self, results):
+            if status in (200, 201):
+                sent |= outbox
+            else:
+                body = body if isinstance(body, str) else json.dumps(body)
+                outbox._retry_later(f'HTTP {status}: {body[:1000]}')
+        sent.write({'state': 'done', 'date_done': fields.Datetime.now(), 'last_error': False})
+
+    def _retry_later(self, error):
+        """Reschedule with exponential backoff, or dead-letter after the maximum attempts."""
+        settings = self.env['bcplanning_utils']._settings()
+        max_attempts = settings.outbox_max_attempts
+        backoff = settings.outbox_backoff
+        for outbox in self:
+            attempts = outbox.attempts + 1
+            vals = {'attempts': attempts, 'last_error': error}
+            if attempts >= max_attempts:
+                vals['state'] = 'dead'
+                _logger.error("BC outbox %s dead-lettered after %s attempts: %s", outbox.id, attempts, error)
+            else:
+                # 30s, 60s, 120s, ... capped at one day
+                delay = min(backoff * 2 ** (attempts - 1), 86400)
+                vals['next_attempt'] = fields.Datetime.now() + timedelta(seconds=delay)
+                _logger.warning("BC outbox %s failed (attempt %s), retry in %ss: %s", outbox.id, attempts, delay, error)
+            outbox.write(vals)
+
+    def action_retry(self):
+        """Put dead-lettered rows back in the queue."""
+        self.write({'state': 'pending', 'attempts': 0, 'next_attempt': fields.Datetime.now()})
+        self.env.ref('bcplanning.ir_cron_bcoutbox_dispatch')._trigger()
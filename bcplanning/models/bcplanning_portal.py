@@ -0,0 +1,529 @@
+from odoo import models, api
+from odoo.exceptions import ValidationError
+from odoo.fields import Domain
+from odoo.tools import SQL, ormcache
+from bisect import bisect_left
+from collections import OrderedDict
+from datetime import datetime, time, timedelta
+import copy
+import numpy as np
+import threading
+import logging
+_logger = logging.getLogger(__name__)
+
+PLANNING_CACHE_SIZE = 512  # view models kept per worker
+
+# process-local LRU of view models: key -> (stamp version, view model), see _vendor_planning
+_planning_cache = OrderedDict()
+_planning_cache_lock = threading.Lock()
+PLANNING_CACHE_STATS = {'hits': 0, 'misses': 0}
+
+
+class bcplanning_portal(models.AbstractModel):
+    """
+    Vendor planning queries shared by the portal pages (/partner/tasks, /partner/bor, /partner/taskresource).
+    Runs with the access rights of the env user, call it on request.env.
+    """
+    _name = 'bcplanning_portal'
+    _description = 'bcplanning_portal'
+
+    PAGE_SIZE = 200  # planning lines per page of the "all dates" views
+    HEATMAP_SLOT_MINUTES = (15, 30, 60)
+    HEATMAP_MAX_WEEKS = 4
+
+    # append-only log of (vendor, start date) stamps of the planning lines, see init
+    _stamp_table = 'bcplanning_planning_stamp'
+    _stamp_sequence = 'bcplanning_planning_stamp_seq'
+
+    # keyset order of the paged views, see _cursor_domain
+    _page_order = 'start_datetime asc nulls last, id'
+
+    _line_fields = [
+        'task_id', 'planning_line_no', 'planning_line_desc', 'resource_id',
+        'start_datetime', 'end_datetime', 'product_id', 'quantity', 'depth',
+    ]
+
+    def init(self):
+        """
+        Stamp log appended to by triggers on bcplanningline, bctask and bcproject, so that every
+        change (ORM, BC upserts in plain SQL, cascades) invalidates the cached view models it affects:
+        - a line stamps its vendor for its old and new start date ('-infinity' without one);
+        - a change of the task of the line also stamps, for all dates, every vendor having lines
+          on the task, whose number, description and earliest start are shown;
+        - a task or a project stamps the vendors and start dates of all its lines.
+        Stamps are only inserted, with a version drawn from a sequence: concurrent writers never
+        wait for or conflict on the same row. A cached view model is valid as long as the
+        max(version) and count of its stamps are unchanged; the count catches a transaction that
+        drew a lower version but committed later. _compact_stamps keeps the log small.
+        """
+        cr = self.env.cr
+        table = SQL.identifier(self._stamp_table)
+        cr.execute(SQL("CREATE SEQUENCE IF NOT EXISTS %s", SQL.identifier(self._stamp_sequence)))
+        cr.execute(SQL("""
+            CREATE TABLE IF NOT EXISTS %(table)s (
+                vendor_id integer NOT NULL,
+                day date NOT NULL,
+                version bigint NOT NULL DEFAULT nextval(%(sequence)s)
+            );
+            ALTER TABLE %(table)s DROP CONSTRAINT IF EXISTS %(pkey)s;
+            ALTER TABLE %(table)s ALTER COLUMN version SET DEFAULT nextval(%(sequence)s);
+            CREATE INDEX IF NOT EXISTS %(index)s ON %(table)s (vendor_id, day, version);
+            """,
+            table=table,
+            sequence=self._stamp_sequence,
+            pkey=SQL.identifier(f'{self._stamp_table}_pkey'),
+            index=SQL.identifier(f'{self._stamp_table}_vendor_day_index'),
+        ))
+        cr.execute(SQL("""
+            CREATE OR REPLACE FUNCTION bcplanning_planning_stamp_bump(vendors integer[], starts timestamp[], task_ids integer[])
+            RETURNS void LANGUAGE sql AS $$
+                INSERT INTO %(table)s (vendor_id, day)
+                SELECT vendor_id, day FROM (
+                    SELECT v AS vendor_id, COALESCE(st::date, '-infinity'::date) AS day FROM unnest(vendors, starts) AS u(v, st)
+                     UNION
+                    SELECT l.vendor_id, '-infinity'::date FROM bcplanningline l WHERE l.task_id = ANY(task_ids)
+                ) keys
+                 WHERE vendor_id IS NOT NULL
+            $$
+            """, table=table))
+        cr.execute(SQL("""
+            CREATE OR REPLACE FUNCTION bcplanning_planning_stamp_lines() RETURNS trigger LANGUAGE plpgsql AS $$
+            BEGIN
+                IF TG_OP <> 'INSERT' THEN
+                    PERFORM bcplanning_planning_stamp_bump(
+                        ARRAY(SELECT vendor_id FROM old_rows ORDER BY id),
+                        ARRAY(SELECT start_datetime FROM old_rows ORDER BY id),
+                        ARRAY(SELECT DISTINCT task_id FROM old_rows));
+                END IF;
+                IF TG_OP <> 'DELETE' THEN
+                    PERFORM bcplanning_planning_stamp_bump(
+                        ARRAY(SELECT vendor_id FROM new_rows ORDER BY id),
+                        ARRAY(SELECT start_datetime FROM new_rows ORDER BY id),
+                        ARRAY(SELECT DISTINCT task_id FROM new_rows));
+                END IF;
+                RETURN NULL;
+            END
+            $$;
+            CREATE OR REPLACE FUNCTION bcplanning_planning_stamp_tasks() RETURNS trigger LANGUAGE plpgsql AS $$
+            BEGIN
+                PERFORM bcplanning_planning_stamp_bump(
+                    ARRAY(SELECT l.vendor_id FROM bcplanningline l JOIN new_rows t ON t.id = l.task_id ORDER BY l.id),
+                    ARRAY(SELECT l.start_datetime FROM bcplanningline l JOIN new_rows t ON t.id = l.task_id ORDER BY l.id),
+                    ARRAY[]::integer[]);
+                RETURN NULL;
+            END
+            $$;
+            CREATE OR REPLACE FUNCTION bcplanning_planning_stamp_projects() RETURNS trigger LANGUAGE plpgsql AS $$
+            BEGIN
+                PERFORM bcplanning_planning_stamp_bump(
+                    ARRAY(SELECT l.vendor_id FROM bcplanningline l JOIN new_rows p ON p.id = l.job_id ORDER BY l.id),
+                    ARRAY(SELECT l.start_datetime FROM bcplanningline l JOIN new_rows p ON p.id = l.job_id ORDER BY l.id),
+                    ARRAY[]::integer[]);
+                RETURN NULL;
+            END
+            $$;
+
+            DROP TRIGGER IF EXISTS bcplanning_planning_stamp_insert ON bcplanningline;
+            DROP TRIGGER IF EXISTS bcplanning_planning_stamp_update ON bcplanningline;
+            DROP TRIGGER IF EXISTS bcplanning_planning_stamp_delete ON bcplanningline;
+            DROP TRIGGER IF EXISTS bcplanning_planning_stamp_update ON bctask;
+            DROP TRIGGER IF EXISTS bcplanning_planning_stamp_update ON bcproject;
+            CREATE TRIGGER bcplanning_planning_stamp_insert AFTER INSERT ON bcplanningline
+                REFERENCING NEW TABLE AS new_rows
+                FOR EACH STATEMENT EXECUTE FUNCTION bcplanning_planning_stamp_lines();
+            CREATE TRIGGER bcplanning_planning_stamp_update AFTER UPDATE ON bcplanningline
+                REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+                FOR EACH STATEMENT EXECUTE FUNCTION bcplanning_planning_stamp_lines();
+            CREATE TRIGGER bcplanning_planning_stamp_delete AFTER DELETE ON bcplanningline
+                REFERENCING OLD TABLE AS old_rows
+                FOR EACH STATEMENT EXECUTE FUNCTION bcplanning_planning_stamp_lines();
+            CREATE TRIGGER bcplanning_planning_stamp_update AFTER UPDATE ON bctask
+                REFERENCING NEW TABLE AS new_rows
+                FOR EACH STATEMENT EXECUTE FUNCTION bcplanning_planning_stamp_tasks();
+            CREATE TRIGGER bcplanning_planning_stamp_update AFTER UPDATE ON bcproject
+                REFERENCING NEW TABLE AS new_rows
+                FOR EACH STATEMENT EXECUTE FUNCTION bcplanning_planning_stamp_projects();
+            """))
+
+    @api.model
+    def _vendor_of(self, user):
+        """Vendor of a portal user: the parent company of its contact, or the contact itself."""
+        return (user.partner_id.parent_id or user.partner_id).sudo()
+
+    @api.model
+    def _date_window(self, date_str=None, no_date=False, range_from=None, range_to=None):
+        """
+        Date filter of the pages:
+        - date_str (YYYY-MM-DD) -> that date (today when invalid)
+        - range_from and/or range_to (YYYY-MM-DD, inclusive) -> that range, e.g. a week or a month
+        - no_date -> no filter
+        - none of them -> today
+        Returns (selected_date or None, date_from or None, date_to or None),
+        selected_date is only set for a single date.
+        """
+        if date_str:
+            selected_date = self._parse_day(date_str) or datetime.now().date()
+        elif self._parse_day(range_from) or self._parse_day(range_to):
+            day_from, day_to = self._parse_day(range_from), self._parse_day(range_to)
+            if day_from and day_to and day_from > day_to:
+                raise ValidationError(f"Invalid date range: {range_from} - {range_to}")
+            return (
+                None,
+                datetime.combine(day_from, time.min) if day_from else None,
+                datetime.combine(day_to, time(23, 59, 59)) if day_to else None,
+            )
+        elif no_date:
+            return None, None, None
+        else:
+            selected_date = datetime.now().date()
+        return selected_date, datetime.combine(selected_date, time.min), datetime.combine(selected_date, time(23, 59, 59))
+
+    @api.model
+    def _parse_day(self, value):
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except (TypeError, ValueError):
+            return None
+
+    @api.model
+    def _date_label(self, date_from, date_to):
+        """Label of a date window on the pages: the date, 'from - to' for a range, '' for all dates."""
+        day_from = date_from.strftime('%Y-%m-%d') if date_from else ''
+        day_to = date_to.strftime('%Y-%m-%d') if date_to else ''
+        if day_from == day_to:
+            return day_from
+        return f"{day_from} - {day_to}".strip()
+
+    @api.model
+    def _vendor_planning(self, vendor, resource=None, job=None, date_from=None, date_to=None, cursor=None, limit=None):
+        """
+        View models of _build_vendor_planning, cached per worker by vendor, resource, project,
+        date window and page. An entry is valid as long as the stamps of its vendor and day
+        (or of the vendor as a whole for the "all dates" views) are unchanged.
+        Pages filtering on the same resource share their entries.
+        """
+        self.env['bcplanningline'].browse().check_access('read')
+        single_day = date_from and date_to and date_from.date() == date_to.date()
+        if (date_from or date_to) and not single_day:
+            return self._build_vendor_planning(vendor, resource, job, date_from, date_to, cursor, limit)
+
+        where = SQL("vendor_id = %s", vendor.id)
+        if single_day:
+            where = SQL("%s AND day = %s", where, date_from.date())
+        self.env.cr.execute(SQL(
+            "SELECT max(version), count(*) FROM %s WHERE %s",
+            SQL.identifier(self._stamp_table), where,
+        ))
+        version = tuple(self.env.cr.fetchone())
+        key = (
+            self.env.cr.dbname, vendor.id, resource.id if resource else None, job.id if job else None,
+            date_from, date_to, cursor, limit,
+        )
+        with _planning_cache_lock:
+            entry = _planning_cache.get(key)
+            if entry and entry[0] == version:
+                _planning_cache.move_to_end(key)
+                PLANNING_CACHE_STATS['hits'] += 1
+                return copy.deepcopy(entry[1])
+            PLANNING_CACHE_STATS['misses'] += 1
+
+        planning = self._build_vendor_planning(vendor, resource, job, date_from, date_to, cursor, limit)
+        with _planning_cache_lock:
+            _planning_cache[key] = (version, copy.deepcopy(planning))
+            _planning_cache.move_to_end(key)
+            while len(_planning_cache) > PLANNING_CACHE_SIZE:
+                _planning_cache.popitem(last=False)
+        return planning
+
+    @api.model
+    def _compact_stamps(self):
+        """
+        Replace the stamps of every (vendor, day) with more than one by a single new one.
+        The new stamp has a higher version, so cached entries of the compacted keys are
+        rebuilt once; stamps of transactions not yet committed are left alone.
+        """
+        self.env.cr.execute(SQL("""
+            WITH keys AS (
+                SELECT vendor_id, day, max(version) AS version FROM %(table)s
+                 GROUP BY vendor_id, day HAVING count(*) > 1
+            ), gone AS (
+                DELETE FROM %(table)s s USING keys k
+                 WHERE s.vendor_id = k.vendor_id AND s.day = k.day AND s.version <= k.version
+                RETURNING s.vendor_id, s.day
+            )
+            INSERT INTO %(table)s (vendor_id, day) SELECT DISTINCT vendor_id, day FROM gone
+            """, table=SQL.identifier(self._stamp_table)))
+        _logger.info("Compacted planning stamps into %s rows", self.env.cr.rowcount)
+
+    @api.model
+    def _planning_cache_stats(self):
+        lookups = PLANNING_CACHE_STATS['hits'] + PLANNING_CACHE_STATS['misses']
+        return {
+            **PLANNING_CACHE_STATS,
+            'size': len(_planning_cache),
+            'hit_rate': round(PLANNING_CACHE_STATS['hits'] / lookups, 4) if lookups else None,
+        }
+
+    @api.model
+    def _planning_domain(self, vendor, resource=None, job=None, date_from=None, date_to=None):
+        """Planning lines of the vendor, optionally of one resource, one project and a start date window."""
+        domain = Domain('vendor_id', '=', vendor.id)
+        if resource:
+            domain &= Domain('resource_id', '=', resource.id)
+        if job:
+            domain &= Domain('job_id', '=', job.id)
+        if date_from:
+            domain &= Domain('start_datetime', '>=', date_from)
+        if date_to:
+            domain &= Domain('start_datetime', '<=', date_to)
+        return domain
+
+    @api.model
+    def _build_vendor_planning(self, vendor, resource=None, job=None, date_from=None, date_to=None, cursor=None, limit=None):
+        """
+        All planning lines of the vendor (optionally of one resource, one project and a
+        start date window) in one query, grouped in memory into the view models of the pages:
+        {
+            'tasks': [{'id', 'task_no', 'task_desc', 'job_no', 'planningline_count', 'planninglines', 'earliest_start'}],
+            'next_cursor': str or None,
+            'has_more': bool,
+        }
+        With a limit, lines are paged by keyset on (start_datetime, id): pass next_cursor
+        back as cursor for the next page.
+        """
+        domain = self._planning_domain(vendor, resource, job, date_from, date_to)
+        PlanningLine = self.env['bcplanningline']
+        has_more = False
+        if limit:
+            if cursor:
+                domain &= self._cursor_domain(cursor)
+            lines = PlanningLine.search_fetch(domain, self._line_fields, order=self._page_order, limit=limit + 1)
+            has_more = len(lines) > limit
+            lines = lines[:limit]
+        else:
+            lines = PlanningLine.search_fetch(domain, self._line_fields, order='task_id, id')
+
+        tasks = {}
+        for pl in lines:
+            task = pl.task_id
+            if task.id not in tasks:
+                tasks[task.id] = {
+                    'id': task.id,
+                    'task_no': task.task_no,
+                    'task_desc': task.task_desc,
+                    'job_no': task.job_id.job_no,
+                    'planningline_count': 0,
+                    'planninglines': [],
+                    'earliest_start': False,
+                    'fallback_start': task.earliest_start_datetime or False,
+                }
+            task_vals = tasks[task.id]
+            task_vals['planninglines'].append({
+                'id': pl.id,
+                'pl_no': pl.planning_line_no,
+                'pl_desc': pl.planning_line_desc,
+                'pl_resource_id': pl.resource_id.id if pl.resource_id else None,
+                'pl_start_datetime': pl.start_datetime,
+                'pl_end_datetime': pl.end_datetime,
+                'pl_product_id': pl.product_id.id if pl.product_id else None,
+                'pl_qty': pl.quantity,
+                'pl_depth': pl.depth,
+            })
+            task_vals['planningline_count'] += 1
+            if pl.start_datetime and (not task_vals['earliest_start'] or pl.start_datetime < task_vals['earliest_start']):
+                task_vals['earliest_start'] = pl.start_datetime
+
+        for task_vals in tasks.values():
+            # earliest among the shown (filtered) lines, else the one stored on the task
+            fallback = task_vals.pop('fallback_start')
+            task_vals['earliest_start'] = task_vals['earliest_start'] or fallback
+        return {
+            'tasks': list(tasks.values()),
+            'next_cursor': self._cursor_of(lines[-1]) if has_more else None,
+            'has_more': has_more,
+        }
+
+    @api.model
+    def _tasks_json(self, tasks):
+        """Task view models of _build_vendor_planning with their datetimes as 'YYYY-MM-DDTHH:MM:SS', for the JSON routes."""
+        def fmt(value):
+            return value.strftime('%Y-%m-%dT%H:%M:%S') if value else None
+
+        return [dict(
+            task,
+            earliest_start=fmt(task['earliest_start']),
+            planninglines=[dict(
+                line,
+                pl_start_datetime=fmt(line['pl_start_datetime']),
+                pl_end_datetime=fmt(line['pl_end_datetime']),
+            ) for line in task['planninglines']],
+        ) for task in tasks]
+
+    @api.model
+    def _vendor_overlaps(self, vendor):
+        """Double bookings of the resources of the vendor from now on, for the badge of the pages."""
+        overlaps = self.env['bcplanningline']._find_overlaps([
+            ('vendor_id', '=', vendor.id), ('end_datetime', '>', datetime.now()),
+        ])
+        return [{
+            'resource': line.resource_id.sudo().name,
+            'line': line.planning_line_no or line.id,
+            'other_line': other.planning_line_no or other.id,
+            'start': start.strftime('%Y-%m-%d %H:%M'),
+            'end': end.strftime('%Y-%m-%d %H:%M'),
+        } for line, other, start, end in overlaps]
+
+    @api.model
+    def _free_resources(self, vendor, start, end, exclude_line=None):
+        """
+        Resources (active contacts) of the vendor with their availability for the slot
+        [start, end), free ones first. The booked resources are found with the GiST index on
+        the booking range of the lines, so the history of the resources is never scanned.
+        Returns [{'id', 'name', 'free'}].
+        """
+        PlanningLine = self.env['bcplanningline']
+        self.env.cr.execute(SQL("""
+            WITH booked AS (
+                SELECT DISTINCT resource_id FROM %(lines)s
+                 WHERE %(where)s
+                   AND %(booking)s && tsrange(%(start)s, %(end)s, '[)')
+                   AND id != %(exclude)s
+            )
+            SELECT p.id, p.name, booked.resource_id IS NULL AS free
+              FROM res_partner p
+              LEFT JOIN booked ON booked.resource_id = p.id
+             WHERE p.parent_id = %(vendor)s AND p.active
+             ORDER BY free DESC, p.name, p.id
+            """,
+            lines=SQL.identifier(PlanningLine._table),
+            where=PlanningLine._booking_range_where,
+            booking=PlanningLine._booking_range,
+            start=start,
+            end=max(start, end),
+            exclude=exclude_line.id if exclude_line else 0,
+            vendor=vendor.id,
+        ))
+        return [{'id': pid, 'name': name, 'free': free} for pid, name, free in self.env.cr.fetchall()]
+
+    @api.model
+    def _occupancy(self, vendor, date_from, days=7, slot_minutes=60):
+        """
+        Load of each resource (active contact) of the vendor per slot of slot_minutes over
+        [date_from, date_from + days): booked minutes / slot_minutes, above 1 when double booked.
+        The booked lines come from one query on the booking range index; they are binned with
+        numpy: whole slots through a difference array, the partial first and last slots with
+        np.add.at, so the cost does not grow with the length of the lines.
+        Returns (resources [{'id', 'name'}], load ndarray of shape (resources, slots)).
+        """
+        resources = [{'id': contact.id, 'name': contact.name} for contact in vendor.sudo().child_ids.sorted('name')]
+        n_slots = days * 24 * 60 // slot_minutes
+        load = np.zeros((len(resources), n_slots))
+        if not resources:
+            return resources, load
+
+        date_to = date_from + timedelta(days=days)
+        PlanningLine = self.env['bcplanningline']
+        self.env.cr.execute(SQL("""
+            SELECT resource_id,
+                   EXTRACT(EPOCH FROM greatest(start_datetime, %(date_from)s) - %(date_from)s) / 60,
+                   EXTRACT(EPOCH FROM least(end_datetime, %(date_to)s) - %(date_from)s) / 60
+              FROM %(lines)s
+             WHERE %(where)s
+               AND %(booking)s && tsrange(%(date_from)s, %(date_to)s, '[)')
+               AND resource_id = ANY(%(resource_ids)s)
+            """,
+            lines=SQL.identifier(PlanningLine._table),
+            where=PlanningLine._booking_range_where,
+            booking=PlanningLine._booking_range,
+            date_from=date_from,
+            date_to=date_to,
+            resource_ids=[resource['id'] for resource in resources],
+        ))
+        booked = np.array(self.env.cr.fetchall(), dtype=float).reshape(-1, 3)
+        booked = booked[booked[:, 2] > booked[:, 1]]
+        if not len(booked):
+            return resources, load
+
+        ids = np.array([resource['id'] for resource in resources])
+        sorter = np.argsort(ids)
+        rows = sorter[np.searchsorted(ids, booked[:, 0].astype(int), sorter=sorter)]
+        start, end = booked[:, 1], booked[:, 2]
+        first = (start // slot_minutes).astype(int)
+        last = (end // slot_minutes).astype(int)  # == n_slots for a line running to the end
+
+        # minutes per slot, one extra slot for the lines ending on the window end
+        minutes = np.zeros((len(resources), n_slots + 1))
+        single = first == last
+        np.add.at(minutes, (rows[single], first[single]), end[single] - start[single])
+        multi = ~single
+        rows, first, last, start, end = rows[multi], first[multi], last[multi], start[multi], end[multi]
+        # whole slots first + 1 .. last - 1
+        diff = np.zeros_like(minutes)
+        np.add.at(diff, (rows, first + 1), slot_minutes)
+        np.add.at(diff, (rows, last), -slot_minutes)
+        minutes += np.cumsum(diff, axis=1)
+        # partial first and last slots
+        np.add.at(minutes, (rows, first), (first + 1) * slot_minutes - start)
+        np.add.at(minutes, (rows, last), end - last * slot_minutes)
+        return resources, minutes[:, :n_slots] / slot_minutes
+
+    @api.model
+    def _cursor_of(self, line):
+        start = line.start_datetime.strftime('%Y-%m-%dT%H:%M:%S') if line.start_datetime else ''
+        return f'{start}|{line.id}'
+
+    @api.model
+    def _cursor_domain(self, cursor):
+        """Lines after cursor in (start_datetime asc nulls last, id) order."""
+        try:
+            start, last_id = cursor.split('|')
+            last_id = int(last_id)
+            start = datetime.strptime(start, '%Y-%m-%dT%H:%M:%S') if start else None
+        except (AttributeError, ValueError):
+            raise ValidationError(f"Invalid cursor: {cursor}")
+        if start is None:
+            return Domain('start_datetime', '=', False) & Domain('id', '>', last_id)
+        return Domain.OR([
+            Domain('start_datetime', '>', start),
+            Domain('start_datetime', '=', start) & Domain('id', '>', last_id),
+            Domain('start_datetime', '=', False),
+        ])
+
+    @api.model
+    def _page_values(self, page, vendor):
+        """
+        Values of the editors of a page: resources (contacts of the vendor) for the task page,
+        product names by id for the BOR page (products are picked with /partner/products/search).
+        """
+        if page == 'task':
+            return {'resources': [{'id': contact.id, 'name': contact.name} for contact in vendor.sudo().child_ids]}
+        if page == 'bor':
+            return {'product_names': self._product_names()}
+        return {}
+
+    @ormcache('self.env.lang')
+    def _product_catalog(self):
+        """
+        Active service products as ((lowercase name, id, name), ...) sorted by lowercase name,
+        the prefix index of _product_search, per language of the names. Cleared when a
+        catalog product changes (see product.py).
+        """
+        products = self.env['product.product'].sudo().search_fetch(
+            [('product_tmpl_id.type', '=', 'service'), ('active', '=', True)], ['name'])
+        return tuple(sorted(((prod.name or '').lower(), prod.id, prod.name or '') for prod in products))
+
+    @ormcache('self.env.lang')
+    def _product_names(self):
+        return {pid: name for dummy, pid, name in self._product_catalog()}
+
+    @api.model
+    def _product_search(self, term, limit=20):
+        """Catalog products whose name starts with term (case insensitive), by name: [{'id', 'name'}]."""
+        catalog = self._product_catalog()
+        prefix = (term or '').strip().lower()
+        result = []
+        for key, pid, name in catalog[bisect_left(catalog, (prefix,)):]:
+            if not key.startswith(prefix) or len(result) >= limit:
+                break
+            result.append({'id': pid, 'name': name})
+        return result
@@ -0,0 +1,121 @@
+from odoo import models, fields, api
+from odoo.tools import SQL
+from datetime import datetime, date, timedelta
+import logging
+_logger = logging.getLogger(__name__)
+
+
+class _BigInteger(fields.Integer):
+    """Integer stored as bigint, for values fed by a sequence that may exceed int4."""
+    column_type = ('int8', 'int8')
+
+
+class bcplanning_line_change(models.Model):
+    """
+    Change log of bcplanningline mutations made in Odoo (portal edits), pulled by BC
+    through /planning/changes. Changes received from BC itself are not logged.
+    """
+    _name = 'bcplanninglinechange'
+    _description = 'bcplanninglinechange'
+    _order = 'cursor, id'
+
+    cursor = _BigInteger(string="Cursor", index=True, readonly=True, copy=False) # assigned once committed, see _assign_cursors
+    operation = fields.Selection(string="Operation",
+                                 selection=[
+                                     ('create', 'Create'),
+                                     ('write', 'Update'),
+                                     ('unlink', 'Delete'),
+                                 ], required=True)
+    planningline_id = fields.Integer(string="Planning Line Id", index=True) # plain integer, the line may be deleted
+    job_no = fields.Char(string="Job No.")
+    task_no = fields.Char(string="Task No.")
+    planning_line_lineno = fields.Integer(string="Line No.")
+    values = fields.Json(string="Values")
+
+    _cursor_sequence = 'bcplanninglinechange_cursor_seq'
+
+    def init(self):
+        self.env.cr.execute(SQL("CREATE SEQUENCE IF NOT EXISTS %s", SQL.identifier(self._cursor_sequence)))
+
+    @api.model
+    def _log(self, operation, lines, fnames=()):
+        """Log one change row per planning line with the current values of the changed fnames."""
+        if not lines or self.env.context.get('bcplanning_from_bc'):
+            return
+        fnames = [fname for fname in fnames if fname in lines._change_log_fields]
+        if operation == 'write' and not fnames:
+            return
+        self.sudo().create([{
+            'operation': operation,
+            'planningline_id': line.id,
+            'job_no': line.task_id.job_id.job_no,
+            'task_no': line.task_id.task_no,
+            'planning_line_lineno': line.planning_line_lineno,
+            'values': {fname: self._serialize(line[fname]) for fname in fnames},
+        } for line in lines.sudo()])
+
+    @api.model
+    def _serialize(self, value):
+        if isinstance(value, datetime):
+            return value.strftime('%Y-%m-%dT%H:%M:%S')
+        if isinstance(value, date):
+            return value.strftime('%Y-%m-%d')
+        if isinstance(value, models.BaseModel):
+            return value.id or None
+        return value if value is not False else None
+
+    @api.model
+    def _assign_cursors(self):
+        """
+        Number the committed rows that have no cursor yet. Rows only get a cursor once their
+        transaction is committed and visible here, so a cursor handed out to BC is never
+        followed by a row with a lower one: the feed is monotonic.
+        """
+        self.env.cr.execute(SQL("SELECT pg_advisory_xact_lock(hashtext(%s))", self._name))
+        self.env.cr.execute(SQL(
+            "UPDATE %s SET cursor = nextval(%s) WHERE cursor IS NULL",
+            SQL.identifier(self._table), self._cursor_sequence,
+        ))
+        self.invalidate_model(['cursor'])
+
+    @api.model
+    def _feed(self, since=0, limit=500):
+        """Return a page of changes after cursor since, as compact JSON rows."""
+        self._assign_cursors()
+        changes = self.sudo().search_fetch(
+            [('cursor', '>', since)],
+            ['cursor', 'operation', 'planningline_id', 'job_no', 'task_no', 'planning_line_lineno', 'values', 'create_date'],
+            order='cursor', limit=limit + 1,
+        )
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+        rows = [{
+            'cursor': change.cursor,
+            'op': change.operation,
+            'id': change.planningline_id,
+            'job_no': change.job_no,
+            'task_no': change.task_no,
+            'line_no': change.planning_line_lineno,
+            'values': change.values or {},
+            'at': change.create_date.strftime('%Y-%m-%dT%H:%M:%S'),
+        } for change in changes]
+        return {
+            'changes': rows,
+            'next_cursor': rows[-1]['cursor'] if rows else since,
+            'has_more': has_more,
+        }
+
+    @api.model
+    def _cron_prune(self):
+        """
+        Remove change rows older than the configured retention (days). Cursors are assigned
+        first, so committed rows that were never numbered by a feed call are pruned as well.
+        """
+        days = self.env['bcplanning_utils']._settings().changes_retention_days
+        limit_date = fields.Datetime.now() - timedelta(days=days)
+        self._assign_cursors()
+        self.env.cr.execute(SQL(
+            "DELETE FROM %s WHERE create_date < %s",
+            SQL.identifier(self._table), limit_date,
+        ))
+        _logger.info("Pruned %s planning line change rows older than %s days", self.env.cr.rowcount, days)
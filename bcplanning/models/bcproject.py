@@ -1,9 +1,75 @@
 from odoo import models, fields, api
 from odoo.exceptions import ValidationError
+from odoo.tools import SQL
 import json
+import hashlib
+import heapq
 from odoo.fields import Domain
 from datetime import datetime
 
+
+def _bc_fingerprint(vals):
+    """Stable hash of the BC-sourced values of a record, used to skip no-op updates."""
+    return hashlib.sha1(json.dumps(vals, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _bc_upsert_rows(model, conflict_fields, rows):
+    """
+    Insert or update rows (dicts with the same keys, bc_fingerprint included) into the table
+    of model with a single INSERT ... ON CONFLICT statement. The unique index on
+    conflict_fields decides between insert and update; a row whose bc_fingerprint is
+    unchanged is left untouched.
+    Returns [(id, key tuple, 'created' | 'updated' | 'skipped')] for every distinct key.
+    """
+    columns = list(rows[0])
+    table = SQL.identifier(model._table)
+    now = SQL("(now() AT TIME ZONE 'UTC')")
+    uid = model.env.uid
+
+    def _value(value):
+        return SQL("%s", None if value is False else value)
+
+    values = SQL(", ").join(
+        SQL("(%s, %s, %s, %s, %s)", SQL(", ").join(_value(row[col]) for col in columns), uid, now, uid, now)
+        for row in rows
+    )
+    keys = SQL(", ").join(
+        SQL("(%s)", SQL(", ").join(_value(row[col]) for col in conflict_fields))
+        for row in rows
+    )
+    key_columns = SQL(", ").join(SQL.identifier(col) for col in conflict_fields)
+    target_keys = SQL(", ").join(SQL.identifier('t', col) for col in conflict_fields)
+    updates = SQL(", ").join(
+        SQL("%s = EXCLUDED.%s", SQL.identifier(col), SQL.identifier(col))
+        for col in columns + ['write_uid', 'write_date'] if col not in conflict_fields
+    )
+    # The final SELECT runs on the snapshot taken before the INSERT: it only sees the
+    # rows that already existed, the ones left untouched by the upsert are the skipped ones.
+    model.env.cr.execute(SQL("""
+        WITH upsert AS (
+            INSERT INTO %(table)s AS t (%(columns)s, create_uid, create_date, write_uid, write_date)
+            VALUES %(values)s
+            ON CONFLICT (%(key_columns)s) DO UPDATE SET %(updates)s
+             WHERE t.bc_fingerprint IS DISTINCT FROM EXCLUDED.bc_fingerprint
+            RETURNING t.id, %(target_keys)s, (t.xmax = 0) AS inserted
+        )
+        SELECT id, %(key_columns)s, CASE WHEN inserted THEN 'created' ELSE 'updated' END FROM upsert
+         UNION ALL
+        SELECT t.id, %(target_keys)s, 'skipped' FROM %(table)s t
+         WHERE (%(target_keys)s) IN (VALUES %(keys)s)
+           AND (%(target_keys)s) NOT IN (SELECT %(key_columns)s FROM upsert)
+        """,
+        table=table,
+        columns=SQL(", ").join(SQL.identifier(col) for col in columns),
+        values=values,
+        key_columns=key_columns,
+        target_keys=target_keys,
+        updates=updates,
+        keys=keys,
+    ))
+    return [(row[0], tuple(row[1:-1]), row[-1]) for row in model.env.cr.fetchall()]
+
+
 class bcplanning_project(models.Model):
     _name = 'bcproject'
     _description = 'bcproject'
@@ -21,22 +87,16 @@ class bcplanning_project(models.Model):
         string="Number of Tasks",
         compute="_get_numberoftasks", store=False)
     
-    @api.constrains('job_no')
-    def _check_job_no_unique(self):
-        for record in self:
-            existing = self.env['bcproject'].search([
-                ('job_no', '=', record.job_no),
-                ('id', '!=', record.id)
-            ], limit=1)
-            if existing:
-                raise ValidationError('Job No must be unique!')
-            
+    _job_no_unique = models.UniqueIndex('(job_no)', 'Job No must be unique!')
+
     def _get_numberoftasks(self):
         for rec in self:
             rec.number_of_tasks = len(rec.task_line)
 
     
     def projectcreationfrombc(self, posted_data):
+        # changes coming from BC are not reported back by the change feed
+        self = self.with_context(bcplanning_from_bc=True)
         if isinstance(posted_data, str):
             posted_data = json.loads(posted_data)
         job_no = posted_data.get('bc_project_no')
@@ -44,128 +104,215 @@ class bcplanning_project(models.Model):
 
         tasks = posted_data.get('tasks', [])
 
-        job_rec = self.env['bcproject'].search([('job_no','=',job_no)], limit=1)
-        if job_rec:
-            job_rec.job_desc = job_desc
-        else:    
-            # Create the job_rec record
-            job_rec = self.env['bcproject'].create({
-                'job_no': job_no,
-                'job_desc': job_desc,
-            })
+        if not job_no:
+            raise ValidationError("bc_project_no is required.")
+        job_rec = self.env['bcproject']._bc_upsert_job(job_no, job_desc)
 
+        # Parse the whole payload first, then upsert tasks and planning lines set-based:
+        # one INSERT ... ON CONFLICT statement per model.
+        Task = self.env['bctask']
+        Line = self.env['bcplanningline']
+        task_vals_list = []
+        line_payloads = []  # (task_no, planning line vals)
         for task_data in tasks:
-            task_no = task_data.get('bc_task_no')
-            task_desc = task_data.get('bc_task_desc')
-            task_date = task_data.get('bc_task_date')
-            task_address = task_data.get('bc_task_address')            
-            planninglines = task_data.get('bc_planninglines', [])
-
-            task = self.env['bctask'].sudo().search([('task_no','=',task_no), ('job_id','=',job_rec.id)], limit=1) 
-            # apply sudo due to Odoo ORM respects record rules and access rights. 
-            # If your current user doesn't have permission to read the record, 
-            # search() will return an empty recordset even if it exists in the database.
-            if task:
-                task.task_desc = task_desc                 
-                task.task_date = task_date
-                task.task_address = task_address
-            else:
-                task = self.env['bctask'].create({
-                    'task_no': task_no,
-                    'job_id': job_rec.id,
-                    'task_desc': task_desc,                    
-                    'task_date': datetime.strptime(task_date, '%Y-%m-%d') if task_date else False,
-                    'task_address': task_address,
-                })
-
-            for pl_data in planninglines:
-                planning_line_lineno = pl_data.get('bc_jobplanningline_lineno')
-                planning_line_no = pl_data.get('bc_jobplanningline_no')
-                planning_line_desc = pl_data.get('bc_jobplanningline_desc')
-                planningline_resid = pl_data.get('bc_jobplanningline_resid')
-                planningline_vendorid = pl_data.get('bc_jobplanningline_vendorid')
-                planningline_datetimestart = pl_data.get('bc_jobplanningline_datetimestart') # start_datetime
-                planningline_datetimeend = pl_data.get('bc_jobplanningline_datetimeend')   # end_datetime
-
-
-                # Check partner ID
-                res_partner = False
-                if planningline_vendorid:                    
-                    res_partner = self.env['res.partner'].sudo().search([('id', '=', planningline_vendorid)])
-                    if not res_partner:
-                        raise ValidationError(f'Partner not found for partner id {planningline_vendorid}')                    
-
-                # Manage bc_jobplanningline_type
-                # if Resource then attached to contact (resource_id has a value)
-                # if Text then no contact (resource_id false)
-                resource_id = 0
-                product_id = 0
-                text_val = ''
-                planning_line_type_odoo = False
-                planning_line_type = pl_data.get('bc_jobplanningline_type')
-                if planning_line_type == 'Resource':
-                    resource_id = planningline_resid
-                    planning_line_type_odoo = 'resource'
-                if planning_line_type == 'Item':
-                    product_id = planningline_resid
-                    planning_line_type_odoo = 'item'
-                if planning_line_type == 'Text':
-                    text_val = planning_line_no
-                    planning_line_type_odoo = 'text'
-
-                # Check resource id
-                if resource_id:
-                    res_partner = self.env['res.partner'].sudo().search([('id', '=', resource_id)])
-                    if not res_partner:
-                        raise ValidationError(f'Resource not found for partner id {resource_id}')
-                        # to avoid above error:
-                        # in BC the Resource card should be link with Odoo Contact. BC Field = Planning Resource Id
-                        # but how to do that in BC? at the moment it no intarface in BC to link BC Resource with Odoo Contact.
-                # Check product id
-                if product_id:
-                    product = self.env['product.product'].sudo().search([('id', '=', product_id)])
-                    if not product:
-                        raise ValidationError(f'Product not found for product id {product_id}')
-                        # to avoid above error:
-                        # in BC the Item card should be link with Odoo product.product. BC Field = No.
-                        # but how to do that in BC? at the moment it no intarface in BC to link BC Item with Odoo product.product.
-
-                planningline_rec = self.env['bcplanningline'].search([('planning_line_lineno','=',planning_line_lineno), ('task_id','=',task.id)], limit=1)
-                if planningline_rec:
-                    planningline_rec.planning_line_no = planning_line_no
-                    planningline_rec.planning_line_desc= planning_line_desc
-                    
-                    planningline_rec.planning_line_type = planning_line_type_odoo
-                    planningline_rec.resource_id = resource_id                    
-                    planningline_rec.product_id = product_id
-                    planningline_rec.text_value = text_val
-                    
-                    planningline_rec.vendor_id = planningline_vendorid if planningline_vendorid else False
-                    planningline_rec.start_datetime = datetime.strptime(planningline_datetimestart, '%Y-%m-%dT%H:%M:%S') if planningline_datetimestart else False
-                    planningline_rec.end_datetime = datetime.strptime(planningline_datetimeend, '%Y-%m-%dT%H:%M:%S') if planningline_datetimeend else False
-                else:
-                    self.env['bcplanningline'].create({
-                        'planning_line_lineno': planning_line_lineno or 0,
-                        'planning_line_no': planning_line_no or '',  # required field fallback
-                        'planning_line_desc': planning_line_desc,
-                        
-                        'planning_line_type': planning_line_type_odoo,
-                        'resource_id': resource_id,                    
-                        'product_id': product_id,
-                        'text_value': text_val,
-
-                        'vendor_id': planningline_vendorid if planningline_vendorid else False,
-                        'task_id': task.id,
-                        'start_datetime': datetime.strptime(planningline_datetimestart, '%Y-%m-%dT%H:%M:%S') if planningline_datetimestart else False,
-                        'end_datetime': datetime.strptime(planningline_datetimeend, '%Y-%m-%dT%H:%M:%S') if planningline_datetimeend else False,
-                    })
+            task_vals = Task._bc_task_vals(task_data)
+            task_vals_list.append(task_vals)
+            for pl_data in task_data.get('bc_planninglines', []):
+                line_payloads.append((task_vals['task_no'], Line._bc_planningline_vals(pl_data)))
 
-        return {
+        Line._bc_check_targets([vals for _task_no, vals in line_payloads])
+
+        task_map, task_stats = Task._bc_upsert(job_rec, task_vals_list)
+        _lines, line_stats = Line._bc_upsert([
+            dict(vals, task_id=task_map[task_no].id)
+            for task_no, vals in line_payloads
+        ])
+
+        result = {
             'job_id': job_rec.id,
             'job_no': job_rec.job_no,
             'created_tasks': len(tasks),
+            'tasks': task_stats,
+            'planninglines': line_stats,
         }
 
+        # mode=snapshot: the payload is the complete state of the job, remove what BC no longer has
+        if posted_data.get('mode') == 'snapshot':
+            stale_tasks, stale_lines = job_rec._bc_stale_records(
+                [vals['task_no'] for vals in task_vals_list],
+                [(task_no, vals['planning_line_lineno']) for task_no, vals in line_payloads],
+            )
+            stale_lines.unlink()
+            stale_tasks.unlink()
+            result['tasks']['removed'] = len(stale_tasks)
+            result['planninglines']['removed'] = len(stale_lines)
+        return result
+
+    @api.model
+    def _bc_upsert_job(self, job_no, job_desc):
+        """
+        Create or update the job job_no with one INSERT ... ON CONFLICT (job_no) statement,
+        so concurrent payloads for the same new job cannot both try to insert it.
+        The row is only written when job_desc changed. Returns the bcproject record.
+        """
+        self.flush_model()
+        # as in _bc_upsert_rows, the final SELECT sees the snapshot taken before the INSERT:
+        # it finds the existing row when the upsert left it untouched
+        self.env.cr.execute(SQL("""
+            WITH upsert AS (
+                INSERT INTO bcproject AS t (job_no, job_desc, create_uid, create_date, write_uid, write_date)
+                VALUES (%(job_no)s, %(job_desc)s, %(uid)s, %(now)s, %(uid)s, %(now)s)
+                ON CONFLICT (job_no) DO UPDATE SET job_desc = EXCLUDED.job_desc,
+                                                   write_uid = EXCLUDED.write_uid,
+                                                   write_date = EXCLUDED.write_date
+                 WHERE t.job_desc IS DISTINCT FROM EXCLUDED.job_desc
+                RETURNING t.id
+            )
+            SELECT id FROM upsert
+             UNION ALL
+            SELECT id FROM bcproject WHERE job_no = %(job_no)s AND NOT EXISTS (SELECT 1 FROM upsert)
+            """,
+            job_no=job_no,
+            job_desc=job_desc or None,
+            uid=self.env.uid,
+            now=SQL("(now() AT TIME ZONE 'UTC')"),
+        ))
+        job = self.browse(self.env.cr.fetchone()[0])
+        job.invalidate_recordset(['job_desc'])
+        return job
+
+    def _bc_stale_records(self, task_nos, line_keys):
+        """
+        Return (tasks, planning lines) of the job that are not in the given BC keys,
+        computed with a single anti-join. Lines of stale tasks are not returned,
+        they go with their task (ondelete='cascade').
+        """
+        self.ensure_one()
+        self.env['bctask'].flush_model()
+        self.env['bcplanningline'].flush_model()
+        self.env.cr.execute(SQL("""
+            WITH task_keys AS (
+                SELECT unnest(%(task_nos)s::varchar[]) AS task_no
+            ), line_keys AS (
+                SELECT * FROM unnest(%(line_task_nos)s::varchar[], %(line_linenos)s::int[]) AS k(task_no, lineno)
+            )
+            SELECT t.id, l.id
+              FROM bctask t
+              LEFT JOIN task_keys tk ON tk.task_no = t.task_no
+              LEFT JOIN bcplanningline l ON l.task_id = t.id AND tk.task_no IS NOT NULL
+              LEFT JOIN line_keys lk ON lk.task_no = t.task_no AND lk.lineno = l.planning_line_lineno
+             WHERE t.job_id = %(job_id)s
+               AND (tk.task_no IS NULL OR (l.id IS NOT NULL AND lk.task_no IS NULL))
+            """,
+            task_nos=list(task_nos),
+            line_task_nos=[task_no for task_no, _lineno in line_keys],
+            line_linenos=[lineno for _task_no, lineno in line_keys],
+            job_id=self.id,
+        ))
+        task_ids = set()
+        line_ids = set()
+        for task_id, line_id in self.env.cr.fetchall():
+            if line_id:
+                line_ids.add(line_id)
+            else:
+                task_ids.add(task_id)
+        return (
+            self.env['bctask'].sudo().browse(task_ids),
+            self.env['bcplanningline'].sudo().browse(line_ids),
+        )
+
+
+    def deletionfrombc(self, posted_data):
+        """
+        Bulk delete of planning lines, tasks and whole jobs requested by BC.
+        Every entry of "planninglines" is a key (job_no, task_no, lineno); an entry without
+        lineno is a task-level wildcard (the task and all its lines), an entry without task_no
+        is a job-level wildcard (the job with all its tasks and lines). Malformed entries (no job_no,
+        non-numeric lineno, not an object) are returned in "invalid" without aborting the batch.
+        Keys are resolved with one set-based query per model and removed with one unlink() per model.
+        """
+        # changes coming from BC are not reported back by the change feed
+        self = self.with_context(bcplanning_from_bc=True)
+        if isinstance(posted_data, str):
+            posted_data = json.loads(posted_data)
+        keys = posted_data.get('planninglines', []) if isinstance(posted_data, dict) else posted_data
+
+        line_keys = []
+        task_keys = []
+        job_keys = []
+        invalid = set()  # malformed keys are reported, the rest of the batch is still deleted
+        for idx, key in enumerate(keys):
+            if not isinstance(key, dict) or not key.get('bc_jobplanningline_jobno'):
+                invalid.add(idx)
+                continue
+            job_no = key.get('bc_jobplanningline_jobno')
+            task_no = key.get('bc_jobplanningline_taskno')
+            lineno = key.get('bc_jobplanningline_lineno')
+            if task_no and lineno not in (None, '', False):
+                try:
+                    lineno = int(lineno)
+                except (TypeError, ValueError):
+                    invalid.add(idx)
+                    continue
+                line_keys.append(SQL("(%s, %s, %s, %s)", idx, job_no, task_no, lineno))
+            elif task_no:
+                task_keys.append(SQL("(%s, %s, %s)", idx, job_no, task_no))
+            else:
+                job_keys.append(SQL("(%s, %s)", idx, job_no))
+
+        cr = self.env.cr
+        found = set()
+        line_ids = []
+        task_ids = []
+        job_ids = []
+        if line_keys:
+            cr.execute(SQL("""
+                SELECT k.idx, l.id
+                  FROM bcplanningline l
+                  JOIN bctask t ON t.id = l.task_id
+                  JOIN bcproject p ON p.id = t.job_id
+                  JOIN (VALUES %s) AS k(idx, job_no, task_no, lineno)
+                    ON k.job_no = p.job_no AND k.task_no = t.task_no AND k.lineno = l.planning_line_lineno
+            """, SQL(", ").join(line_keys)))
+            for idx, line_id in cr.fetchall():
+                found.add(idx)
+                line_ids.append(line_id)
+        if task_keys:
+            cr.execute(SQL("""
+                SELECT k.idx, t.id
+                  FROM bctask t
+                  JOIN bcproject p ON p.id = t.job_id
+                  JOIN (VALUES %s) AS k(idx, job_no, task_no)
+                    ON k.job_no = p.job_no AND k.task_no = t.task_no
+            """, SQL(", ").join(task_keys)))
+            for idx, task_id in cr.fetchall():
+                found.add(idx)
+                task_ids.append(task_id)
+        if job_keys:
+            cr.execute(SQL("""
+                SELECT k.idx, p.id
+                  FROM bcproject p
+                  JOIN (VALUES %s) AS k(idx, job_no) ON k.job_no = p.job_no
+            """, SQL(", ").join(job_keys)))
+            for idx, job_id in cr.fetchall():
+                found.add(idx)
+                job_ids.append(job_id)
+
+        # lines first, then tasks, then jobs: the ondelete='cascade' of task_id/job_id removes the rest
+        lines = self.env['bcplanningline'].sudo().browse(set(line_ids))
+        tasks = self.env['bctask'].sudo().browse(set(task_ids))
+        jobs = self.env['bcproject'].sudo().browse(set(job_ids))
+        lines.unlink()
+        tasks.unlink()
+        jobs.unlink()
+
+        return {
+            'deleted_lines': len(lines),
+            'deleted_tasks': len(tasks),
+            'deleted_jobs': len(jobs),
+            'not_found': [key for idx, key in enumerate(keys) if idx not in found and idx not in invalid],
+            'invalid': [key for idx, key in enumerate(keys) if idx in invalid],
+        }
 
 
 class bcplanning_task(models.Model):
@@ -189,18 +336,19 @@ class bcplanning_task(models.Model):
     number_of_lines = fields.Integer(
         string="Planning Lines",
         compute="_get_numberofplanninglines", store=False)    
+    bc_fingerprint = fields.Char(string="BC Fingerprint", copy=False, readonly=True) # hash of the last values received from BC
 
-    @api.constrains('task_no', 'job_id')
-    def _check_job_no_unique(self):
-        for record in self:
-            # search for another record with the same task_no and job_id
-            existing = self.env['bctask'].search([
-                ('task_no', '=', record.task_no),
-                ('job_id', '=', record.job_id.id),
-                ('id', '!=', record.id)
-            ], limit=1)
-            if existing:
-                raise ValidationError('Task No must be unique per Job No.!')
+    # fields sent by BC, covered by bc_fingerprint
+    _bc_fields = ('task_no', 'task_desc', 'task_date', 'task_address', 'job_id')
+
+    # also the conflict target of the BC upsert (INSERT ... ON CONFLICT)
+    _task_no_unique = models.UniqueIndex('(job_id, task_no)', 'Task No must be unique per Job No.!')
+
+    def write(self, vals):
+        # a local change of a BC field makes the stored fingerprint stale
+        if 'bc_fingerprint' not in vals and any(fname in vals for fname in self._bc_fields):
+            vals = dict(vals, bc_fingerprint=False)
+        return super().write(vals)
 
     def _get_numberofplanninglines(self):
         for rec in self:
@@ -214,11 +362,55 @@ class bcplanning_task(models.Model):
 
     @api.depends('planning_line.start_datetime')
     def _compute_earliest_start(self):
+        # one MIN(start_datetime) ... GROUP BY task_id for the whole batch instead of loading every line
+        earliest = {}
+        stored = self.filtered('id')
+        if stored:
+            Line = self.env['bcplanningline'].sudo()
+            Line.flush_model(['task_id', 'start_datetime'])
+            for task, start in Line._read_group([('task_id', 'in', stored.ids)], ['task_id'], ['start_datetime:min']):
+                earliest[task.id] = start
         for rec in self:
-            # collect non-false datetimes
-            dates = rec.planning_line.mapped('start_datetime')
-            dates = [d for d in dates if d]
-            rec.earliest_start_datetime = min(dates) if dates else False
+            if rec.id:
+                rec.earliest_start_datetime = earliest.get(rec.id) or False
+            else:
+                # new record (form onchange): lines are only in cache
+                dates = [d for d in rec.planning_line.mapped('start_datetime') if d]
+                rec.earliest_start_datetime = min(dates) if dates else False
+
+    @api.model
+    def _bc_task_vals(self, task_data):
+        """Map a BC task payload to bctask values (without job_id)."""
+        task_date = task_data.get('bc_task_date')
+        return {
+            'task_no': task_data.get('bc_task_no'),
+            'task_desc': task_data.get('bc_task_desc'),
+            'task_date': datetime.strptime(task_date, '%Y-%m-%d').date() if task_date else False,
+            'task_address': task_data.get('bc_task_address'),
+        }
+
+    @api.model
+    def _bc_upsert(self, job, vals_list):
+        """
+        Create or update the tasks of job in bulk with one INSERT ... ON CONFLICT statement.
+        Tasks whose fingerprint did not change are skipped.
+        Returns (dict task_no -> bctask record, {'created', 'updated', 'skipped'} counters).
+        """
+        stats = {'created': 0, 'updated': 0, 'skipped': 0}
+        if not vals_list:
+            return {}, stats
+        # last occurrence wins when BC sends the same task twice
+        pending = {vals['task_no']: dict(vals, job_id=job.id) for vals in vals_list}
+        rows = [dict(vals, bc_fingerprint=_bc_fingerprint(vals)) for vals in pending.values()]
+
+        self.flush_model()
+        task_map = {}
+        for task_id, (_job_id, task_no), status in _bc_upsert_rows(self, ['job_id', 'task_no'], rows):
+            task_map[task_no] = self.browse(task_id)
+            stats[status] += 1
+        self.invalidate_model()
+        job.invalidate_recordset(['task_line'])
+        return task_map, stats
 
 
 class bcplanning_line(models.Model):
@@ -316,28 +508,316 @@ class bcplanning_line(models.Model):
     start_datetime = fields.Datetime(string="Start Date-Time")
     end_datetime = fields.Datetime(string="End Date-Time")
 
-    @api.depends('task_id')
+    bc_fingerprint = fields.Char(string="BC Fingerprint", copy=False, readonly=True) # hash of the last values received from BC
+
+    # fields sent by BC, covered by bc_fingerprint
+    _bc_fields = (
+        'planning_line_lineno', 'planning_line_no', 'planning_line_desc', 'planning_line_type',
+        'resource_id', 'product_id', 'text_value', 'vendor_id', 'task_id',
+        'start_datetime', 'end_datetime',
+    )
+
+    # fields reported to BC by the change feed (/planning/changes)
+    _change_log_fields = (
+        'planning_line_no', 'planning_line_desc', 'planning_line_type', 'resource_id', 'product_id',
+        'text_value', 'vendor_id', 'quantity', 'depth', 'start_datetime', 'end_datetime',
+    )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        self.env['bcplanninglinechange']._log('create', lines, self._change_log_fields)
+        return lines
+
+    def write(self, vals):
+        # a local change of a BC field makes the stored fingerprint stale
+        if 'bc_fingerprint' not in vals and any(fname in vals for fname in self._bc_fields):
+            vals = dict(vals, bc_fingerprint=False)
+        res = super().write(vals)
+        self.env['bcplanninglinechange']._log('write', self, list(vals))
+        return res
+
+    def unlink(self):
+        self.env['bcplanninglinechange']._log('unlink', self)
+        return super().unlink()
+
+    @api.depends('task_id.job_id')
     def _get_job_id(self):
+        # task_id is prefetched for the whole batch: one query for all records
         for record in self:
-            record.job_id = False
-            task = self.env['bctask'].search([('id','=',record.task_id.id)])
-            if task:
-                record.job_id = task[0].job_id.id
+            record.job_id = record.task_id.job_id
+
+    # also the conflict target of the BC upsert (INSERT ... ON CONFLICT)
+    _planning_line_lineno_unique = models.UniqueIndex(
+        '(task_id, planning_line_lineno)', 'Planning Line No must be unique per Task No.!')
+
+    # date range lookups of the portal pages: per vendor, and per resource of a vendor
+    _vendor_start_index = models.Index('(vendor_id, start_datetime)')
+    _resource_vendor_start_index = models.Index('(resource_id, vendor_id, start_datetime)')
+
+    # [start, end) of a booked line as a tsrange, end clamped so that a line ending before it
+    # starts is an empty range instead of an error; indexed with GiST for overlap (&&) lookups
+    _booking_range = SQL("tsrange(start_datetime, greatest(end_datetime, start_datetime), '[)')")
+    _booking_range_where = SQL("resource_id IS NOT NULL AND start_datetime IS NOT NULL AND end_datetime IS NOT NULL")
+
+    def init(self):
+        self.env.cr.execute(SQL(
+            "CREATE INDEX IF NOT EXISTS bcplanningline_booking_range_index ON %s USING gist ((%s)) WHERE %s",
+            SQL.identifier(self._table), self._booking_range, self._booking_range_where,
+        ))
+
+    @api.model
+    def _find_overlaps(self, domain):
+        """
+        Double bookings of the resources of the lines matching domain: pairs of lines of the
+        same resource whose [start, end) intervals overlap. All lines of those resources in the
+        time span of the matching lines take part, not only the matching ones.
+        One sweep per resource over its lines sorted by start, with a heap of the lines still
+        running: O(n log n + overlaps) instead of comparing every pair.
+        Returns [(line, other_line, overlap_start, overlap_end)], line having the earlier start.
+        """
+        domain = Domain(domain) & Domain([
+            ('resource_id', '!=', False), ('start_datetime', '!=', False), ('end_datetime', '!=', False),
+        ])
+        spans = self._read_group(domain, ['resource_id'], ['start_datetime:min', 'end_datetime:max'])
+        if not spans:
+            return []
+        lines = self.search_fetch(
+            Domain.OR([
+                Domain('resource_id', '=', resource.id)
+                & Domain('start_datetime', '<', span_end)
+                & Domain('end_datetime', '>', span_start)
+                for resource, span_start, span_end in spans
+            ]),
+            ['resource_id', 'start_datetime', 'end_datetime'],
+            order='resource_id, start_datetime, id',
+        )
+        overlaps = []
+        running = []  # heap of (end_datetime, id, line) of the current resource
+        resource = None
+        for line in lines:
+            if line.resource_id != resource:
+                resource = line.resource_id
+                running = []
+            if line.end_datetime <= line.start_datetime:
+                continue  # empty interval, books nothing
+            while running and running[0][0] <= line.start_datetime:
+                heapq.heappop(running)
+            for end, dummy, other in running:
+                overlaps.append((other, line, line.start_datetime, min(end, line.end_datetime)))
+            heapq.heappush(running, (line.end_datetime, line.id, line))
+        return overlaps
+
+    def _overlap_pairs(self):
+        """Ids (lower, higher) of the double booked pairs of lines involving a line of self."""
+        return {
+            (min(line.id, other.id), max(line.id, other.id))
+            for line, other, dummy, dummy in self._find_overlaps([('id', 'in', self.ids)])
+            if line in self or other in self
+        }
 
-    @api.constrains('planning_line_lineno', 'task_id')
-    def _check_job_no_unique(self):
-        for record in self:
-            # search for another record with the same planning_line_no, task_id
-            existing = self.env['bcplanningline'].search([
-                ('planning_line_lineno', '=', record.planning_line_lineno),
-                ('task_id', '=', record.task_id.id),            
-                ('id', '!=', record.id)
-            ], limit=1)
-            if existing:
-                raise ValidationError(f'Planning Line No must be unique per Task No.!, duplicates on planning_line_lineno = {record.planning_line_lineno}, task No = {record.task_id.task_no}, Job No = {record.job_id.job_no}')
+    def _check_overlaps(self, known=()):
+        """
+        Raise a ValidationError when a line of self is double booked with another line of its
+        resource. Pairs in known, the _overlap_pairs taken before the write, are left alone: BC
+        may send overlapping lines, and an edit must only fail on the double bookings it adds.
+        """
+        overlaps = [
+            overlap for overlap in self._find_overlaps([('id', 'in', self.ids)])
+            if (overlap[0] in self or overlap[1] in self)
+            and (min(overlap[0].id, overlap[1].id), max(overlap[0].id, overlap[1].id)) not in known
+        ]
+        if not overlaps:
+            return
+        messages = [
+            f"{line.resource_id.name}: {line.planning_line_no or line.id} overlaps "
+            f"{other.planning_line_no or other.id} ({start:%Y-%m-%d %H:%M} - {end:%Y-%m-%d %H:%M})"
+            for line, other, start, end in overlaps[:5]
+        ]
+        if len(overlaps) > 5:
+            messages.append(f"... and {len(overlaps) - 5} more")
+        raise ValidationError("Resource double booked:\n" + "\n".join(messages))
+
+    def _bc_outbound_payload(self, page):
+        """
+        BC planning API payload of a line saved on a portal page, built from the saved values.
+        page: 'task' / 'taskresource' (jobPlanningLines) or 'bor' (jobPlanningLinebors)
+        """
+        self.ensure_one()
+        payload = {
+            "jobNo": self.task_id.job_id.job_no,
+            "jobTaskNo": self.task_id.task_no,
+            "lineNo": str(self.planning_line_lineno),
+            "planning_vendor_id": f"{self.vendor_id.sudo().id if self.vendor_id.sudo() else 0}",
+            "startDateTime": self.start_datetime.strftime('%Y-%m-%dT%H:%M:%S') if self.start_datetime else '',
+            "endDateTime": self.end_datetime.strftime('%Y-%m-%dT%H:%M:%S') if self.end_datetime else '',
+        }
+        if page == 'bor':
+            product = self.product_id.sudo()
+            payload.update({
+                "type": "Item" if product else "Text",
+                "no": product.name if product else (self.planning_line_no or 'VACANT'),
+                "planning_product_id": f"{product.id if product else 0}",
+                "description": product.name if product else self.planning_line_desc,
+                "qty": self.quantity,
+                "depth": self.depth,
+            })
+        elif page == 'taskresource':
+            payload.update({
+                "type": 'Resource',
+                "no": self.planning_line_no or '',
+                "description": self.planning_line_desc or '',
+            })
+        else:
+            resource = self.resource_id.sudo()
+            payload.update({
+                "type": "Resource" if resource else "Text",
+                "no": resource.name if resource else 'VACANT',
+                "planning_resource_id": f"{resource.id if resource else 0}",
+                "description": resource.name if resource else self.planning_line_desc,
+            })
+        return payload
+
+    @api.model
+    def _bc_planningline_vals(self, pl_data):
+        """Map a BC job planning line payload to bcplanningline values (without task_id)."""
+        planning_line_no = pl_data.get('bc_jobplanningline_no')
+        planningline_resid = pl_data.get('bc_jobplanningline_resid')
+        planningline_vendorid = pl_data.get('bc_jobplanningline_vendorid')
+        planningline_datetimestart = pl_data.get('bc_jobplanningline_datetimestart') # start_datetime
+        planningline_datetimeend = pl_data.get('bc_jobplanningline_datetimeend')   # end_datetime
+
+        # Manage bc_jobplanningline_type
+        # if Resource then attached to contact (resource_id has a value)
+        # if Text then no contact (resource_id false)
+        resource_id = False
+        product_id = False
+        text_val = ''
+        planning_line_type_odoo = False
+        planning_line_type = pl_data.get('bc_jobplanningline_type')
+        if planning_line_type == 'Resource':
+            resource_id = planningline_resid
+            planning_line_type_odoo = 'resource'
+        if planning_line_type == 'Item':
+            product_id = planningline_resid
+            planning_line_type_odoo = 'item'
+        if planning_line_type == 'Text':
+            text_val = planning_line_no
+            planning_line_type_odoo = 'text'
+
+        return {
+            'planning_line_lineno': int(pl_data.get('bc_jobplanningline_lineno') or 0),
+            'planning_line_no': planning_line_no or '',  # required field fallback
+            'planning_line_desc': pl_data.get('bc_jobplanningline_desc'),
+
+            'planning_line_type': planning_line_type_odoo,
+            'resource_id': resource_id or False,
+            'product_id': product_id or False,
+            'text_value': text_val,
+
+            'vendor_id': planningline_vendorid if planningline_vendorid else False,
+            'start_datetime': datetime.strptime(planningline_datetimestart, '%Y-%m-%dT%H:%M:%S') if planningline_datetimestart else False,
+            'end_datetime': datetime.strptime(planningline_datetimeend, '%Y-%m-%dT%H:%M:%S') if planningline_datetimeend else False,
+        }
+
+    @api.model
+    def _bc_missing_targets(self, vals_list):
+        """
+        Return (missing partner ids, missing product ids) referenced by vals_list,
+        using one search per model instead of one per planning line.
+        """
+        partner_ids = set()
+        product_ids = set()
+        for vals in vals_list:
+            partner_ids.update(pid for pid in (vals.get('vendor_id'), vals.get('resource_id')) if pid)
+            if vals.get('product_id'):
+                product_ids.add(vals['product_id'])
+        found_partners = set()
+        found_products = set()
+        if partner_ids:
+            found_partners = set(self.env['res.partner'].sudo().search([('id', 'in', list(partner_ids))]).ids)
+        if product_ids:
+            found_products = set(self.env['product.product'].sudo().search([('id', 'in', list(product_ids))]).ids)
+        return (
+            {pid for pid in partner_ids if int(pid) not in found_partners},
+            {pid for pid in product_ids if int(pid) not in found_products},
+        )
+
+    @api.model
+    def _bc_target_error(self, vals, missing_partners, missing_products):
+        """Return the error message for an invalid type/target or unknown partner/product of vals, or False."""
+        # _check_one_target_filled is not run by the raw upsert, check the same rules here
+        if vals.get('planning_line_type') == 'resource' and not vals.get('resource_id'):
+            return "Resource is required when type is 'Resource'."
+        if vals.get('planning_line_type') == 'item' and not vals.get('product_id'):
+            return "Item is required when type is 'Item'."
+        if vals.get('planning_line_type') == 'text' and not vals.get('text_value'):
+            return "Text is required when type is 'Text'."
+        if not vals.get('planning_line_type'):
+            return f"Planning line type not supported for planning line {vals.get('planning_line_lineno')}"
+        if vals.get('vendor_id') and vals['vendor_id'] in missing_partners:
+            return f"Partner not found for partner id {vals['vendor_id']}"
+        if vals.get('resource_id') and vals['resource_id'] in missing_partners:
+            return f"Resource not found for partner id {vals['resource_id']}"
+            # to avoid above error:
+            # in BC the Resource card should be link with Odoo Contact. BC Field = Planning Resource Id
+            # but how to do that in BC? at the moment it no intarface in BC to link BC Resource with Odoo Contact.
+        if vals.get('product_id') and vals['product_id'] in missing_products:
+            return f"Product not found for product id {vals['product_id']}"
+            # to avoid above error:
+            # in BC the Item card should be link with Odoo product.product. BC Field = No.
+            # but how to do that in BC? at the moment it no intarface in BC to link BC Item with Odoo product.product.
+        return False
+
+    @api.model
+    def _bc_check_targets(self, vals_list):
+        """Raise a ValidationError for the first planning line with an invalid or unknown target."""
+        missing_partners, missing_products = self._bc_missing_targets(vals_list)
+        for vals in vals_list:
+            error = self._bc_target_error(vals, missing_partners, missing_products)
+            if error:
+                raise ValidationError(error)
+
+    @api.model
+    def _bc_upsert(self, vals_list):
+        """
+        Create or update planning lines in bulk with one INSERT ... ON CONFLICT statement.
+        Every vals must contain task_id; lines whose fingerprint did not change are skipped.
+        Returns (the created and updated bcplanningline records, {'created', 'updated', 'skipped'} counters).
+        """
+        stats = {'created': 0, 'updated': 0, 'skipped': 0}
+        if not vals_list:
+            return self.browse(), stats
+        tasks = self.env['bctask'].browse({vals['task_id'] for vals in vals_list})
+        job_by_task = {task.id: task.job_id.id for task in tasks}
+
+        # last occurrence wins when BC sends the same line twice
+        pending = {(vals['task_id'], vals['planning_line_lineno']): vals for vals in vals_list}
+        rows = []
+        for vals in pending.values():
+            # job_id is a stored compute, the raw upsert fills it in directly
+            row = dict(vals, job_id=job_by_task[vals['task_id']])
+            row['bc_fingerprint'] = _bc_fingerprint(row)
+            rows.append(row)
+
+        self.flush_model()
+        self.env['bctask'].flush_model()
+        written_ids = []
+        for line_id, _key, status in _bc_upsert_rows(self, ['task_id', 'planning_line_lineno'], rows):
+            stats[status] += 1
+            if status != 'skipped':
+                written_ids.append(line_id)
+        self.invalidate_model()
+        tasks.invalidate_recordset(['planning_line'])
+
+        # the raw statement bypasses the ORM, recompute what depends on the planning lines
+        if written_ids:
+            self.env.add_to_compute(self.env['bctask']._fields['earliest_start_datetime'], tasks)
+        return self.browse(written_ids), stats
 
-    
     def planninglinefrombc(self, posted_data):
+        # changes coming from BC are not reported back by the change feed
+        self = self.with_context(bcplanning_from_bc=True)
         if isinstance(posted_data, str):
             posted_data = json.loads(posted_data)
         
@@ -411,4 +891,70 @@ class bcplanning_line(models.Model):
             'task_no': task.task_no,
             'planning_lineno': planningline_rec.planning_line_lineno,
             'updated_line': len(planningline_rec),
+        }
+
+    def planninglinesfrombc(self, posted_data):
+        """
+        Batch variant of planninglinefrombc: upsert many planning lines, across jobs and tasks, at once.
+        Projects, tasks and partners/products are resolved once per distinct key; lines that
+        cannot be resolved are reported in the per-line status array and the others are saved.
+        """
+        if isinstance(posted_data, str):
+            posted_data = json.loads(posted_data)
+        lines_data = posted_data.get('planninglines', []) if isinstance(posted_data, dict) else posted_data
+
+        job_nos = {pl_data.get('bc_jobplanningline_jobno') for pl_data in lines_data}
+        projects = self.env['bcproject'].sudo().search([('job_no', 'in', [j for j in job_nos if j])])
+        project_map = {p.job_no: p for p in projects}
+
+        task_nos = {pl_data.get('bc_jobplanningline_taskno') for pl_data in lines_data}
+        task_map = {}
+        if projects:
+            tasks = self.env['bctask'].sudo().search([
+                ('job_id', 'in', projects.ids),
+                ('task_no', 'in', [t for t in task_nos if t]),
+            ])
+            task_map = {(t.job_id.job_no, t.task_no): t for t in tasks}
+
+        results = []
+        vals_list = []
+        for pl_data in lines_data:
+            planning_line_jobno = pl_data.get('bc_jobplanningline_jobno')
+            planning_line_taskno = pl_data.get('bc_jobplanningline_taskno')
+            status = {
+                'job_no': planning_line_jobno,
+                'task_no': planning_line_taskno,
+                'planning_lineno': pl_data.get('bc_jobplanningline_lineno'),
+                'status': 'success',
+            }
+            results.append(status)
+            if planning_line_jobno not in project_map:
+                status.update(status='error', message=f'Project not found for job_no {planning_line_jobno}')
+                continue
+            task = task_map.get((planning_line_jobno, planning_line_taskno))
+            if not task:
+                status.update(status='error', message=f'Task not found for job_no {planning_line_jobno} and task_no {planning_line_taskno}')
+                continue
+            vals = self._bc_planningline_vals(pl_data)
+            vals['task_id'] = task.id
+            vals_list.append((status, vals))
+
+        missing_partners, missing_products = self._bc_missing_targets([vals for _status, vals in vals_list])
+        valid = []
+        for status, vals in vals_list:
+            error = self._bc_target_error(vals, missing_partners, missing_products)
+            if error:
+                status.update(status='error', message=error)
+            else:
+                valid.append(vals)
+
+        stats = {'created': 0, 'updated': 0, 'skipped': 0}
+        if valid:
+            _lines, stats = self.sudo()._bc_upsert(valid)
+
+        return {
+            'planninglines': results,
+            'updated_lines': len(valid),
+            'failed_lines': len(results) - len(valid),
+            'stats': stats,
         }
\ No newline at end of file
@@ -0,0 +1,107 @@
+from odoo import models, fields, api
+from odoo.tools import SQL
+import threading
+import time
+import logging
+_logger = logging.getLogger(__name__)
+
+TOKEN_REFRESH_MARGIN = 300  # refresh ahead of expiry, seconds
+TOKEN_MIN_VALIDITY = 30     # below this a token is not handed out anymore, seconds
+
+# process-local copy of the shared token: key -> (access_token, expires_at epoch)
+_token_cache = {}
+_token_lock = threading.Lock()
+TOKEN_STATS = {'hits': 0, 'shared_hits': 0, 'refreshes': 0}
+
+
+class bcplanning_token(models.Model):
+    """
+    OAuth access token for BC, shared by all workers. Each worker keeps a local copy,
+    one worker refreshes it shortly before expiry under an advisory lock.
+    """
+    _name = 'bctoken'
+    _description = 'bctoken'
+    _rec_name = 'key'
+
+    key = fields.Char(string="Key", required=True) # database:tenant:client
+    access_token = fields.Char(string="Access Token")
+    expires_at = fields.Float(string="Expires At") # epoch seconds
+
+    _key_unique = models.UniqueIndex('(key)', 'Only one token per tenant and client')
+
+    @api.model
+    def _get_token(self, key, fetch):
+        """
+        Valid access token for key. fetch() requests a new one and returns (access_token, expires_in).
+        Lookups go through the process cache, then the shared row. The shared row is read and
+        refreshed on cursors of their own, so the token is visible to other workers right away.
+        """
+        now = time.time()
+        cached = _token_cache.get(key)
+        if cached and cached[1] - now > TOKEN_REFRESH_MARGIN:
+            TOKEN_STATS['hits'] += 1
+            return cached[0]
+
+        with _token_lock:
+            with self.env.registry.cursor() as cr:
+                row = self._read_shared(cr, key)
+            if row and row[1] - now > TOKEN_REFRESH_MARGIN:
+                TOKEN_STATS['shared_hits'] += 1
+                _token_cache[key] = row
+                return row[0]
+
+            with self.env.registry.cursor() as lock_cr:
+                if row and row[1] - now > TOKEN_MIN_VALIDITY:
+                    # still usable: refresh only if no other worker is busy with it
+                    lock_cr.execute(SQL("SELECT pg_try_advisory_xact_lock(hashtext(%s))", key))
+                    if not lock_cr.fetchone()[0]:
+                        TOKEN_STATS['shared_hits'] += 1
+                        return row[0]
+                else:
+                    lock_cr.execute(SQL("SELECT pg_advisory_xact_lock(hashtext(%s))", key))
+
+                # lock_cr took its REPEATABLE READ snapshot before waiting for the lock and would not
+                # see a token written meanwhile: re-read and write on a new transaction, committed
+                # before lock_cr releases the lock
+                with self.env.registry.cursor() as cr:
+                    row = self._read_shared(cr, key)
+                    if row and row[1] - time.time() > TOKEN_REFRESH_MARGIN:
+                        TOKEN_STATS['shared_hits'] += 1
+                        _token_cache[key] = row
+                        return row[0]
+
+                    access_token, expires_in = fetch()
+                    expires_at = time.time() + int(expires_in or 0)
+                    cr.execute(SQL("""
+                        INSERT INTO bctoken (key, access_token, expires_at, create_uid, create_date, write_uid, write_date)
+                        VALUES (%(key)s, %(token)s, %(expires_at)s, %(uid)s, (now() AT TIME ZONE 'UTC'), %(uid)s, (now() AT TIME ZONE 'UTC'))
+                        ON CONFLICT (key) DO UPDATE
+                           SET access_token = EXCLUDED.access_token,
+                               expires_at = EXCLUDED.expires_at,
+                               write_uid = EXCLUDED.write_uid,
+                               write_date = EXCLUDED.write_date
+                    """, key=key, token=access_token, expires_at=expires_at, uid=self.env.uid))
+                    TOKEN_STATS['refreshes'] += 1
+                    _token_cache[key] = (access_token, expires_at)
+                    return access_token
+
+    @api.model
+    def _read_shared(self, cr, key):
+        cr.execute(SQL("SELECT access_token, expires_at FROM bctoken WHERE key = %s", key))
+        row = cr.fetchone()
+        return (row[0], row[1]) if row and row[0] else None
+
+    @api.model
+    def _invalidate(self, key):
+        """Drop a token BC rejected (401), the next call fetches a new one."""
+        _token_cache.pop(key, None)
+        with self.env.registry.cursor() as cr:
+            cr.execute(SQL("UPDATE bctoken SET expires_at = 0 WHERE key = %s", key))
+
+    @api.model
+    def _stats(self):
+        lookups = TOKEN_STATS['hits'] + TOKEN_STATS['shared_hits'] + TOKEN_STATS['refreshes']
+        return {
+            **TOKEN_STATS,
+            'hit_rate': round((lookups - TOKEN_STATS['refreshes']) / lookups, 4) if lookups else None,
+        }
@@ -0,0 +1,72 @@
+from odoo import models, api
+
+
+def _catalog_values(records, fnames):
+    return {rec.id: [rec[fname] for fname in fnames] for rec in records}
+
+
+class bcplanning_product_template(models.Model):
+    """
+    Clear the cached product catalog of the portal (bcplanning_portal._product_catalog) when
+    a change can show in it: a catalog product is created or removed, or one of the catalog
+    fields really changes value.
+    """
+    _inherit = 'product.template'
+
+    _bcplanning_catalog_fields = ('name', 'default_code', 'active', 'sale_ok', 'type')
+
+    def _bcplanning_in_catalog(self):
+        return any(rec.type == 'service' and rec.active for rec in self)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        if records._bcplanning_in_catalog():
+            self.env.registry.clear_cache()
+        return records
+
+    def write(self, vals):
+        fnames = [fname for fname in self._bcplanning_catalog_fields if fname in vals]
+        old = _catalog_values(self, fnames) if fnames else None
+        res = super().write(vals)
+        if fnames and old != _catalog_values(self, fnames):
+            self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        in_catalog = self._bcplanning_in_catalog()
+        res = super().unlink()
+        if in_catalog:
+            self.env.registry.clear_cache()
+        return res
+
+
+class bcplanning_product_product(models.Model):
+    _inherit = 'product.product'
+
+    _bcplanning_catalog_fields = ('name', 'default_code', 'active', 'sale_ok', 'product_tmpl_id')
+
+    def _bcplanning_in_catalog(self):
+        return any(rec.product_tmpl_id.type == 'service' and rec.active for rec in self)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        if records._bcplanning_in_catalog():
+            self.env.registry.clear_cache()
+        return records
+
+    def write(self, vals):
+        fnames = [fname for fname in self._bcplanning_catalog_fields if fname in vals]
+        old = _catalog_values(self, fnames) if fnames else None
+        res = super().write(vals)
+        if fnames and old != _catalog_values(self, fnames):
+            self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        in_catalog = self._bcplanning_in_catalog()
+        res = super().unlink()
+        if in_catalog:
+            self.env.registry.clear_cache()
+        return res
@@ -23,6 +23,16 @@ class ResConfigSettings(models.TransientModel):
         string="Company Id",
         config_parameter='bcplanning.setting.company.id'
     )
+    bcplanning_setting_login_url = fields.Char(
+        string="Login Url",
+        config_parameter='bcplanning.setting.login.url',
+        help="Leave empty for https://login.microsoftonline.com"
+    )
+    bcplanning_setting_api_url = fields.Char(
+        string="API Url",
+        config_parameter='bcplanning.setting.api.url',
+        help="Leave empty for https://api.businesscentral.dynamics.com"
+    )
     bcplanning_base_group_id = fields.Many2one(
         'res.groups',
         string='BC Planning Base Group',
@@ -58,4 +68,52 @@ class ResConfigSettings(models.TransientModel):
         string='BC Planning Task Resource Group',
         config_parameter='bcplanning.setting.taskresource_group_id',
         help="Select the group used for task of resource menu"
-    )
\ No newline at end of file
+    )
+    bcplanning_setting_ingest_concurrency = fields.Integer(
+        string="Ingest Workers",
+        config_parameter='bcplanning.setting.ingest.concurrency',
+        default=1,
+        help="Number of BC payloads from the async ingest queue processed in parallel"
+    )
+    bcplanning_setting_changes_retention_days = fields.Integer(
+        string="Change Feed Retention (days)",
+        config_parameter='bcplanning.setting.changes.retention_days',
+        default=30,
+        help="Planning line changes older than this are removed from the /planning/changes feed"
+    )
+    bcplanning_setting_ingest_retention_days = fields.Integer(
+        string="Ingest Payload Retention (days)",
+        config_parameter='bcplanning.setting.ingest.retention_days',
+        default=30,
+        help="Payloads of processed ingest tickets older than this are cleared"
+    )
+
+    bcplanning_setting_outbox_max_attempts = fields.Integer(
+        string="Outbox Max Attempts",
+        config_parameter='bcplanning.setting.outbox.max_attempts',
+        default=8,
+        help="Failed BC updates are moved to the dead letter after this many attempts"
+    )
+    bcplanning_setting_outbox_backoff = fields.Integer(
+        string="Outbox Retry Delay (seconds)",
+        config_parameter='bcplanning.setting.outbox.backoff',
+        default=30,
+        help="Delay before the first retry of a failed BC update, doubled on every next attempt"
+    )
+
+    bcplanning_setting_http_connect_timeout = fields.Integer(
+        string="BC Connect Timeout (seconds)",
+        config_parameter='bcplanning.setting.http.connect_timeout',
+        default=5,
+    )
+    bcplanning_setting_http_read_timeout = fields.Integer(
+        string="BC Read Timeout (seconds)",
+        config_parameter='bcplanning.setting.http.read_timeout',
+        default=30,
+    )
+
+    def set_values(self):
+        super().set_values()
+        # drop the settings snapshot of bcplanning_utils._settings in all workers
+        self.env.registry.clear_cache()
+        self.env['bcingest'].sudo()._sync_worker_crons(self.bcplanning_setting_ingest_concurrency)
\ No newline at end of file
@@ -1,5 +1,4 @@
 from odoo import models, fields, api
-import re
 import logging
 
 _logger = logging.getLogger(__name__)
@@ -50,24 +49,8 @@ class ResPartner(models.Model):
     )
 
     def _get_group_from_param(self, param_key):
-        """Read the configured group id from ir.config_parameter and return res.groups record or None."""
-        try:
-            val = self.env['ir.config_parameter'].sudo().get_param(param_key)
-            if not val:
-                return None
-            # param may be numeric id or string like 'res.groups,12' - extract digits
-            try:
-                gid = int(val)
-            except Exception:
-                m = re.search(r'(\d+)', str(val))
-                gid = int(m.group(1)) if m else None
-            if not gid:
-                return None
-            grp = self.env['res.groups'].sudo().browse(gid)
-            return grp if grp.exists() else None
-        except Exception:
-            _logger.exception("Failed to read group param %s", param_key)
-            return None
+        """Return the res.groups record configured in param_key or None (from the cached settings snapshot)."""
+        return self.env['bcplanning_utils']._get_group(param_key)
 
     def _compute_menu_flags(self):
         """Compute whether any linked user of the partner has the configured group."""
@@ -1,24 +1,141 @@
 from odoo import models
 from odoo.exceptions import ValidationError
+from odoo.tools import ormcache
+from requests.adapters import HTTPAdapter
+from dataclasses import dataclass
 import requests
+import re
+import threading
 import json
 import logging
 _logger = logging.getLogger(__name__)
 
+DEFAULT_LOGIN_URL = 'https://login.microsoftonline.com'
+DEFAULT_API_URL = 'https://api.businesscentral.dynamics.com'
+DEFAULT_CONNECT_TIMEOUT = 5
+DEFAULT_READ_TIMEOUT = 30
+BATCH_MAX_OPERATIONS = 100  # BC rejects larger $batch requests
+
+
+# menu/setting -> group config parameter
+GROUP_PARAMS = (
+    'bcplanning.setting.base_group_id',
+    'bcplanning.setting.project_group_id',
+    'bcplanning.setting.team_group_id',
+    'bcplanning.setting.planning_group_id',
+    'bcplanning.setting.bor_group_id',
+    'bcplanning.setting.taskresource_group_id',
+)
+
+
+@dataclass(frozen=True)
+class BCSettings:
+    """Typed snapshot of the bcplanning.setting.* parameters, see bcplanning_utils._settings."""
+    client_id: str
+    client_secret: str
+    tenant_id: str
+    env_name: str
+    company_id: str
+    login_url: str
+    api_url: str
+    connect_timeout: float
+    read_timeout: float
+    outbox_max_attempts: int
+    outbox_backoff: int
+    changes_retention_days: int
+    ingest_retention_days: int
+    group_ids: dict  # group config parameter -> res.groups id (existing groups only)
+
+
+def _parse_group_id(value):
+    """Group parameter value, an id or a reference like 'res.groups(12,)', to an int id."""
+    if not value:
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        m = re.search(r'(\d+)', str(value))
+        return int(m.group(1)) if m else None
+
+
+class BCUnavailableError(Exception):
+    """Raised without calling BC while the circuit breaker is open."""
+
+
+# one pooled keep-alive session per worker process, the circuit breakers are shared (see bcbreaker)
+_session = None
+_session_lock = threading.Lock()
+
+
+def _get_session():
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _session = session
+    return _session
+
+
 class bcplanning_utils(models.Model):
     _name = 'bcplanning_utils'
 
+    @ormcache()
+    def _settings(self):
+        """
+        Process-local snapshot of the configuration, read once per registry. Saving
+        res.config.settings (or any set_param) clears the cache in every worker.
+        """
+        params = {
+            param.key: param.value
+            for param in self.env['ir.config_parameter'].sudo().search_fetch([('key', '=like', 'bcplanning.setting.%')], ['key', 'value'])
+        }
+
+        def number(key, default, cast=int):
+            try:
+                return cast(params.get(key) or default)
+            except (TypeError, ValueError):
+                return default
+
+        group_ids = {key: _parse_group_id(params.get(key)) for key in GROUP_PARAMS}
+        existing = set(self.env['res.groups'].sudo().browse([gid for gid in group_ids.values() if gid]).exists().ids)
+        return BCSettings(
+            client_id=params.get('bcplanning.setting.client.id') or '',
+            client_secret=params.get('bcplanning.setting.client.secret') or '',
+            tenant_id=params.get('bcplanning.setting.tenant.id') or '',
+            env_name=params.get('bcplanning.setting.env.name') or '',
+            company_id=params.get('bcplanning.setting.company.id') or '',
+            login_url=(params.get('bcplanning.setting.login.url') or DEFAULT_LOGIN_URL).rstrip('/'),
+            api_url=(params.get('bcplanning.setting.api.url') or DEFAULT_API_URL).rstrip('/'),
+            connect_timeout=number('bcplanning.setting.http.connect_timeout', DEFAULT_CONNECT_TIMEOUT, float),
+            read_timeout=number('bcplanning.setting.http.read_timeout', DEFAULT_READ_TIMEOUT, float),
+            outbox_max_attempts=number('bcplanning.setting.outbox.max_attempts', 8),
+            outbox_backoff=number('bcplanning.setting.outbox.backoff', 30),
+            changes_retention_days=number('bcplanning.setting.changes.retention_days', 30),
+            ingest_retention_days=number('bcplanning.setting.ingest.retention_days', 30),
+            group_ids={key: gid for key, gid in group_ids.items() if gid in existing},
+        )
+
+    def _get_group(self, param_key):
+        """res.groups configured in param_key, or None."""
+        gid = self._settings().group_ids.get(param_key)
+        return self.env['res.groups'].sudo().browse(gid) if gid else None
+
     def _get_token(self):
-        client_id = self.env['ir.config_parameter'].sudo().get_param('bcplanning.setting.client.id')
+        settings = self._settings()
+        client_id = settings.client_id
         if not client_id:
             raise ValidationError("Client Id not found!")
-        client_secret = self.env['ir.config_parameter'].sudo().get_param('bcplanning.setting.client.secret')
+        client_secret = settings.client_secret
         if not client_secret:
             raise ValidationError("Client Secret not found!")
-        tenant_id = self.env['ir.config_parameter'].sudo().get_param('bcplanning.setting.tenant.id')
+        tenant_id = settings.tenant_id
         if not tenant_id:
             raise ValidationError("Tenant Id not found!")
-        access_token_url = f'https://login.microsoftonline.com/{tenant_id}/oauth2/v2.0/token'
+        access_token_url = f'{settings.login_url}/{tenant_id}/oauth2/v2.0/token'
         scope = 'https://api.businesscentral.dynamics.com/.default'
 
         payload = {
@@ -28,10 +145,17 @@ class bcplanning_utils(models.Model):
             'scope': scope
         }
 
-        response = requests.post(access_token_url, data=payload)
-        response.raise_for_status()
-        token_data = response.json()
-        return token_data['access_token']
+        def fetch():
+            response = self._send('post', access_token_url, endpoint='token', data=payload)
+            response.raise_for_status()
+            token_data = response.json()
+            return token_data['access_token'], token_data.get('expires_in', 3599)
+
+        return self.env['bctoken'].sudo()._get_token(self._token_key(), fetch)
+
+    def _token_key(self):
+        settings = self._settings()
+        return f"{self.env.cr.dbname}:{settings.tenant_id}:{settings.client_id}"
 
     def post_request(self,url, payload):
         token = self._get_token()
@@ -44,17 +168,93 @@ class bcplanning_utils(models.Model):
             "Accept": "application/json"
         }
 
-        response = requests.post(url, headers=headers, data=json.dumps(payload))        
+        response = self._send('post', url, headers=headers, data=json.dumps(payload))
+        if response.status_code == 401:
+            # token revoked or expired early: drop it and retry once with a fresh one
+            self.env['bctoken'].sudo()._invalidate(self._token_key())
+            headers["Authorization"] = f"Bearer {self._get_token()}"
+            response = self._send('post', url, headers=headers, data=json.dumps(payload))
         return response
 
-    def update_bc_planningline(self, payload=None):
-        env_name = self.env['ir.config_parameter'].sudo().get_param('bcplanning.setting.env.name')
-        if not env_name:
+    def _send(self, method, url, endpoint='api', **kwargs):
+        """
+        HTTP call to BC on the pooled session, with connect/read timeouts and the circuit
+        breaker of endpoint ('token' or 'api').
+        Connection errors, timeouts, 5xx and 429 responses count as failures.
+        """
+        Breaker = self.env['bcbreaker'].sudo()
+        Breaker._before_call(endpoint)
+        try:
+            response = _get_session().request(method, url, timeout=self._timeouts(), **kwargs)
+        except requests.RequestException:
+            Breaker._record_failure(endpoint)
+            raise
+        if response.status_code >= 500 or response.status_code == 429:
+            Breaker._record_failure(endpoint)
+        else:
+            Breaker._record_success(endpoint)
+        return response
+
+    def _timeouts(self):
+        settings = self._settings()
+        return (settings.connect_timeout, settings.read_timeout)
+
+    def _bc_status(self):
+        """
+        Circuit breaker state for the portal and /planning/metrics: the worst of the token
+        and api breakers, with the state of each endpoint.
+        """
+        endpoints = self.env['bcbreaker'].sudo()._status()
+        worst = max(endpoints.values(), key=lambda status: (status['state'] == 'open', status['state'] == 'half_open', status['retry_in']))
+        return {'available': worst['state'] != 'open', **worst, 'endpoints': endpoints}
+
+    def _bc_api_root(self):
+        """Root url of the BC planning API, $batch is posted here."""
+        settings = self._settings()
+        if not settings.env_name:
             raise ValidationError("BC Environment name not found!")
-        company_id = self.env['ir.config_parameter'].sudo().get_param('bcplanning.setting.company.id')
+        return f'{settings.api_url}/v2.0/{settings.env_name}/api/ddsia/planning/v1.0'
+
+    def _bc_api_path(self, entity):
+        """Path of a BC planning API entity (jobPlanningLines, jobPlanningLinebors), relative to the api root."""
+        company_id = self._settings().company_id
         if not company_id:
             raise ValidationError("BC Company Id not found!")
-        url = f'https://api.businesscentral.dynamics.com/v2.0/{env_name}/api/ddsia/planning/v1.0/companies({company_id})/jobPlanningLines'
+        return f'companies({company_id})/{entity}'
+
+    def _bc_api_url(self, entity):
+        """Url of a BC planning API entity (jobPlanningLines, jobPlanningLinebors)."""
+        return f'{self._bc_api_root()}/{self._bc_api_path(entity)}'
+
+    def post_batch(self, operations):
+        """
+        Send many POSTs as OData JSON $batch requests of at most BATCH_MAX_OPERATIONS.
+        operations: [(entity, payload)]
+        Returns [(status, body)] in the order of operations; status is None when BC
+        left the operation out of its response.
+        """
+        results = []
+        root = self._bc_api_root()
+        for start in range(0, len(operations), BATCH_MAX_OPERATIONS):
+            chunk = operations[start:start + BATCH_MAX_OPERATIONS]
+            batch = {'requests': [{
+                'method': 'POST',
+                'id': str(index),
+                'url': self._bc_api_path(entity),
+                'headers': {'Content-Type': 'application/json'},
+                'body': payload,
+            } for index, (entity, payload) in enumerate(chunk)]}
+            response = self.post_request(f'{root}/$batch', batch)
+            if response.status_code not in (200, 201):
+                raise Exception(f"BC $batch failed: HTTP {response.status_code}: {response.text[:1000]}")
+            responses = {r.get('id'): r for r in response.json().get('responses', [])}
+            for index in range(len(chunk)):
+                r = responses.get(str(index))
+                results.append((r.get('status'), r.get('body')) if r else (None, 'missing from $batch response'))
+        return results
+
+    def update_bc_planningline(self, payload=None):
+        url = self._bc_api_url('jobPlanningLines')
         response = self.post_request(url, payload)
         if response.status_code in (200, 201):
             return True
@@ -65,15 +265,9 @@ class bcplanning_utils(models.Model):
         
         _logger.exception("payload for BC: %s", payload)
 
-        env_name = self.env['ir.config_parameter'].sudo().get_param('bcplanning.setting.env.name')
-        if not env_name:
-            raise ValidationError("BC Environment name not found!")
-        company_id = self.env['ir.config_parameter'].sudo().get_param('bcplanning.setting.company.id')
-        if not company_id:
-            raise ValidationError("BC Company Id not found!")
-        url = f'https://api.businesscentral.dynamics.com/v2.0/{env_name}/api/ddsia/planning/v1.0/companies({company_id})/jobPlanningLinebors'
+        url = self._bc_api_url('jobPlanningLinebors')
         response = self.post_request(url, payload)
         if response.status_code in (200, 201):
             return True
         else:
-            return False
\ No newline at end of file
+            return False
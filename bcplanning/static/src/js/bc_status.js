@@ -0,0 +1,25 @@
+/** @odoo-module **/
+import publicWidget from "@web/legacy/js/public/public_widget";
+import { rpc } from "@web/core/network/rpc";
+
+publicWidget.registry.BCPlanningStatus = publicWidget.Widget.extend({
+    selector: ".bcplanning-bc-status",
+
+    start: function () {
+        this._super.apply(this, arguments);
+        this._refresh();
+    },
+
+    // show the notice while the BC circuit breaker is open; saves are still queued
+    _refresh: async function () {
+        try {
+            const status = await rpc('/bcplanning/bc_status', {});
+            this.el.classList.toggle('d-none', !!status.available);
+            if (!status.available) {
+                setTimeout(() => this._refresh(), Math.max(status.retry_in || 0, 10) * 1000);
+            }
+        } catch (e) {
+            // ignore, the notice is informative only
+        }
+    },
+});
@@ -1,9 +1,11 @@
 /** @odoo-module **/
 import publicWidget from "@web/legacy/js/public/public_widget";
 import { rpc } from "@web/core/network/rpc";
+import { PlanningPagerMixin } from "./planning_pager";
 
-publicWidget.registry.Bor = publicWidget.Widget.extend({
+publicWidget.registry.Bor = publicWidget.Widget.extend(PlanningPagerMixin, {
     selector: "#bor_wrap",
+    pagerPage: 'bor',
 
     events: {
         'click .edit-row': '_onEditRow',
@@ -12,7 +14,13 @@ publicWidget.registry.Bor = publicWidget.Widget.extend({
         'click #btn-prev-day': '_onPrevDay',
         'click #btn-next-day': '_onNextDay',
         'click #btn-today': '_onTodayClick',
+        'click #btn-week': '_onWeekClick',
+        'click #btn-month': '_onMonthClick',
         'click #btn-clear': '_onClearClick',
+        'click #btn-save-all': '_onSaveAll',
+        'input .product-input': '_onProductInput',
+        'change .product-input': '_onProductChange',
+        'click .load-more': '_onLoadMore',
     },
 
     start: function () {
@@ -20,11 +28,17 @@ publicWidget.registry.Bor = publicWidget.Widget.extend({
         const params = new URLSearchParams(window.location.search);
         const urlDate = params.get('date');
         const noDate = params.get('no_date');
+        const rangeFrom = params.get('date_from');
+        const rangeTo = params.get('date_to');
         const lbl = this.el.querySelector('#selected-date-label');
 
         if (urlDate) {
             this._currentDate = this._parseDateString(urlDate);
             if (lbl) { lbl.textContent = urlDate; }
+        } else if (rangeFrom || rangeTo) {
+            // the label of the range is rendered by the server
+            this._currentDate = rangeFrom ? this._parseDateString(rangeFrom) : new Date();
+            this._rangeKind = this._rangeKindOf(rangeFrom, rangeTo);
         } else if (noDate) {
             this._currentDate = new Date();
             if (lbl) { lbl.textContent = ''; }
@@ -37,6 +51,9 @@ publicWidget.registry.Bor = publicWidget.Widget.extend({
             this._currentDate = new Date();
             if (lbl) { lbl.textContent = this._formatDate(this._currentDate); }
         }
+
+        this._setupPager();
+        this._setupDayNavigation();
     },
 
     _showOverlay: function () {
@@ -74,14 +91,12 @@ publicWidget.registry.Bor = publicWidget.Widget.extend({
 
     _changeDateAndReload: function (dateObj) {
         this._currentDate = new Date(dateObj.getFullYear(), dateObj.getMonth(), dateObj.getDate());
-        const params = new URLSearchParams(window.location.search);
-        if (params.has('no_date')) { params.delete('no_date'); }
-        params.set('date', this._formatDate(this._currentDate));
-        window.location.search = params.toString();
+        this._loadPlanning({ date: this._formatDate(this._currentDate) });
     },
 
     _onPrevDay: function (ev) {
         ev.preventDefault();
+        if (this._stepRange(-1)) { return; }
         const d = new Date(this._currentDate);
         d.setDate(d.getDate() - 1);
         this._changeDateAndReload(d);
@@ -89,6 +104,7 @@ publicWidget.registry.Bor = publicWidget.Widget.extend({
 
     _onNextDay: function (ev) {
         ev.preventDefault();
+        if (this._stepRange(1)) { return; }
         const d = new Date(this._currentDate);
         d.setDate(d.getDate() + 1);
         this._changeDateAndReload(d);
@@ -159,10 +175,7 @@ publicWidget.registry.Bor = publicWidget.Widget.extend({
 
     _onClearClick: function (ev) {
         ev.preventDefault();
-        const params = new URLSearchParams(window.location.search);
-        if (params.has('date')) { params.delete('date'); }
-        params.set('no_date', '1');
-        window.location.search = '?' + params.toString();
+        this._loadPlanning({ no_date: true });
     },
 
     _getContextElement: function ($btn) {
@@ -224,13 +237,13 @@ publicWidget.registry.Bor = publicWidget.Widget.extend({
             const $tr = ctx.el;
             $tr.attr('data-editing', '1');
             $tr.find('.start-datetime-view, .end-datetime-view, .product-view, .qty-view, .depth-view').addClass('d-none');
-            $tr.find('.start-datetime-input, .end-datetime-input, .product-select, .qty-input, .depth-input').removeClass('d-none');
+            $tr.find('.start-datetime-input, .end-datetime-input, .product-input, .qty-input, .depth-input').removeClass('d-none');
             $tr.find('.edit-row').addClass('d-none');
             $tr.find('.save-row, .cancel-row').removeClass('d-none');
         } else if (ctx.type === 'card') {
             const $card = ctx.el;
             $card.find('.start-datetime-view, .end-datetime-view, .product-view, .qty-view, .depth-view').addClass('d-none');
-            $card.find('.start-datetime-input, .end-datetime-input, .product-select, .qty-input, .depth-input').removeClass('d-none');
+            $card.find('.start-datetime-input, .end-datetime-input, .product-input, .qty-input, .depth-input').removeClass('d-none');
             $card.find('.edit-row').addClass('d-none');
             $card.find('.save-row, .cancel-row').removeClass('d-none');
             $card.attr('data-editing', '1');
@@ -247,12 +260,13 @@ publicWidget.registry.Bor = publicWidget.Widget.extend({
             $tr.attr('data-editing', '0');
             $tr.find('.start-datetime-input').val($tr.find('.start-datetime-input').attr('value'));
             $tr.find('.end-datetime-input').val($tr.find('.end-datetime-input').attr('value'));
-            $tr.find('.product-select').val($tr.find('.product-select').find('option[selected]').val() || '');
+            $tr.find('.product-select').val($tr.find('.product-select').attr('data-saved') || '');
+            $tr.find('.product-input').val($tr.find('.product-input').attr('value') || '').removeClass('is-invalid');
             $tr.find('.qty-input').val($tr.find('.qty-input').attr('value'));
             $tr.find('.depth-input').val($tr.find('.depth-input').attr('value'));
 
             $tr.find('.start-datetime-view, .end-datetime-view, .product-view, .qty-view, .depth-view').removeClass('d-none');
-            $tr.find('.start-datetime-input, .end-datetime-input, .product-select, .qty-input, .depth-input').addClass('d-none');
+            $tr.find('.start-datetime-input, .end-datetime-input, .product-input, .qty-input, .depth-input').addClass('d-none');
             $tr.find('.edit-row').removeClass('d-none');
             $tr.find('.save-row, .cancel-row').addClass('d-none');
         } else if (ctx.type === 'card') {
@@ -260,12 +274,13 @@ publicWidget.registry.Bor = publicWidget.Widget.extend({
             $card.attr('data-editing', '0');
             $card.find('.start-datetime-input').val($card.find('.start-datetime-input').attr('value'));
             $card.find('.end-datetime-input').val($card.find('.end-datetime-input').attr('value'));
-            $card.find('.product-select').val($card.find('.product-select').find('option[selected]').val() || '');
+            $card.find('.product-select').val($card.find('.product-select').attr('data-saved') || '');
+            $card.find('.product-input').val($card.find('.product-input').attr('value') || '').removeClass('is-invalid');
             $card.find('.qty-input').val($card.find('.qty-input').attr('value'));
             $card.find('.depth-input').val($card.find('.depth-input').attr('value'));
 
             $card.find('.start-datetime-view, .end-datetime-view, .product-view, .qty-view, .depth-view').removeClass('d-none');
-            $card.find('.start-datetime-input, .end-datetime-input, .product-select, .qty-input, .depth-input').addClass('d-none');
+            $card.find('.start-datetime-input, .end-datetime-input, .product-input, .qty-input, .depth-input').addClass('d-none');
             $card.find('.edit-row').removeClass('d-none');
             $card.find('.save-row, .cancel-row').addClass('d-none');
         } else {
@@ -273,204 +288,243 @@ publicWidget.registry.Bor = publicWidget.Widget.extend({
         }
     },
 
-    _onSaveRow: function (ev) {
-        const $btn = $(ev.currentTarget);
-        const ctx = this._getContextElement($btn);
-        let planninglineId, startTime, endTime, resourceId;
-        let productId, qtyVal, depthVal;
-        let $contextEl;
+    // item autocomplete: refill the shared datalist with the products starting with the typed text
+    _onProductInput: function (ev) {
+        const term = ev.currentTarget.value;
+        clearTimeout(this._productTimer);
+        this._productTimer = setTimeout(async () => {
+            let products;
+            try {
+                products = await rpc('/partner/products/search', { term: term, limit: 20 });
+            } catch (e) {
+                console.warn('Failed to search products', e);
+                return;
+            }
+            this._productIds = this._productIds || new Map();
+            const datalist = document.getElementById('bcplanning-product-options');
+            if (!datalist) { return; }
+            datalist.replaceChildren(...products.map((product) => {
+                this._productIds.set(product.name.toLowerCase(), product.id);
+                const option = document.createElement('option');
+                option.value = product.name;
+                return option;
+            }));
+        }, 200);
+    },
 
-        if (ctx.type === 'row') {
-            $contextEl = ctx.el;
-            planninglineId = $contextEl.find('.data_planningline_id').text().trim();
-            startTime = $contextEl.find('.start-datetime-input').val(); // "HH:MM"
-            endTime = $contextEl.find('.end-datetime-input').val();     // "HH:MM"
-            resourceId = $contextEl.find('.resource-select').val(); // if used elsewhere
-            productId = $contextEl.find('.product-select').val();
-            qtyVal = $contextEl.find('.qty-input').val();
-            depthVal = $contextEl.find('.depth-input').val();
-        } else if (ctx.type === 'card') {
-            $contextEl = ctx.el;
-            planninglineId = $contextEl.find('.data_planningline_id').text().trim();
-            startTime = $contextEl.find('.start-datetime-input').val();
-            endTime = $contextEl.find('.end-datetime-input').val();
-            resourceId = $contextEl.find('.resource-select').val();
-            productId = $contextEl.find('.product-select').val();
-            qtyVal = $contextEl.find('.qty-input').val();
-            depthVal = $contextEl.find('.depth-input').val();
-        } else {
-            console.warn('Save button context not found');
+    // item autocomplete: the product id of the chosen name goes to the hidden .product-select
+    _onProductChange: function (ev) {
+        const $input = $(ev.currentTarget);
+        const $contextEl = this._getContextElement($input).el;
+        const name = $input.val().trim();
+        if (!name) {
+            $contextEl.find('.product-select').val('');
+            $input.removeClass('is-invalid');
             return;
         }
-
-        if (!planninglineId) {
-            alert('Planning line id not available. Cannot save.');
+        if (name === $input.attr('value')) {
+            $contextEl.find('.product-select').val($contextEl.find('.product-select').attr('data-saved') || '');
+            $input.removeClass('is-invalid');
             return;
         }
+        const productId = this._productIds && this._productIds.get(name.toLowerCase());
+        if (productId) {
+            $contextEl.find('.product-select').val(productId);
+            $input.removeClass('is-invalid');
+        } else {
+            // unknown name: keep the current product
+            $input.addClass('is-invalid');
+        }
+    },
 
+    // helper: the edit of a row/card in edit mode, as sent to the save routes
+    _collectEdit: function ($contextEl) {
         // Build full datetime strings (ISO-like) using date metadata + time-only inputs.
         const pageDateText = (document.querySelector('#selected-date-label') && document.querySelector('#selected-date-label').textContent) ? document.querySelector('#selected-date-label').textContent.trim() : '';
-        const fallbackDate = (pageDateText && pageDateText !== 'All dates') ? pageDateText : null;
-
-        const startDatetime = this._buildDatetimeFromTime($contextEl, '.start-datetime-view', startTime, fallbackDate); // "YYYY-MM-DDTHH:MM:SS" or null
-        const endDatetime = this._buildDatetimeFromTime($contextEl, '.end-datetime-view', endTime, fallbackDate);     // "YYYY-MM-DDTHH:MM:SS" or null
-
-        // show spinner and disable controls to prevent multi-click
-        this._showOverlay();
-        this._setContextButtonsDisabled($contextEl, true);
-        $btn.prop('disabled', true);
-
-        const self = this;
-        // NOTE: call the controller route you told me to keep: '/planningline/bor/save'
-        rpc('/planningline/bor/save', {
-            planningline_id: planninglineId,
+        const fallbackDate = /^\d{4}-\d{2}-\d{2}$/.test(pageDateText) ? pageDateText : null;
+        return {
+            planningline_id: $contextEl.find('.data_planningline_id').text().trim(),
             // send datetime strings or null (controller will be tolerant)
-            start_datetime: startDatetime,
-            end_datetime: endDatetime,
-            product_id: productId,
-            qty: qtyVal,
-            depth: depthVal,
-        }).then(function(result) {
-            if (result && result.result === 'updated') {
-                // update UI: times (as before)
-                if (startTime !== undefined) {
-                    $contextEl.find('.start-datetime-view').text(startTime ? startTime : '');
-                    const newStart = (result && result.new_start_datetime) ? result.new_start_datetime : startDatetime;
-                    if (newStart) {
-                        const parts = newStart.split('T');
-                        $contextEl.find('.start-datetime-view').attr('data-start-datetime', newStart);
-                        $contextEl.find('.start-datetime-view').attr('data-start-date', parts[0]);
-                    } else if (startDatetime) {
-                        const parts = startDatetime.split('T');
-                        $contextEl.find('.start-datetime-view').attr('data-start-datetime', startDatetime);
-                        $contextEl.find('.start-datetime-view').attr('data-start-date', parts[0]);
-                    }
-                }
-                if (endTime !== undefined) {
-                    $contextEl.find('.end-datetime-view').text(endTime ? endTime : '');
-                    const newEnd = (result && result.new_end_datetime) ? result.new_end_datetime : endDatetime;
-                    if (newEnd) {
-                        const parts = newEnd.split('T');
-                        $contextEl.find('.end-datetime-view').attr('data-end-datetime', newEnd);
-                        $contextEl.find('.end-datetime-view').attr('data-end-date', parts[0]);
-                    } else if (endDatetime) {
-                        const parts = endDatetime.split('T');
-                        $contextEl.find('.end-datetime-view').attr('data-end-datetime', endDatetime);
-                        $contextEl.find('.end-datetime-view').attr('data-end-date', parts[0]);
-                    }
-                }
+            start_datetime: this._buildDatetimeFromTime($contextEl, '.start-datetime-view', $contextEl.find('.start-datetime-input').val(), fallbackDate),
+            end_datetime: this._buildDatetimeFromTime($contextEl, '.end-datetime-view', $contextEl.find('.end-datetime-input').val(), fallbackDate),
+            product_id: $contextEl.find('.product-select').val(),
+            qty: $contextEl.find('.qty-input').val(),
+            depth: $contextEl.find('.depth-input').val(),
+        };
+    },
 
-                // update product, qty, depth UI
-                try {
-                    const newProd = (result && result.new_pl_product_id) ? result.new_pl_product_id : productId;
-                    if (newProd !== undefined && newProd !== null) {
-                        const optText = $contextEl.find('.product-select option[value="' + newProd + '"]').text() || '-';
-                        $contextEl.find('.product-view').text(optText);
-                        $contextEl.find('.product-select').val(newProd);
-                    }
-                    const newQty = (result && (result.new_pl_qty !== undefined)) ? result.new_pl_qty : qtyVal;
-                    if (newQty !== undefined && newQty !== null) {
-                        $contextEl.find('.qty-view').text(newQty);
-                        $contextEl.find('.qty-input').val(newQty);
-                        $contextEl.find('.qty-input').attr('value', newQty);
-                    }
-                    const newDepth = (result && (result.new_pl_depth !== undefined)) ? result.new_pl_depth : depthVal;
-                    if (newDepth !== undefined && newDepth !== null) {
-                        $contextEl.find('.depth-view').text(newDepth);
-                        $contextEl.find('.depth-input').val(newDepth);
-                        $contextEl.find('.depth-input').attr('value', newDepth);
-                    }
-                } catch (e) {
-                    console.error('Error updating product/qty/depth after save', e);
+    // helper: show a save result on the row/card, returns true when the line was updated
+    _applySaveResult: function ($contextEl, edit, result) {
+        const startTime = $contextEl.find('.start-datetime-input').val(); // "HH:MM"
+        const endTime = $contextEl.find('.end-datetime-input').val();     // "HH:MM"
+        const startDatetime = edit.start_datetime;
+        const endDatetime = edit.end_datetime;
+        const productId = edit.product_id;
+        const qtyVal = edit.qty;
+        const depthVal = edit.depth;
+        if (result && result.result === 'updated') {
+            // update UI: times (as before)
+            if (startTime !== undefined) {
+                $contextEl.find('.start-datetime-view').text(startTime ? startTime : '');
+                const newStart = (result && result.new_start_datetime) ? result.new_start_datetime : startDatetime;
+                if (newStart) {
+                    const parts = newStart.split('T');
+                    $contextEl.find('.start-datetime-view').attr('data-start-datetime', newStart);
+                    $contextEl.find('.start-datetime-view').attr('data-start-date', parts[0]);
+                } else if (startDatetime) {
+                    const parts = startDatetime.split('T');
+                    $contextEl.find('.start-datetime-view').attr('data-start-datetime', startDatetime);
+                    $contextEl.find('.start-datetime-view').attr('data-start-date', parts[0]);
+                }
+            }
+            if (endTime !== undefined) {
+                $contextEl.find('.end-datetime-view').text(endTime ? endTime : '');
+                const newEnd = (result && result.new_end_datetime) ? result.new_end_datetime : endDatetime;
+                if (newEnd) {
+                    const parts = newEnd.split('T');
+                    $contextEl.find('.end-datetime-view').attr('data-end-datetime', newEnd);
+                    $contextEl.find('.end-datetime-view').attr('data-end-date', parts[0]);
+                } else if (endDatetime) {
+                    const parts = endDatetime.split('T');
+                    $contextEl.find('.end-datetime-view').attr('data-end-datetime', endDatetime);
+                    $contextEl.find('.end-datetime-view').attr('data-end-date', parts[0]);
                 }
-
-                // restore normal view mode
-                $contextEl.attr('data-editing', '0');
-                $contextEl.find('.start-datetime-view, .end-datetime-view, .product-view, .qty-view, .depth-view').removeClass('d-none');
-                $contextEl.find('.start-datetime-input, .end-datetime-input, .product-select, .qty-input, .depth-input').addClass('d-none');
-                $contextEl.find('.edit-row').removeClass('d-none');
-                $contextEl.find('.save-row, .cancel-row').addClass('d-none');
-                alert('Data updated successfully.');
-                return;
             }
 
-            // failure path...
-            const msg = (result && result.result) ? result.result : 'Update failed';
-            alert(msg);
-
+            // update product, qty, depth UI
             try {
-                if (result && result.old_start_datetime !== undefined) {
-                    let old = result.old_start_datetime || '';
-                    let timeOnly = '';
-                    let dateOnly = '';
-                    if (old.indexOf('T') !== -1) {
-                        const parts = old.split('T');
-                        dateOnly = parts[0];
-                        timeOnly = (parts[1] || '').slice(0,5);
-                    } else {
-                        timeOnly = old.slice(0,5);
-                    }
-                    $contextEl.find('.start-datetime-input').val(timeOnly);
-                    $contextEl.find('.start-datetime-input').attr('value', timeOnly);
-                    $contextEl.find('.start-datetime-view').text(timeOnly ? timeOnly : '');
-                    if (dateOnly) {
-                        $contextEl.find('.start-datetime-view').attr('data-start-date', dateOnly);
-                        $contextEl.find('.start-datetime-view').attr('data-start-datetime', result.old_start_datetime);
-                    }
+                const newProd = (result && result.new_pl_product_id) ? result.new_pl_product_id : productId;
+                if (newProd !== undefined && newProd !== null) {
+                    const name = newProd ? $contextEl.find('.product-input').val() : '';
+                    $contextEl.find('.product-view').text(name || '-');
+                    $contextEl.find('.product-select').val(newProd).attr('data-saved', newProd);
+                    $contextEl.find('.product-input').val(name).attr('value', name).removeClass('is-invalid');
                 }
-                if (result && result.old_end_datetime !== undefined) {
-                    let old = result.old_end_datetime || '';
-                    let timeOnly = '';
-                    let dateOnly = '';
-                    if (old.indexOf('T') !== -1) {
-                        const parts = old.split('T');
-                        dateOnly = parts[0];
-                        timeOnly = (parts[1] || '').slice(0,5);
-                    } else {
-                        timeOnly = old.slice(0,5);
-                    }
-                    $contextEl.find('.end-datetime-input').val(timeOnly);
-                    $contextEl.find('.end-datetime-input').attr('value', timeOnly);
-                    $contextEl.find('.end-datetime-view').text(timeOnly ? timeOnly : '');
-                    if (dateOnly) {
-                        $contextEl.find('.end-datetime-view').attr('data-end-date', dateOnly);
-                        $contextEl.find('.end-datetime-view').attr('data-end-datetime', result.old_end_datetime);
-                    }
+                const newQty = (result && (result.new_pl_qty !== undefined)) ? result.new_pl_qty : qtyVal;
+                if (newQty !== undefined && newQty !== null) {
+                    $contextEl.find('.qty-view').text(newQty);
+                    $contextEl.find('.qty-input').val(newQty);
+                    $contextEl.find('.qty-input').attr('value', newQty);
                 }
-
-                if (result && result.old_pl_product_id !== undefined) {
-                    const oldProd = result.old_pl_product_id || '';
-                    const optText = $contextEl.find('.product-select option[value="' + oldProd + '"]').text() || '-';
-                    $contextEl.find('.product-select').val(oldProd);
-                    $contextEl.find('.product-view').text(optText);
-                } else {
-                    $contextEl.find('.product-select').val($contextEl.find('.product-select').find('option[selected]').val() || '');
+                const newDepth = (result && (result.new_pl_depth !== undefined)) ? result.new_pl_depth : depthVal;
+                if (newDepth !== undefined && newDepth !== null) {
+                    $contextEl.find('.depth-view').text(newDepth);
+                    $contextEl.find('.depth-input').val(newDepth);
+                    $contextEl.find('.depth-input').attr('value', newDepth);
                 }
+            } catch (e) {
+                console.error('Error updating product/qty/depth after save', e);
+            }
 
-                if (result && result.old_pl_qty !== undefined) {
-                    $contextEl.find('.qty-input').val(result.old_pl_qty);
-                    $contextEl.find('.qty-input').attr('value', result.old_pl_qty);
-                    $contextEl.find('.qty-view').text(result.old_pl_qty);
+            // restore normal view mode
+            $contextEl.attr('data-editing', '0');
+            $contextEl.find('.start-datetime-view, .end-datetime-view, .product-view, .qty-view, .depth-view').removeClass('d-none');
+            $contextEl.find('.start-datetime-input, .end-datetime-input, .product-input, .qty-input, .depth-input').addClass('d-none');
+            $contextEl.find('.edit-row').removeClass('d-none');
+            $contextEl.find('.save-row, .cancel-row').addClass('d-none');
+            return true;
+        }
+
+        // failure path: restore old values
+        try {
+            if (result && result.old_start_datetime !== undefined) {
+                let old = result.old_start_datetime || '';
+                let timeOnly = '';
+                let dateOnly = '';
+                if (old.indexOf('T') !== -1) {
+                    const parts = old.split('T');
+                    dateOnly = parts[0];
+                    timeOnly = (parts[1] || '').slice(0,5);
                 } else {
-                    $contextEl.find('.qty-input').val($contextEl.find('.qty-input').attr('value'));
+                    timeOnly = old.slice(0,5);
                 }
-
-                if (result && result.old_pl_depth !== undefined) {
-                    $contextEl.find('.depth-input').val(result.old_pl_depth);
-                    $contextEl.find('.depth-input').attr('value', result.old_pl_depth);
-                    $contextEl.find('.depth-view').text(result.old_pl_depth);
+                $contextEl.find('.start-datetime-input').val(timeOnly);
+                $contextEl.find('.start-datetime-input').attr('value', timeOnly);
+                $contextEl.find('.start-datetime-view').text(timeOnly ? timeOnly : '');
+                if (dateOnly) {
+                    $contextEl.find('.start-datetime-view').attr('data-start-date', dateOnly);
+                    $contextEl.find('.start-datetime-view').attr('data-start-datetime', result.old_start_datetime);
+                }
+            }
+            if (result && result.old_end_datetime !== undefined) {
+                let old = result.old_end_datetime || '';
+                let timeOnly = '';
+                let dateOnly = '';
+                if (old.indexOf('T') !== -1) {
+                    const parts = old.split('T');
+                    dateOnly = parts[0];
+                    timeOnly = (parts[1] || '').slice(0,5);
                 } else {
-                    $contextEl.find('.depth-input').val($contextEl.find('.depth-input').attr('value'));
+                    timeOnly = old.slice(0,5);
+                }
+                $contextEl.find('.end-datetime-input').val(timeOnly);
+                $contextEl.find('.end-datetime-input').attr('value', timeOnly);
+                $contextEl.find('.end-datetime-view').text(timeOnly ? timeOnly : '');
+                if (dateOnly) {
+                    $contextEl.find('.end-datetime-view').attr('data-end-date', dateOnly);
+                    $contextEl.find('.end-datetime-view').attr('data-end-datetime', result.old_end_datetime);
                 }
+            }
 
-            } catch (e) {
-                console.error('Error restoring values after failed save', e);
+            // the old product is the one rendered (or last saved) in the value attributes
+            $contextEl.find('.product-select').val($contextEl.find('.product-select').attr('data-saved') || '');
+            $contextEl.find('.product-input').val($contextEl.find('.product-input').attr('value') || '').removeClass('is-invalid');
+            $contextEl.find('.product-view').text($contextEl.find('.product-input').attr('value') || '-');
+
+            if (result && result.old_pl_qty !== undefined) {
+                $contextEl.find('.qty-input').val(result.old_pl_qty);
+                $contextEl.find('.qty-input').attr('value', result.old_pl_qty);
+                $contextEl.find('.qty-view').text(result.old_pl_qty);
+            } else {
+                $contextEl.find('.qty-input').val($contextEl.find('.qty-input').attr('value'));
             }
 
-            try {
-                $contextEl.find('.cancel-row').trigger('click');
-            } catch (e) {
-                console.error('Error triggering cancel after failure', e);
+            if (result && result.old_pl_depth !== undefined) {
+                $contextEl.find('.depth-input').val(result.old_pl_depth);
+                $contextEl.find('.depth-input').attr('value', result.old_pl_depth);
+                $contextEl.find('.depth-view').text(result.old_pl_depth);
+            } else {
+                $contextEl.find('.depth-input').val($contextEl.find('.depth-input').attr('value'));
+            }
+
+        } catch (e) {
+            console.error('Error restoring values after failed save', e);
+        }
+
+        try {
+            $contextEl.find('.cancel-row').trigger('click');
+        } catch (e) {
+            console.error('Error triggering cancel after failure', e);
+        }
+        return false;
+    },
+
+    _onSaveRow: function (ev) {
+        const $btn = $(ev.currentTarget);
+        const ctx = this._getContextElement($btn);
+        if (!ctx.type) {
+            console.warn('Save button context not found');
+            return;
+        }
+        const $contextEl = ctx.el;
+        const edit = this._collectEdit($contextEl);
+
+        if (!edit.planningline_id) {
+            alert('Planning line id not available. Cannot save.');
+            return;
+        }
+
+        // show spinner and disable controls to prevent multi-click
+        this._showOverlay();
+        this._setContextButtonsDisabled($contextEl, true);
+        $btn.prop('disabled', true);
+
+        const self = this;
+        rpc('/planningline/bor/save', edit).then(function(result) {
+            if (self._applySaveResult($contextEl, edit, result)) {
+                alert('Data updated successfully.');
+            } else {
+                alert((result && result.result) ? result.result : 'Update failed');
             }
         }).catch(function (err) {
             console.error('RPC error (network or server):', err);
@@ -499,4 +553,55 @@ publicWidget.registry.Bor = publicWidget.Widget.extend({
         });
     },
 
+    // "Save all changes": every row/card in edit mode in one request
+    _onSaveAll: function (ev) {
+        ev.preventDefault();
+        const self = this;
+        const $btn = $(ev.currentTarget);
+        const contexts = {};
+        const edits = [];
+        this.$el.find('tr.planningline-row[data-editing="1"], .mobile-planning-card[data-editing="1"]').each(function () {
+            const $contextEl = $(this);
+            const edit = self._collectEdit($contextEl);
+            if (!edit.planningline_id || contexts[edit.planningline_id]) { return; }
+            contexts[edit.planningline_id] = $contextEl;
+            edits.push(edit);
+        });
+        if (!edits.length) {
+            alert('No changes to save.');
+            return;
+        }
+
+        this._showOverlay();
+        $btn.prop('disabled', true);
+        rpc('/bcplanningline/save_many', { page: 'bor', edits: edits }).then(function (result) {
+            const failed = [];
+            (result && result.lines || []).forEach(function (line) {
+                const $contextEl = contexts[line.planningline_id];
+                if (!$contextEl) { return; }
+                const edit = edits.find((e) => String(e.planningline_id) === String(line.planningline_id));
+                if (!self._applySaveResult($contextEl, edit, line)) {
+                    failed.push(`#${line.planningline_id}: ${line.result}`);
+                }
+            });
+            if (failed.length) {
+                alert('Some changes were not saved:\n' + failed.join('\n'));
+            } else {
+                alert(`${edits.length} change(s) saved successfully.`);
+            }
+        }).catch(function (err) {
+            console.error('RPC error (network or server):', err);
+            var userMsg = 'Update failed (network or permissions).';
+            try {
+                if (err && err.data && err.data.message) {
+                    userMsg = err.data.message;
+                }
+            } catch (e) {}
+            alert(userMsg);
+        }).finally(function () {
+            self._hideOverlay();
+            $btn.prop('disabled', false);
+        });
+    },
+
 });
\ No newline at end of file
@@ -0,0 +1,147 @@
+/** @odoo-module **/
+import publicWidget from "@web/legacy/js/public/public_widget";
+import { rpc } from "@web/core/network/rpc";
+
+const LABEL_WIDTH = 160;
+const HEADER_HEIGHT = 20;
+const ROW_HEIGHT = 18;
+
+/**
+ * Resource occupancy heatmap (/partner/heatmap): one row per resource, one cell per slot,
+ * drawn on a canvas from the load matrix of /partner/heatmap/data (percent of the slot booked).
+ */
+publicWidget.registry.BCPlanningHeatmap = publicWidget.Widget.extend({
+    selector: ".bcplanning-heatmap",
+    events: {
+        'click .heatmap-prev': '_onPrev',
+        'click .heatmap-next': '_onNext',
+        'click .heatmap-today': '_onToday',
+        'change .heatmap-weeks, .heatmap-slot': '_load',
+        'mousemove .heatmap-canvas': '_onMouseMove',
+    },
+
+    start: function () {
+        this._super.apply(this, arguments);
+        this._date = new Date();
+        return this._load();
+    },
+
+    _formatDate: function (d) {
+        const yyyy = d.getFullYear();
+        const mm = String(d.getMonth() + 1).padStart(2, '0');
+        const dd = String(d.getDate()).padStart(2, '0');
+        return `${yyyy}-${mm}-${dd}`;
+    },
+
+    _onPrev: function (ev) {
+        ev.preventDefault();
+        this._shift(-1);
+    },
+
+    _onNext: function (ev) {
+        ev.preventDefault();
+        this._shift(1);
+    },
+
+    _onToday: function (ev) {
+        ev.preventDefault();
+        this._date = new Date();
+        this._load();
+    },
+
+    // move by the number of weeks shown
+    _shift: function (direction) {
+        const weeks = parseInt(this.el.querySelector('.heatmap-weeks').value, 10) || 1;
+        this._date = new Date(this._date.getFullYear(), this._date.getMonth(), this._date.getDate() + 7 * weeks * direction);
+        this._load();
+    },
+
+    _load: async function () {
+        try {
+            this._data = await rpc('/partner/heatmap/data', {
+                date: this._formatDate(this._date),
+                weeks: this.el.querySelector('.heatmap-weeks').value,
+                slot_minutes: this.el.querySelector('.heatmap-slot').value,
+            });
+        } catch (e) {
+            console.error('Failed to load the heatmap', e);
+            return;
+        }
+        const from = new Date(`${this._data.date_from}T00:00:00`);
+        const to = new Date(from.getFullYear(), from.getMonth(), from.getDate() + this._data.days - 1);
+        this.el.querySelector('.heatmap-period').textContent = `${this._data.date_from} - ${this._formatDate(to)}`;
+        this._draw();
+    },
+
+    _cellWidth: function () {
+        return this._data.slot_minutes < 60 ? 3 : 8;
+    },
+
+    _draw: function () {
+        const data = this._data;
+        const canvas = this.el.querySelector('.heatmap-canvas');
+        this.el.querySelector('.heatmap-empty').classList.toggle('d-none', data.resources.length > 0);
+        canvas.classList.toggle('d-none', !data.resources.length);
+        if (!data.resources.length) {
+            return;
+        }
+        const slotsPerDay = 24 * 60 / data.slot_minutes;
+        const slots = data.days * slotsPerDay;
+        const cell = this._cellWidth();
+        canvas.width = LABEL_WIDTH + slots * cell;
+        canvas.height = HEADER_HEIGHT + data.resources.length * ROW_HEIGHT;
+        const ctx = canvas.getContext('2d');
+        ctx.clearRect(0, 0, canvas.width, canvas.height);
+        ctx.font = '11px sans-serif';
+        ctx.textBaseline = 'middle';
+
+        // day headers and separators
+        const from = new Date(`${data.date_from}T00:00:00`);
+        for (let day = 0; day < data.days; day++) {
+            const x = LABEL_WIDTH + day * slotsPerDay * cell;
+            const d = new Date(from.getFullYear(), from.getMonth(), from.getDate() + day);
+            ctx.fillStyle = '#6c757d';
+            ctx.fillText(d.toLocaleDateString(undefined, { weekday: 'short', day: 'numeric', month: 'numeric' }), x + 2, HEADER_HEIGHT / 2);
+            ctx.fillStyle = '#dee2e6';
+            ctx.fillRect(x, 0, 1, canvas.height);
+        }
+
+        data.resources.forEach((resource, row) => {
+            const y = HEADER_HEIGHT + row * ROW_HEIGHT;
+            ctx.fillStyle = '#212529';
+            ctx.fillText(resource.name, 2, y + ROW_HEIGHT / 2, LABEL_WIDTH - 4);
+            const load = data.load[row];
+            for (let slot = 0; slot < slots; slot++) {
+                const value = load[slot];
+                if (!value) {
+                    continue;
+                }
+                ctx.fillStyle = value > 100
+                    ? 'rgb(220, 53, 69)'
+                    : `rgba(25, 135, 84, ${0.25 + 0.75 * value / 100})`;
+                ctx.fillRect(LABEL_WIDTH + slot * cell, y + 1, cell, ROW_HEIGHT - 2);
+            }
+        });
+    },
+
+    // tooltip: resource, slot start and load under the pointer
+    _onMouseMove: function (ev) {
+        const data = this._data;
+        if (!data) {
+            return;
+        }
+        const canvas = ev.currentTarget;
+        const rect = canvas.getBoundingClientRect();
+        const row = Math.floor((ev.clientY - rect.top - HEADER_HEIGHT) / ROW_HEIGHT);
+        const slot = Math.floor((ev.clientX - rect.left - LABEL_WIDTH) / this._cellWidth());
+        if (row < 0 || row >= data.resources.length || slot < 0 || slot >= data.load[row].length) {
+            canvas.title = '';
+            return;
+        }
+        const from = new Date(`${data.date_from}T00:00:00`);
+        const start = new Date(from.getTime() + slot * data.slot_minutes * 60000);
+        const hh = String(start.getHours()).padStart(2, '0');
+        const mi = String(start.getMinutes()).padStart(2, '0');
+        canvas.title = `${data.resources[row].name}\n${this._formatDate(start)} ${hh}:${mi}\n${data.load[row][slot]}%`;
+    },
+});
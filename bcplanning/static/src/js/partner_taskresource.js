@@ -1,9 +1,11 @@
 /** @odoo-module **/
 import publicWidget from "@web/legacy/js/public/public_widget";
 import { rpc } from "@web/core/network/rpc";
+import { PlanningPagerMixin } from "./planning_pager";
 
-publicWidget.registry.TaskResource = publicWidget.Widget.extend({
+publicWidget.registry.TaskResource = publicWidget.Widget.extend(PlanningPagerMixin, {
     selector: "#taskresource_wrap",
+    pagerPage: 'taskresource',
 
     events: {
         'click .edit-row': '_onEditRow',
@@ -12,7 +14,11 @@ publicWidget.registry.TaskResource = publicWidget.Widget.extend({
         'click #btn-prev-day': '_onPrevDay',
         'click #btn-next-day': '_onNextDay',
         'click #btn-today': '_onTodayClick',
+        'click #btn-week': '_onWeekClick',
+        'click #btn-month': '_onMonthClick',
         'click #btn-clear': '_onClearClick',
+        'click #btn-save-all': '_onSaveAll',
+        'click .load-more': '_onLoadMore',
     },
 
     start: function () {
@@ -20,11 +26,17 @@ publicWidget.registry.TaskResource = publicWidget.Widget.extend({
         const params = new URLSearchParams(window.location.search);
         const urlDate = params.get('date');
         const noDate = params.get('no_date');
+        const rangeFrom = params.get('date_from');
+        const rangeTo = params.get('date_to');
         const lbl = this.el.querySelector('#selected-date-label');
 
         if (urlDate) {
             this._currentDate = this._parseDateString(urlDate);
             if (lbl) { lbl.textContent = urlDate; }
+        } else if (rangeFrom || rangeTo) {
+            // the label of the range is rendered by the server
+            this._currentDate = rangeFrom ? this._parseDateString(rangeFrom) : new Date();
+            this._rangeKind = this._rangeKindOf(rangeFrom, rangeTo);
         } else if (noDate) {
             this._currentDate = new Date();
             if (lbl) { lbl.textContent = ''; }
@@ -37,6 +49,9 @@ publicWidget.registry.TaskResource = publicWidget.Widget.extend({
             this._currentDate = new Date();
             if (lbl) { lbl.textContent = this._formatDate(this._currentDate); }
         }
+
+        this._setupPager();
+        this._setupDayNavigation();
     },
 
     // helper: overlay show/hide
@@ -76,14 +91,12 @@ publicWidget.registry.TaskResource = publicWidget.Widget.extend({
 
     _changeDateAndReload: function (dateObj) {
         this._currentDate = new Date(dateObj.getFullYear(), dateObj.getMonth(), dateObj.getDate());
-        const params = new URLSearchParams(window.location.search);
-        if (params.has('no_date')) { params.delete('no_date'); }
-        params.set('date', this._formatDate(this._currentDate));
-        window.location.search = params.toString();
+        this._loadPlanning({ date: this._formatDate(this._currentDate) });
     },
 
     _onPrevDay: function (ev) {
         ev.preventDefault();
+        if (this._stepRange(-1)) { return; }
         const d = new Date(this._currentDate);
         d.setDate(d.getDate() - 1);
         this._changeDateAndReload(d);
@@ -91,6 +104,7 @@ publicWidget.registry.TaskResource = publicWidget.Widget.extend({
 
     _onNextDay: function (ev) {
         ev.preventDefault();
+        if (this._stepRange(1)) { return; }
         const d = new Date(this._currentDate);
         d.setDate(d.getDate() + 1);
         this._changeDateAndReload(d);
@@ -161,10 +175,7 @@ publicWidget.registry.TaskResource = publicWidget.Widget.extend({
 
     _onClearClick: function (ev) {
         ev.preventDefault();
-        const params = new URLSearchParams(window.location.search);
-        if (params.has('date')) { params.delete('date'); }
-        params.set('no_date', '1');
-        window.location.search = '?' + params.toString();
+        this._loadPlanning({ no_date: true });
     },
 
     _getContextElement: function ($btn) {
@@ -230,30 +241,76 @@ publicWidget.registry.TaskResource = publicWidget.Widget.extend({
         }
     },
 
+    // helper: the edit of a row/card in edit mode, as sent to the save routes
+    _collectEdit: function ($contextEl) {
+        return {
+            planningline_id: $contextEl.find('.data_planningline_id').text().trim(),
+            start_datetime: $contextEl.find('.start-datetime-input').val(),
+            end_datetime: $contextEl.find('.end-datetime-input').val(),
+        };
+    },
+
+    // helper: show a save result on the row/card, returns true when the line was updated
+    _applySaveResult: function ($contextEl, edit, result) {
+        const startDatetime = edit.start_datetime;
+        const endDatetime = edit.end_datetime;
+        // success path: controller returns {'result': 'updated'} when saved
+        if (result && result.result === 'updated') {
+            // update UI
+            $contextEl.find('.start-datetime-view').text(startDatetime ? startDatetime.replace('T', ' ') : '');
+            $contextEl.find('.end-datetime-view').text(endDatetime ? endDatetime.replace('T', ' ') : '');
+            $contextEl.find('.resource-view').text($contextEl.find('.resource-select option:selected').text());
+            $contextEl.attr('data-editing', '0');
+            $contextEl.find('.start-datetime-view, .end-datetime-view, .resource-view').removeClass('d-none');
+            $contextEl.find('.start-datetime-input, .end-datetime-input, .resource-select').addClass('d-none');
+            $contextEl.find('.edit-row').removeClass('d-none');
+            $contextEl.find('.save-row, .cancel-row').addClass('d-none');
+            return true;
+        }
+
+        // restore values returned by server (if provided); otherwise let cancel handler restore from attr(value)
+        try {
+            if (result && result.old_start_datetime !== undefined) {
+                // old_start_datetime format expected 'YYYY-MM-DDTHH:MM' or ''
+                $contextEl.find('.start-datetime-input').val(result.old_start_datetime);
+                $contextEl.find('.start-datetime-input').attr('value', result.old_start_datetime);
+                $contextEl.find('.start-datetime-view').text(result.old_start_datetime ? result.old_start_datetime.replace('T', ' ') : '');
+            }
+            if (result && result.old_end_datetime !== undefined) {
+                $contextEl.find('.end-datetime-input').val(result.old_end_datetime);
+                $contextEl.find('.end-datetime-input').attr('value', result.old_end_datetime);
+                $contextEl.find('.end-datetime-view').text(result.old_end_datetime ? result.old_end_datetime.replace('T', ' ') : '');
+            }
+            // if (result && result.old_resource_id !== undefined) {
+            //     $contextEl.find('.resource-select').val(result.old_resource_id);
+            //     // update resource-view text
+            //     const selText = $contextEl.find('.resource-select option[value="' + result.old_resource_id + '"]').text() || '-';
+            //     $contextEl.find('.resource-view').text(selText);
+            // }
+        } catch (e) {
+            console.error('Error restoring values after failed save', e);
+        }
+
+        // execute cancel trigger to hide inputs and restore UI state
+        try {
+            $contextEl.find('.cancel-row').trigger('click');
+        } catch (e) {
+            console.error('Error triggering cancel after failure', e);
+        }
+        return false;
+    },
+
     _onSaveRow: function (ev) {
         const $btn = $(ev.currentTarget);
         const ctx = this._getContextElement($btn);
-        let planninglineId, startDatetime, endDatetime, resourceId;
-        let $contextEl;
-
-        if (ctx.type === 'row') {
-            $contextEl = ctx.el;
-            planninglineId = $contextEl.find('.data_planningline_id').text().trim();
-            startDatetime = $contextEl.find('.start-datetime-input').val();
-            endDatetime = $contextEl.find('.end-datetime-input').val();
-            resourceId = $contextEl.find('.resource-select').val();
-        } else if (ctx.type === 'card') {
-            $contextEl = ctx.el;
-            planninglineId = $contextEl.find('.data_planningline_id').text().trim();
-            startDatetime = $contextEl.find('.start-datetime-input').val();
-            endDatetime = $contextEl.find('.end-datetime-input').val();
-            resourceId = $contextEl.find('.resource-select').val();
-        } else {
+        if (!ctx.type) {
             console.warn('Save button context not found');
             return;
         }
+        const $contextEl = ctx.el;
+        const edit = this._collectEdit($contextEl);
 
-        if (!planninglineId) {
+        if (!edit.planningline_id) {
             alert('Planning line id not available. Cannot save.');
             return;
         }
@@ -264,58 +321,11 @@ publicWidget.registry.TaskResource = publicWidget.Widget.extend({
         $btn.prop('disabled', true);
 
         const self = this;
-        rpc('/planningline/taskresource/save', {
-            planningline_id: planninglineId,
-            start_datetime: startDatetime,
-            end_datetime: endDatetime,            
-        }).then(function(result) {
-            // success path: controller returns {'result': 'updated'} when BC ok
-            if (result && result.result === 'updated') {
-                // update UI
-                $contextEl.find('.start-datetime-view').text(startDatetime ? startDatetime.replace('T', ' ') : '');
-                $contextEl.find('.end-datetime-view').text(endDatetime ? endDatetime.replace('T', ' ') : '');
-                $contextEl.find('.resource-view').text($contextEl.find('.resource-select option:selected').text());
-                $contextEl.attr('data-editing', '0');
-                $contextEl.find('.start-datetime-view, .end-datetime-view, .resource-view').removeClass('d-none');
-                $contextEl.find('.start-datetime-input, .end-datetime-input, .resource-select').addClass('d-none');
-                $contextEl.find('.edit-row').removeClass('d-none');
-                $contextEl.find('.save-row, .cancel-row').addClass('d-none');
+        rpc('/planningline/taskresource/save', edit).then(function(result) {
+            if (self._applySaveResult($contextEl, edit, result)) {
                 alert('Data updated successfully.');
-                return;
-            }
-
-            // failure path: controller returned a business failure (didn't update BC)
-            const msg = (result && result.result) ? result.result : 'Update failed';
-            alert(msg);
-
-            // restore values returned by server (if provided); otherwise let cancel handler restore from attr(value)
-            try {
-                if (result && result.old_start_datetime !== undefined) {
-                    // old_start_datetime format expected 'YYYY-MM-DDTHH:MM' or ''
-                    $contextEl.find('.start-datetime-input').val(result.old_start_datetime);
-                    $contextEl.find('.start-datetime-input').attr('value', result.old_start_datetime);
-                    $contextEl.find('.start-datetime-view').text(result.old_start_datetime ? result.old_start_datetime.replace('T', ' ') : '');
-                }
-                if (result && result.old_end_datetime !== undefined) {
-                    $contextEl.find('.end-datetime-input').val(result.old_end_datetime);
-                    $contextEl.find('.end-datetime-input').attr('value', result.old_end_datetime);
-                    $contextEl.find('.end-datetime-view').text(result.old_end_datetime ? result.old_end_datetime.replace('T', ' ') : '');
-                }
-                // if (result && result.old_resource_id !== undefined) {
-                //     $contextEl.find('.resource-select').val(result.old_resource_id);
-                //     // update resource-view text
-                //     const selText = $contextEl.find('.resource-select option[value="' + result.old_resource_id + '"]').text() || '-';
-                //     $contextEl.find('.resource-view').text(selText);
-                // }
-            } catch (e) {
-                console.error('Error restoring values after failed save', e);
-            }
-
-            // execute cancel trigger to hide inputs and restore UI state
-            try {
-                $contextEl.find('.cancel-row').trigger('click');
-            } catch (e) {
-                console.error('Error triggering cancel after failure', e);
+            } else {
+                alert((result && result.result) ? result.result : 'Update failed');
             }
         }).catch(function (err) {
             console.error('RPC error (network or server):', err);
@@ -337,7 +347,6 @@ publicWidget.registry.TaskResource = publicWidget.Widget.extend({
                 console.error('Error triggering cancel after RPC error', e);
             }
         }).finally(function() {
-            // always hide spinner and re-enable controls
             try {
                 self._hideOverlay();
                 self._setContextButtonsDisabled($contextEl, false);
@@ -348,4 +357,55 @@ publicWidget.registry.TaskResource = publicWidget.Widget.extend({
         });
     },
 
+    // "Save all changes": every row/card in edit mode in one request
+    _onSaveAll: function (ev) {
+        ev.preventDefault();
+        const self = this;
+        const $btn = $(ev.currentTarget);
+        const contexts = {};
+        const edits = [];
+        this.$el.find('tr.planningline-row[data-editing="1"], .mobile-planning-card[data-editing="1"]').each(function () {
+            const $contextEl = $(this);
+            const edit = self._collectEdit($contextEl);
+            if (!edit.planningline_id || contexts[edit.planningline_id]) { return; }
+            contexts[edit.planningline_id] = $contextEl;
+            edits.push(edit);
+        });
+        if (!edits.length) {
+            alert('No changes to save.');
+            return;
+        }
+
+        this._showOverlay();
+        $btn.prop('disabled', true);
+        rpc('/bcplanningline/save_many', { page: 'taskresource', edits: edits }).then(function (result) {
+            const failed = [];
+            (result && result.lines || []).forEach(function (line) {
+                const $contextEl = contexts[line.planningline_id];
+                if (!$contextEl) { return; }
+                const edit = edits.find((e) => String(e.planningline_id) === String(line.planningline_id));
+                if (!self._applySaveResult($contextEl, edit, line)) {
+                    failed.push(`#${line.planningline_id}: ${line.result}`);
+                }
+            });
+            if (failed.length) {
+                alert('Some changes were not saved:\n' + failed.join('\n'));
+            } else {
+                alert(`${edits.length} change(s) saved successfully.`);
+            }
+        }).catch(function (err) {
+            console.error('RPC error (network or server):', err);
+            var userMsg = 'Update failed (network or permissions).';
+            try {
+                if (err && err.data && err.data.message) {
+                    userMsg = err.data.message;
+                }
+            } catch (e) {}
+            alert(userMsg);
+        }).finally(function () {
+            self._hideOverlay();
+            $btn.prop('disabled', false);
+        });
+    },
+
 });
\ No newline at end of file
@@ -0,0 +1,247 @@
+/** @odoo-module **/
+import { rpc } from "@web/core/network/rpc";
+
+/**
+ * Infinite scroll of the "all dates" (?no_date=1) and date range (?date_from=...&date_to=...) views
+ * of the planning pages.
+ * The server renders the first page; the next ones are fetched from /partner/planning/more (with html: true)
+ * when the .bcplanning-more element scrolls into view (or its "Load more" button is clicked)
+ * and appended to .bcplanning-rows (desktop) and .bcplanning-cards (mobile).
+ * Date navigation swaps the planning of another date, week, month (or all dates) in place,
+ * fetched from /partner/planning/day, and keeps the URL in sync with history.pushState.
+ * The widget sets pagerPage ('task', 'bor' or 'taskresource').
+ */
+export const PlanningPagerMixin = {
+    pagerPage: null,
+
+    _setupPager: function () {
+        const more = this.el.querySelector('.bcplanning-more');
+        if (!more || !('IntersectionObserver' in window)) {
+            return;
+        }
+        this._pagerObserver = new IntersectionObserver((entries) => {
+            if (entries.some((entry) => entry.isIntersecting)) {
+                this._loadMore();
+            }
+        }, { rootMargin: '400px 0px' });
+        this._pagerObserver.observe(more);
+    },
+
+    _onLoadMore: function (ev) {
+        ev.preventDefault();
+        this._loadMore();
+    },
+
+    _loadMore: async function () {
+        const more = this.el.querySelector('.bcplanning-more');
+        if (!more || this._pagerLoading) {
+            return;
+        }
+        this._pagerLoading = true;
+        const seq = this._planningSeq;
+        const button = more.querySelector('.load-more');
+        if (button) { button.disabled = true; }
+        try {
+            const params = new URLSearchParams(window.location.search);
+            const result = await rpc('/partner/planning/more', {
+                page: this.pagerPage,
+                html: true,
+                cursor: more.dataset.cursor,
+                job_id: params.get('job_id') || null,
+                date_from: params.get('date_from') || null,
+                date_to: params.get('date_to') || null,
+            });
+            if (seq !== this._planningSeq) {
+                return;  // the planning was swapped meanwhile, these lines belong to the old view
+            }
+            const rows = this.el.querySelector('.bcplanning-rows');
+            const cards = this.el.querySelector('.bcplanning-cards');
+            if (rows) { rows.insertAdjacentHTML('beforeend', result.rows); }
+            if (cards) { cards.insertAdjacentHTML('beforeend', result.cards); }
+            if (result.has_more) {
+                more.dataset.cursor = result.next_cursor;
+            } else {
+                this._stopPager();
+                more.remove();
+            }
+        } catch (e) {
+            console.error('Failed to load more planning lines', e);
+        } finally {
+            if (seq === this._planningSeq) {
+                this._pagerLoading = false;
+            }
+            if (button) { button.disabled = false; }
+        }
+    },
+
+    _setupDayNavigation: function () {
+        this._onPopState = () => {
+            const params = new URLSearchParams(window.location.search);
+            this._loadPlanning({
+                date: params.get('date') || null,
+                no_date: !!params.get('no_date'),
+                date_from: params.get('date_from') || null,
+                date_to: params.get('date_to') || null,
+            }, false);
+        };
+        window.addEventListener('popstate', this._onPopState);
+    },
+
+    _onWeekClick: function (ev) {
+        ev.preventDefault();
+        const d = this._currentDate || new Date();
+        // weeks start on monday
+        this._loadRange(new Date(d.getFullYear(), d.getMonth(), d.getDate() - ((d.getDay() + 6) % 7)), 'week');
+    },
+
+    _onMonthClick: function (ev) {
+        ev.preventDefault();
+        const d = this._currentDate || new Date();
+        this._loadRange(new Date(d.getFullYear(), d.getMonth(), 1), 'month');
+    },
+
+    /**
+     * Step the current week or month view by direction (-1, 1).
+     * Returns false when no range is shown, the caller then steps by day.
+     */
+    _stepRange: function (direction) {
+        const params = new URLSearchParams(window.location.search);
+        const from = params.get('date_from') && this._parseDateString(params.get('date_from'));
+        if (!from || !this._rangeKind) {
+            return false;
+        }
+        if (this._rangeKind === 'week') {
+            this._loadRange(new Date(from.getFullYear(), from.getMonth(), from.getDate() + 7 * direction), 'week');
+        } else {
+            this._loadRange(new Date(from.getFullYear(), from.getMonth() + direction, 1), 'month');
+        }
+        return true;
+    },
+
+    _loadRange: function (start, kind) {
+        const end = kind === 'week'
+            ? new Date(start.getFullYear(), start.getMonth(), start.getDate() + 6)
+            : new Date(start.getFullYear(), start.getMonth() + 1, 0);
+        this._rangeKind = kind;
+        this._loadPlanning({ date_from: this._formatDate(start), date_to: this._formatDate(end) });
+    },
+
+    /**
+     * Week or month of a date_from/date_to pair of the URL, null for another range.
+     */
+    _rangeKindOf: function (dateFrom, dateTo) {
+        const from = dateFrom && this._parseDateString(dateFrom);
+        const to = dateTo && this._parseDateString(dateTo);
+        if (!from || !to) {
+            return null;
+        }
+        const days = Math.round((to - from) / 86400000);
+        if (days === 6 && from.getDay() === 1) {
+            return 'week';
+        }
+        if (from.getDate() === 1 && to.getMonth() === from.getMonth() && new Date(to.getFullYear(), to.getMonth(), to.getDate() + 1).getDate() === 1) {
+            return 'month';
+        }
+        return null;
+    },
+
+    /**
+     * Replace the rows and cards with the planning of params.date (YYYY-MM-DD), of the range
+     * params.date_from - params.date_to or of all dates (params.no_date).
+     * Falls back to a full page load when the request fails.
+     */
+    _loadPlanning: async function (params, pushState = true) {
+        const urlParams = new URLSearchParams(window.location.search);
+        for (const name of ['date', 'no_date', 'date_from', 'date_to']) {
+            urlParams.delete(name);
+        }
+        if (params.no_date) {
+            urlParams.set('no_date', '1');
+        } else if (params.date) {
+            urlParams.set('date', params.date);
+        } else {
+            if (params.date_from) { urlParams.set('date_from', params.date_from); }
+            if (params.date_to) { urlParams.set('date_to', params.date_to); }
+        }
+        if (!params.date_from && !params.date_to) {
+            this._rangeKind = null;
+        } else if (!pushState) {
+            this._rangeKind = this._rangeKindOf(params.date_from, params.date_to);
+        }
+        const search = '?' + urlParams.toString();
+
+        const seq = (this._planningSeq || 0) + 1;
+        this._planningSeq = seq;
+        let result;
+        try {
+            result = await rpc('/partner/planning/day', {
+                page: this.pagerPage,
+                html: true,
+                date: params.no_date ? null : (params.date || null),
+                no_date: !!params.no_date,
+                job_id: urlParams.get('job_id') || null,
+                date_from: urlParams.get('date_from'),
+                date_to: urlParams.get('date_to'),
+            });
+        } catch (e) {
+            console.error('Failed to load planning', e);
+            window.location.search = search;
+            return;
+        }
+        if (seq !== this._planningSeq) {
+            return;  // a later date was asked for meanwhile
+        }
+
+        const rows = this.el.querySelector('.bcplanning-rows');
+        const cards = this.el.querySelector('.bcplanning-cards');
+        const empty = !result.tasks.length;
+        if (rows) {
+            const table = rows.closest('table');
+            const cols = table ? table.querySelectorAll('thead tr:last-child th').length : 1;
+            rows.innerHTML = empty
+                ? `<tr><td colspan="${cols}" class="text-center text-muted">No tasks found.</td></tr>`
+                : result.rows;
+        }
+        if (cards) {
+            cards.innerHTML = empty ? '<div class="text-center text-muted">No tasks found.</div>' : result.cards;
+        }
+
+        this._stopPager();
+        this._pagerLoading = false;  // a pending "Load more" of the old view is dropped on return
+        let more = this.el.querySelector('.bcplanning-more');
+        if (more) { more.remove(); }
+        if (result.has_more && cards) {
+            more = document.createElement('div');
+            more.className = 'bcplanning-more text-center py-2';
+            more.dataset.cursor = result.next_cursor;
+            more.innerHTML = '<button type="button" class="btn btn-sm btn-outline-secondary load-more">Load more</button>';
+            cards.after(more);
+            this._setupPager();
+        }
+
+        const current = params.date || params.date_from;
+        if (current) {
+            this._currentDate = this._parseDateString(current);
+        }
+        const lbl = this.el.querySelector('#selected-date-label');
+        if (lbl) { lbl.textContent = result.selected_date; }
+        if (pushState) {
+            window.history.pushState(null, '', search);
+        }
+    },
+
+    _stopPager: function () {
+        if (this._pagerObserver) {
+            this._pagerObserver.disconnect();
+            this._pagerObserver = null;
+        }
+    },
+
+    destroy: function () {
+        this._stopPager();
+        if (this._onPopState) {
+            window.removeEventListener('popstate', this._onPopState);
+        }
+        this._super.apply(this, arguments);
+    },
+};
@@ -0,0 +1,2 @@
+from . import test_planning_indexes
+from . import test_planning_overlaps
@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+
+from odoo.tests import TransactionCase, tagged
+from odoo.tools import SQL
+
+
+@tagged('post_install', '-at_install')
+class TestPlanningIndexes(TransactionCase):
+    """The week and month views of the portal read the lines of a vendor through the start indexes."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        Partner = cls.env['res.partner']
+        cls.vendor = Partner.create({'name': 'Vendor', 'is_company': True})
+        cls.resource = Partner.create({'name': 'Resource', 'parent_id': cls.vendor.id})
+        job = cls.env['bcproject'].create({'job_no': 'JOB-IDX', 'job_desc': 'Index test'})
+        task = cls.env['bctask'].create({'task_no': 'T1', 'job_id': job.id})
+        start = datetime(2025, 10, 6, 7, 0)
+        cls.env['bcplanningline'].create([{
+            'task_id': task.id,
+            'planning_line_lineno': 10000 + lineno,
+            'planning_line_type': 'resource',
+            'resource_id': cls.resource.id,
+            'vendor_id': cls.vendor.id,
+            'start_datetime': start + timedelta(days=lineno),
+            'end_datetime': start + timedelta(days=lineno, hours=2),
+        } for lineno in range(40)])
+        cls.env['bcplanningline'].flush_model()
+
+    def _plan(self, resource, date_from, date_to):
+        """EXPLAIN of the paged query of _build_vendor_planning for the window, without sequential scans."""
+        Portal = self.env['bcplanning_portal']
+        dummy, range_from, range_to = Portal._date_window(None, False, date_from, date_to)
+        query = self.env['bcplanningline']._search(
+            Portal._planning_domain(self.vendor, resource, None, range_from, range_to),
+            order=Portal._page_order,
+            limit=Portal.PAGE_SIZE + 1,
+        )
+        # a few rows only: the planner would read the whole table, which says nothing about the indexes
+        self.env.cr.execute("SET LOCAL enable_seqscan = off")
+        self.env.cr.execute(SQL("EXPLAIN %s", query.select()))
+        return "\n".join(row[0] for row in self.env.cr.fetchall())
+
+    def _index_name(self, columns):
+        self.env.cr.execute(
+            "SELECT indexname FROM pg_indexes WHERE tablename = 'bcplanningline' AND indexdef LIKE %s",
+            [f'%({columns})'],
+        )
+        row = self.env.cr.fetchone()
+        self.assertTrue(row, f"no index on bcplanningline ({columns})")
+        return row[0]
+
+    def test_vendor_week(self):
+        plan = self._plan(None, '2025-10-06', '2025-10-12')
+        self.assertNotIn('Seq Scan', plan)
+        self.assertRegex(plan, r'Index (Only )?Scan')
+        self.assertIn(self._index_name('vendor_id, start_datetime'), plan)
+
+    def test_vendor_month(self):
+        plan = self._plan(None, '2025-10-01', '2025-10-31')
+        self.assertNotIn('Seq Scan', plan)
+        self.assertRegex(plan, r'Index (Only )?Scan')
+        self.assertIn(self._index_name('vendor_id, start_datetime'), plan)
+
+    def test_resource_week(self):
+        plan = self._plan(self.resource, '2025-10-06', '2025-10-12')
+        self.assertNotIn('Seq Scan', plan)
+        self.assertRegex(plan, r'Index (Only )?Scan')
+        self.assertIn(self._index_name('resource_id, vendor_id, start_datetime'), plan)
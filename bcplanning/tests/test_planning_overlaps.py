@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+
+from odoo.exceptions import ValidationError
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestPlanningOverlaps(TransactionCase):
+    """Double bookings of a resource: the sweep of _find_overlaps and the save rule of _check_overlaps."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        Partner = cls.env['res.partner']
+        cls.vendor = Partner.create({'name': 'Vendor', 'is_company': True})
+        cls.resource = Partner.create({'name': 'Resource', 'parent_id': cls.vendor.id})
+        cls.other_resource = Partner.create({'name': 'Other resource', 'parent_id': cls.vendor.id})
+        job = cls.env['bcproject'].create({'job_no': 'JOB-OVL', 'job_desc': 'Overlap test'})
+        cls.task = cls.env['bctask'].create({'task_no': 'T1', 'job_id': job.id})
+        cls.day = datetime(2025, 10, 6)
+        cls.lineno = 0
+
+    def _line(self, start_hour, end_hour, resource=None):
+        self.__class__.lineno += 10000
+        return self.env['bcplanningline'].create({
+            'task_id': self.task.id,
+            'planning_line_lineno': self.lineno,
+            'planning_line_no': f'L{self.lineno}',
+            'planning_line_type': 'resource',
+            'resource_id': (resource or self.resource).id,
+            'vendor_id': self.vendor.id,
+            'start_datetime': self.day + timedelta(hours=start_hour),
+            'end_datetime': self.day + timedelta(hours=end_hour),
+        })
+
+    def _pairs(self, lines):
+        return {
+            frozenset((line.id, other.id))
+            for line, other, dummy, dummy in self.env['bcplanningline']._find_overlaps([('id', 'in', lines.ids)])
+        }
+
+    def test_adjacent_intervals(self):
+        lines = self._line(8, 10) | self._line(10, 12)
+        self.assertFalse(self._pairs(lines), "[a, b) and [b, c) do not overlap")
+
+    def test_zero_length_interval(self):
+        booked = self._line(8, 12)
+        empty = self._line(10, 10)
+        self.assertFalse(self._pairs(booked | empty), "an empty interval books nothing")
+
+    def test_three_way_overlap(self):
+        a = self._line(8, 18)
+        b = self._line(10, 14)
+        c = self._line(12, 20)
+        self.assertEqual(self._pairs(a | b | c), {
+            frozenset((a.id, b.id)), frozenset((a.id, c.id)), frozenset((b.id, c.id)),
+        })
+        overlap = next(o for o in self.env['bcplanningline']._find_overlaps([('id', '=', c.id)]) if o[0] == b)
+        self.assertEqual(overlap[2:], (self.day + timedelta(hours=12), self.day + timedelta(hours=14)))
+
+    def test_other_resource(self):
+        lines = self._line(8, 12) | self._line(9, 11, self.other_resource)
+        self.assertFalse(self._pairs(lines))
+
+    def test_existing_overlap_does_not_block_edit(self):
+        # BC sent overlapping lines: an edit that keeps (or reduces) the conflict is saved
+        line = self._line(8, 12)
+        self._line(10, 14)
+        known = line._overlap_pairs()
+        line.write({'resource_id': self.resource.id, 'end_datetime': self.day + timedelta(hours=11)})
+        line._check_overlaps(known)
+
+    def test_new_overlap_blocks_edit(self):
+        line = self._line(8, 12)
+        existing = self._line(10, 14)
+        third = self._line(15, 17)
+        known = line._overlap_pairs()
+        line.write({'end_datetime': self.day + timedelta(hours=16)})
+        with self.assertRaisesRegex(ValidationError, 'double booked') as error:
+            line._check_overlaps(known)
+        # only the pair added by the write is reported
+        message = str(error.exception)
+        self.assertIn(third.planning_line_no, message)
+        self.assertNotIn(f'{existing.planning_line_no} ', message)
+        self.assertNotIn(f'overlaps {existing.planning_line_no}', message)